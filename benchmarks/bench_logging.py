@@ -0,0 +1,95 @@
+"""Measures the per-call overhead of logging to file directly and through a queue.
+
+Examples:
+
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --calls 200000 --output logging.json
+    python benchmarks/bench_logging.py --calls 2000 --fsync
+
+The '--fsync' option syncs each record to disk, like slow or network storage.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional
+
+from pybudgetplot.utils.log_util import (
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_NEW,
+    add_file_handler,
+    remove_handlers,
+    start_queued_logging,
+    stop_queued_logging,
+)
+
+
+def _sync_on_flush(handler: logging.StreamHandler):
+    """Makes the handler sync the file to disk after each record."""
+
+    flush = handler.flush
+
+    def flush_and_sync():
+        flush()
+        if handler.stream is not None:
+            os.fsync(handler.stream.fileno())
+
+    handler.flush = flush_and_sync
+
+
+def time_calls(file: Path, calls: int, overflow: Optional[str], fsync: bool) -> Dict[str, float]:
+    """Returns the time spent in the logging calls and until all records are written."""
+
+    logger = logging.getLogger(f"bench_logging.{overflow}")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    remove_handlers(logger)
+    handler = add_file_handler(logger, file, logging.DEBUG)
+    if fsync:
+        _sync_on_flush(handler)
+    if overflow is not None:
+        start_queued_logging(logger, overflow=overflow)
+
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.debug("processing event %d of %d", i, calls)
+    calls_time = time.perf_counter() - start
+
+    if overflow is not None:
+        stop_queued_logging()
+    remove_handlers(logger)
+    total_time = time.perf_counter() - start
+
+    return {
+        "per_call_us": calls_time / calls * 1e6,
+        "calls_time": calls_time,
+        "total_time": total_time,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--fsync", action="store_true", help="Sync each record to disk.")
+    parser.add_argument("--output", type=Path, default=None, help="JSON results file.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with TemporaryDirectory() as temp_dir:
+        for name, overflow in (("file", None), ("queued", OVERFLOW_BLOCK), ("queued_drop_new", OVERFLOW_DROP_NEW)):
+            results[name] = time_calls(Path(temp_dir).joinpath(f"{name}.log"), args.calls, overflow, args.fsync)
+            print(
+                f"{name:>16}: {results[name]['per_call_us']:.2f} us per call, "
+                f"{results[name]['total_time']:.3f}s until written"
+            )
+
+    if args.output:
+        document = {"calls": args.calls, "fsync": args.fsync, "results": results}
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
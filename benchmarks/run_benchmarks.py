@@ -0,0 +1,220 @@
+"""Times the budget hot paths over grid of synthetic budgets and saves JSON results.
+
+Examples:
+
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --events 10 100 --periods 1y 10y --output results.json
+    python benchmarks/run_benchmarks.py --quick --compare benchmarks/results/previous.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy
+import pandas
+
+from pybudgetplot.__about__ import __version__
+from pybudgetplot.datamodel.account import Account
+from pybudgetplot.datamodel.analysis import event_contributions
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.datamodel.period import expand_frequency, parse_rule
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic import EVENT_COUNTS, MIXES, PERIOD_DAYS, grid_cells, make_definition  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent.joinpath("results")
+
+# the grid points with more (events x days) cells are skipped
+MAX_CELLS = 2_000_000
+
+# the exporters that write each cell are skipped earlier
+MAX_EXPORT_CELLS = 200_000
+
+Setup = Callable[[str, Path], Callable[[], Any]]
+
+
+def _fresh_budget(text: str) -> Budget:
+    """Parses new budget with cold rule-expansion cache."""
+
+    expand_frequency.cache_clear()
+    parse_rule.cache_clear()
+    return Budget.from_yaml(text)
+
+
+def _setup_from_yaml(text: str, _: Path) -> Callable[[], Any]:
+    return lambda: Budget.from_yaml(text)
+
+
+def _setup_generate_datestamps(text: str, _: Path) -> Callable[[], Any]:
+    budget = _fresh_budget(text)
+    frequencies = sorted({event.frequency for event in budget.events})
+    return lambda: [budget.period.generate_datestamps(frequency) for frequency in frequencies]
+
+
+def _setup_as_dataframe(text: str, _: Path) -> Callable[[], Any]:
+    return _fresh_budget(text).as_dataframe
+
+
+def _setup_as_dataframe_interest(text: str, _: Path) -> Callable[[], Any]:
+    budget = _fresh_budget(text)
+    budget.account = Account(1000, 0.05, "daily")
+    return budget.as_dataframe
+
+
+def _setup_event_contributions(text: str, _: Path) -> Callable[[], Any]:
+    budget = _fresh_budget(text)
+    return lambda: event_contributions(budget)
+
+
+def _setup_as_rolling(text: str, _: Path) -> Callable[[], Any]:
+    return _fresh_budget(text).as_rolling
+
+
+def _setup_to_csv(text: str, _: Path) -> Callable[[], Any]:
+    return _fresh_budget(text).to_csv
+
+
+def _setup_to_xlsx(text: str, _: Path) -> Callable[[], Any]:
+    return _fresh_budget(text).to_xlsx
+
+
+def _setup_to_txt(text: str, _: Path) -> Callable[[], Any]:
+    return _fresh_budget(text).to_txt
+
+
+def _setup_plot_budget(text: str, temp_dir: Path) -> Callable[[], Any]:
+    from pybudgetplot.utils.plot_util import plot_budget  # pylint: disable=import-outside-toplevel
+
+    budget = _fresh_budget(text)
+    return lambda: plot_budget(budget, file=temp_dir.joinpath("budget.png"))
+
+
+# name -> (setup, max cells)
+CASES: Dict[str, Tuple[Setup, int]] = {
+    "from_yaml": (_setup_from_yaml, MAX_CELLS),
+    "generate_datestamps": (_setup_generate_datestamps, MAX_CELLS),
+    "as_dataframe": (_setup_as_dataframe, MAX_CELLS),
+    "as_dataframe_interest": (_setup_as_dataframe_interest, MAX_CELLS),
+    "event_contributions": (_setup_event_contributions, MAX_CELLS),
+    "as_rolling": (_setup_as_rolling, MAX_CELLS),
+    "to_csv": (_setup_to_csv, MAX_CELLS),
+    "to_xlsx": (_setup_to_xlsx, MAX_EXPORT_CELLS),
+    "to_txt": (_setup_to_txt, MAX_EXPORT_CELLS),
+    "plot_budget": (_setup_plot_budget, MAX_EXPORT_CELLS),
+}
+
+
+def time_case(setup: Setup, text: str, repeat: int, temp_dir: Path) -> List[float]:
+    """Returns the wall times of the case, each repeat with fresh setup."""
+
+    times = []
+    for _ in range(repeat):
+        func = setup(text, temp_dir)
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run(
+    events: List[int],
+    periods: List[str],
+    mixes: List[str],
+    cases: List[str],
+    repeat: int,
+) -> List[Dict[str, Any]]:
+    """Runs the cases over the grid and returns list with the result records."""
+
+    results = []
+    with TemporaryDirectory() as temp_dir:
+        for event_count in events:
+            for period in periods:
+                cells = grid_cells(event_count, period)
+                for mix in mixes:
+                    text = make_definition(event_count, period, mix)
+                    for case in cases:
+                        setup, max_cells = CASES[case]
+                        if cells > max_cells:
+                            continue
+                        times = time_case(setup, text, repeat, Path(temp_dir))
+                        record = {
+                            "case": case,
+                            "events": event_count,
+                            "period": period,
+                            "days": PERIOD_DAYS[period],
+                            "mix": mix,
+                            "repeat": repeat,
+                            "min": min(times),
+                            "median": statistics.median(times),
+                            "mean": statistics.mean(times),
+                        }
+                        results.append(record)
+                        print(f"{case:>20} {event_count:>6} events {period:>4} {mix:>8}: {record['min']:.4f}s")
+    return results
+
+
+def _machine_info() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "pybudgetplot": __version__,
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_file: Path):
+    """Prints the ratio of the current to the baseline min times."""
+
+    baseline = json.loads(baseline_file.read_text(encoding="utf-8"))
+
+    def key(record: Dict[str, Any]) -> Tuple[Any, ...]:
+        return record["case"], record["events"], record["period"], record["mix"]
+
+    baseline_times = {key(record): record["min"] for record in baseline["results"]}
+    for record in results:
+        previous: Optional[float] = baseline_times.get(key(record))
+        if previous:
+            print(f"{' '.join(map(str, key(record))):>40}: {record['min'] / previous:6.2f}x")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=list(EVENT_COUNTS))
+    parser.add_argument("--periods", nargs="+", choices=list(PERIOD_DAYS), default=list(PERIOD_DAYS))
+    parser.add_argument("--mixes", nargs="+", choices=MIXES, default=list(MIXES))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Run small grid only.")
+    parser.add_argument("--output", type=Path, default=None, help="JSON results file.")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON results file to compare against.")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.events, args.periods, args.mixes = [10, 100], ["1m", "1y"], ["mixed"]
+
+    results = run(args.events, args.periods, args.mixes, args.cases, args.repeat)
+
+    now = datetime.now()
+    output = args.output or RESULTS_DIR.joinpath(f"{now:%Y%m%d-%H%M%S}-{__version__}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {"created": now.isoformat(timespec="seconds"), "machine": _machine_info(), "results": results}
+    output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"Saved {len(results)} results to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Generates synthetic budget-definitions for the benchmarks."""
+import random
+from datetime import date, timedelta
+from typing import Dict
+
+import yaml
+
+PERIOD_START = date(2000, 1, 1)
+
+EVENT_COUNTS = (10, 100, 1000, 10000)
+
+PERIOD_DAYS = {
+    "1m": 31,
+    "1y": 366,
+    "10y": 3653,
+    "50y": 18263,
+}
+
+DAILY_FREQUENCIES = (
+    "Every day",
+    "Every WeekDay",
+    "Every 3 Days",
+    "Every Week",
+    "Every 2 weeks on Friday and Saturday",
+)
+
+MIXES = ("single", "monthly", "daily", "mixed")
+
+
+def _frequency(kind: str, rng: random.Random, days: int) -> str:
+    """Returns random frequency of the given kind within the period."""
+
+    if kind == "single":
+        return (PERIOD_START + timedelta(days=rng.randrange(days))).isoformat()
+    if kind == "monthly":
+        return f"Every Month starting {PERIOD_START.replace(day=rng.randint(1, 28)).isoformat()}"
+    return rng.choice(DAILY_FREQUENCIES)
+
+
+def make_definition(events: int, period: str, mix: str, seed: int = 0) -> str:
+    """Returns budget-definition in YAML format.
+
+    Args:
+        events: The number of events.
+        period: One of the ``PERIOD_DAYS`` keys.
+        mix: One of the ``MIXES``, 'mixed' cycles the other kinds.
+        seed: Seed of the random amounts and dates.
+    """
+
+    rng = random.Random(seed)
+    days = PERIOD_DAYS[period]
+    kinds = MIXES[:-1] if (mix == "mixed") else (mix,)
+
+    events_data: Dict[str, Dict[str, object]] = {}
+    for index in range(events):
+        events_data[f"Event{index:05d}"] = {
+            "amount": round(rng.uniform(-100.0, 100.0), 2),
+            "frequency": _frequency(kinds[index % len(kinds)], rng, days),
+        }
+
+    data = {
+        "PERIOD": {
+            "start_date": PERIOD_START,
+            "end_date": PERIOD_START + timedelta(days=days - 1),
+        },
+        "EVENTS": events_data,
+    }
+    return yaml.dump(data, Dumper=yaml.SafeDumper, default_flow_style=False, sort_keys=False)
+
+
+def grid_cells(events: int, period: str) -> int:
+    """Returns the number of (events x days) cells of the daily breakdown."""
+
+    return events * PERIOD_DAYS[period]
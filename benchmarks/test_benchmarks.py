@@ -0,0 +1,31 @@
+"""The benchmark cases for `pytest-benchmark`, not collected by the default test run.
+
+Examples:
+
+    pytest benchmarks --no-cov --benchmark-json=results.json
+"""
+import pytest
+from run_benchmarks import CASES, MAX_CELLS
+from synthetic import grid_cells, make_definition
+
+pytest.importorskip("pytest_benchmark")
+
+GRID = [
+    (events, period, mix)
+    for events in (10, 100, 1000)
+    for period in ("1m", "1y", "10y")
+    for mix in ("monthly", "mixed")
+    if grid_cells(events, period) <= MAX_CELLS
+]
+
+
+@pytest.mark.parametrize("case", list(CASES))
+@pytest.mark.parametrize("events,period,mix", GRID)
+def test_case(benchmark, tmp_path, case, events, period, mix):
+    setup, max_cells = CASES[case]
+    if grid_cells(events, period) > max_cells:
+        pytest.skip("too many cells for this case")
+
+    text = make_definition(events, period, mix)
+    benchmark.extra_info.update(events=events, period=period, mix=mix)
+    benchmark.pedantic(lambda func: func(), setup=lambda: ((setup(text, tmp_path),), {}), rounds=3)
@@ -1,13 +1,31 @@
 # SPDX-FileCopyrightText: 2022-present Hrissimir <hrisimir.dakov@gmail.com>
 #
 # SPDX-License-Identifier: MIT
+import asyncio
+import logging
+import math
+import time
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 import click
+from tabulate import tabulate
+from yaml import YAMLError
 
-from pybudgetplot.datamodel.budget import Budget
-from pybudgetplot.utils.file_util import read_str, write_bytes, write_str
-from pybudgetplot.utils.plot_util import plot_budget
+from pybudgetplot.datamodel.analysis import contributions_to_csv, contributions_to_xlsx, event_contributions
+from pybudgetplot.datamodel.budget import DAILY, GRANULARITIES, Budget
+from pybudgetplot.datamodel.period import expand_frequency, format_stamp, parse_datestamp
+from pybudgetplot.datamodel.solver import solve_amount, solve_date
+from pybudgetplot.utils.file_util import COMPRESSIONS, check_compression, get_stem, open_write, read_bytes, write_bytes
+from pybudgetplot.utils.fingerprint_util import compute_fingerprint, is_fresh, write_fingerprint
+from pybudgetplot.utils.log_util import add_file_handler
+from pybudgetplot.utils.metrics_util import REGISTRY, record_budget
+from pybudgetplot.utils.plot_util import open_live_plot, pause_live_plot, plot_budget, update_live_plot
+from pybudgetplot.utils.profile_util import Profiler, stage
+from pybudgetplot.utils.server_util import CACHE_SIZE, SERVER_HOST, SERVER_PORT
+from pybudgetplot.utils.server_util import serve as serve_http
+from pybudgetplot.utils.sqlite_util import query_below, read_breakdown_fingerprint, write_breakdown
+from pybudgetplot.utils.watch_util import WATCH_INTERVAL, watch_file
 
 from ..__about__ import __version__  # pylint: disable=relative-beyond-top-level
 
@@ -33,9 +51,26 @@ SAMPLE_BUDGET.add_event("Party", -20, "Every 2 weeks on Friday and Saturday")
     version=__version__,
     prog_name="PyBudgetPlot",
 )
-def cli():
+@click.option(
+    "--log-file",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+    default=None,
+    help="Write INFO level log to file.",
+)
+@click.option(
+    "--log-json",
+    is_flag=True,
+    default=False,
+    help="Write the log file as JSON-lines.",
+)
+def cli(log_file: Optional[Path], log_json: bool):
     """Composite CLI command for managing a 'budget-definition' file."""
 
+    if log_file is not None:
+        root_logger = logging.getLogger()
+        root_logger.setLevel(logging.INFO)
+        add_file_handler(root_logger, log_file, logging.INFO, json_lines=log_json)
+
 
 @cli.command()
 @click.argument(
@@ -56,85 +91,596 @@ def init(file):
     click.echo(sample_yaml, file=file)
 
 
+def _validate_compression(_ctx, _param, value: Optional[str]) -> Optional[str]:
+    """Ensures the package required by the selected compression is installed."""
+
+    try:
+        check_compression(value)
+    except ImportError as ex:
+        raise click.BadParameter(str(ex)) from ex
+    return value
+
+
+def _validate_date(_ctx, _param, value: Optional[str]) -> Optional[str]:
+    """Ensures the value is a date, returns it in ISO-format."""
+
+    if value is None:
+        return None
+    try:
+        return format_stamp(parse_datestamp(value))
+    except ValueError as ex:
+        raise click.BadParameter(f"{value!r} is not a date.") from ex
+
+
+def _check_window(start: Optional[str], end: Optional[str]):
+    """Ensures the window of the outputs is not empty."""
+
+    if (start is not None) and (end is not None) and (start > end):
+        raise click.BadParameter(f"{start!r} is after --end {end!r}.", param_hint="'--start'")
+
+
+def _read_definition(file: Path) -> bytes:
+    """Reads the contents of budget-definition file, which may be compressed."""
+
+    try:
+        return read_bytes(file, decompress=True)
+    except ImportError as ex:
+        raise click.UsageError(str(ex)) from ex
+
+
+def _fingerprinted_definition(budget: Budget, definition: bytes) -> bytes:
+    """Returns the definition contents with the holidays of the budget calendar, if it has one."""
+
+    calendar = budget.period.calendar
+    if calendar is None:
+        return definition
+    return definition + repr((calendar.holidays, calendar.weekmask)).encode("utf-8")
+
+
+def _output_options(command):
+    """Decorates command with the options that select the written outputs."""
+
+    options = [
+        click.option(
+            "-c",
+            "--csv",
+            is_flag=True,
+            default=False,
+            help="Write .CSV with the breakdown next to definition file.",
+        ),
+        click.option(
+            "-p",
+            "--png",
+            is_flag=True,
+            default=False,
+            help="Write .PNG with the graph next to definition file.",
+        ),
+        click.option(
+            "-s",
+            "--svg",
+            is_flag=True,
+            default=False,
+            help="Write .SVG with the graph next to definition file.",
+        ),
+        click.option(
+            "-t",
+            "--txt",
+            is_flag=True,
+            default=False,
+            help="Write .TXT with the breakdown next to definition file.",
+        ),
+        click.option(
+            "-x",
+            "--xlsx",
+            is_flag=True,
+            default=False,
+            help="Write .XLSX with the breakdown next to definition file.",
+        ),
+        click.option(
+            "-i",
+            "--interactive",
+            is_flag=True,
+            default=False,
+            help="Enter interactive plot mode.",
+        ),
+        click.option(
+            "-d",
+            "--db",
+            type=click.Path(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+            default=None,
+            help="Store the breakdown in SQLite database file.",
+        ),
+        click.option(
+            "-z",
+            "--compress",
+            type=click.Choice(COMPRESSIONS),
+            default=None,
+            callback=_validate_compression,
+            help="Compress the .CSV and .TXT outputs.",
+        ),
+        click.option(
+            "--downsample/--no-downsample",
+            default=True,
+            show_default=True,
+            help="Reduce the plotted points of long periods to what the graph can show.",
+        ),
+        click.option(
+            "--start",
+            default=None,
+            callback=_validate_date,
+            help="Leave out the dates before this ISO-format date.",
+        ),
+        click.option(
+            "--end",
+            default=None,
+            callback=_validate_date,
+            help="Leave out the dates after this ISO-format date.",
+        ),
+        click.option(
+            "-g",
+            "--granularity",
+            type=click.Choice(GRANULARITIES),
+            default=DAILY,
+            show_default=True,
+            help="Sum the .CSV, .TXT and .XLSX breakdowns by week, month or year.",
+        ),
+        click.option(
+            "--categories",
+            is_flag=True,
+            default=False,
+            help="Add the breakdown by event category to the .XLSX and the graphs.",
+        ),
+        click.option(
+            "--accounts",
+            is_flag=True,
+            default=False,
+            help="Add the balance of each account to the .CSV, .TXT, .XLSX and the graphs.",
+        ),
+        click.option(
+            "--rolling",
+            is_flag=True,
+            default=False,
+            help="Add the rolling spend, the daily burn and the runway to the .CSV, .TXT, .XLSX and the graphs.",
+        ),
+        click.option(
+            "-f",
+            "--force",
+            is_flag=True,
+            default=False,
+            help="Rebuild the outputs even if they are up-to-date.",
+        ),
+        click.argument(
+            "yaml_file",
+            type=click.Path(
+                exists=True,
+                file_okay=True,
+                dir_okay=False,
+                writable=False,
+                readable=True,
+                resolve_path=True,
+                allow_dash=False,
+                path_type=Path,
+            ),
+            required=True,
+        ),
+    ]
+
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def _write_outputs(
+    budget: Budget,
+    file: Path,
+    definition: bytes,
+    *,
+    csv: bool = False,
+    png: bool = False,
+    svg: bool = False,
+    txt: bool = False,
+    xlsx: bool = False,
+    interactive: bool = False,
+    db: Optional[Path] = None,
+    compress: Optional[str] = None,
+    downsample: bool = True,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    granularity: str = DAILY,
+    categories: bool = False,
+    accounts: bool = False,
+    rolling: bool = False,
+    force: bool = False,
+) -> Tuple[Dict[str, Path], int]:
+    """Writes the selected outputs of the budget next to its definition file.
+
+    The outputs whose fingerprint matches the definition contents and the
+    export options are skipped, unless forced. With 'start' or 'end' only
+    the dates of that window are written, the tables are summed by the
+    granularity while the graphs and the database stay daily. With
+    'categories' the .XLSX and the graphs include the breakdown by category,
+    and with 'accounts' all outputs except the database include the balance
+    of each account. With 'rolling' they also include the rolling spend, the
+    daily burn and the runway. The holidays of the budget calendar are
+    fingerprinted with the definition, so editing its holiday file rebuilds
+    the outputs.
+
+    Returns:
+        Tuple with the rebuilt output files by output name, and the number of skipped outputs.
+    """
+
+    definition = _fingerprinted_definition(budget, definition)
+    folder = file.parent
+    stem = get_stem(file)
+    suffix = f".{compress}" if compress else ""
+    window = {name: value for (name, value) in (("start", start), ("end", end)) if value is not None}
+    tables = dict(window, granularity=granularity) if (granularity != DAILY) else window
+    balances = {"accounts": True} if accounts else {}
+    statistics = {"rolling": True} if rolling else {}
+    tables = dict(tables, **balances, **statistics)
+    grouped = {"categories": True} if categories else {}
+    rebuilt: Dict[str, Path] = {}
+    skipped = 0
+
+    def stale(output: str, output_file: Path, fingerprint: str) -> bool:
+        nonlocal skipped
+        if force or not is_fresh(output_file, fingerprint):
+            rebuilt[output] = output_file
+            return True
+        skipped += 1
+        return False
+
+    if csv:
+        csv_file = folder.joinpath(f"{stem}.csv{suffix}")
+        fingerprint = compute_fingerprint(definition, "csv", compress=compress, **tables)
+        if stale("csv", csv_file, fingerprint):
+            with open_write(csv_file) as csv_stream:
+                budget.write_csv(csv_stream, start, end, granularity, accounts, rolling)
+            write_fingerprint(csv_file, fingerprint)
+
+    if txt:
+        txt_file = folder.joinpath(f"{stem}.txt{suffix}")
+        fingerprint = compute_fingerprint(definition, "txt", compress=compress, **tables)
+        if stale("txt", txt_file, fingerprint):
+            with open_write(txt_file) as txt_stream:
+                budget.write_txt(txt_stream, start, end, granularity, accounts, rolling)
+            write_fingerprint(txt_file, fingerprint)
+
+    if xlsx:
+        xlsx_file = folder.joinpath(f"{stem}.xlsx")
+        fingerprint = compute_fingerprint(definition, "xlsx", **tables, **grouped)
+        if stale("xlsx", xlsx_file, fingerprint):
+            write_bytes(xlsx_file, budget.to_xlsx(start, end, granularity, categories, accounts, rolling))
+            write_fingerprint(xlsx_file, fingerprint)
+
+    if db:
+        fingerprint = compute_fingerprint(definition, "db", **window)
+        if force or (read_breakdown_fingerprint(db, stem) != fingerprint):
+            rebuilt["db"] = db
+            data = budget.as_dataframe(start, end)
+            with stage("write_db"):
+                write_breakdown(db, stem, data, fingerprint)
+        else:
+            skipped += 1
+
+    graph_files = {}
+    for output in [name for (name, selected) in (("png", png), ("svg", svg)) if selected]:
+        graph_file = folder.joinpath(f"{stem}.{output}")
+        options = dict(window, **grouped, **balances, **statistics)
+        fingerprint = compute_fingerprint(definition, output, downsample=downsample, **options)
+        if stale(output, graph_file, fingerprint):
+            graph_files[graph_file] = fingerprint
+
+    if interactive or graph_files:
+        plot_budget(
+            budget,
+            interactive=interactive,
+            file=list(graph_files),
+            downsample=downsample,
+            categories=categories,
+            accounts=accounts,
+            rolling=rolling,
+            **window,
+        )
+        for graph_file, fingerprint in graph_files.items():
+            write_fingerprint(graph_file, fingerprint)
+
+    return rebuilt, skipped
+
+
+def _record_metrics(
+    budget: Budget,
+    file: Path,
+    profiler: Profiler,
+    cache_info_before,
+    total_time: float,
+    rebuilt: Dict[str, Path],
+):
+    """Records the metrics of the processed budget in the default registry."""
+
+    cache_info = expand_frequency.cache_info()
+    stage_times = {stats.name: stats.wall_time for stats in profiler.stats}
+    record_budget(
+        get_stem(file),
+        events=len(budget.events),
+        days=budget.period.days,
+        cache_hits=cache_info.hits - cache_info_before.hits,
+        cache_misses=cache_info.misses - cache_info_before.misses,
+        expansion_time=stage_times.get("expand_rules", 0.0),
+        total_time=total_time,
+        export_sizes={name: path.stat().st_size for (name, path) in rebuilt.items() if name != "db"},
+    )
+
+
+def _echo_profile(profiler: Profiler):
+    """Prints table with the measurements of each stage."""
+
+    rows = [(stats.name, stats.calls, stats.wall_time, stats.peak_memory / 2**20) for stats in profiler.stats]
+    headers = ["stage", "calls", "wall_time [s]", "peak_memory [MiB]"]
+    click.echo(tabulate(rows, headers=headers, floatfmt=".3f"))
+
+
 @cli.command()
+@_output_options
 @click.option(
-    "-c",
-    "--csv",
+    "--profile",
     is_flag=True,
     default=False,
-    help="Write .CSV with the breakdown next to definition file.",
+    help="Print the wall time and the peak memory of each stage.",
 )
 @click.option(
-    "-p",
-    "--png",
-    is_flag=True,
-    default=False,
-    help="Write .PNG with the graph next to definition file.",
+    "--pstats",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+    default=None,
+    help="Write cProfile stats to .pstats file, implies --profile.",
 )
 @click.option(
-    "-t",
-    "--txt",
-    is_flag=True,
-    default=False,
-    help="Write .TXT with the breakdown next to definition file.",
+    "--metrics",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+    default=None,
+    help="Write the metrics of the run to file in OpenMetrics text format.",
 )
+def plot(yaml_file: Path, profile: bool, pstats: Optional[Path], metrics: Optional[Path], **outputs):
+    """Plot a budget-definition .yaml file."""
+
+    file = Path(yaml_file).absolute().resolve(strict=True)
+    _check_window(outputs["start"], outputs["end"])
+    profile = profile or (pstats is not None)
+    profiler = Profiler(trace_memory=profile, profile_calls=pstats is not None)
+    cache_info = expand_frequency.cache_info()
+    start = time.perf_counter()
+
+    with profiler:
+        with stage("read_definition"):
+            definition = _read_definition(file)
+        budget = Budget.from_yaml(definition.decode("utf-8", errors="surrogateescape"), file.parent)
+        rebuilt, skipped = _write_outputs(budget, file, definition, **outputs)
+
+    click.echo(f"Rebuilt {len(rebuilt)} and skipped {skipped} up-to-date outputs of {file.name}.")
+    _record_metrics(budget, file, profiler, cache_info, time.perf_counter() - start, rebuilt)
+    if metrics is not None:
+        REGISTRY.write_openmetrics(metrics)
+    if profile:
+        _echo_profile(profiler)
+    if pstats is not None:
+        profiler.dump_stats(pstats)
+        click.echo(f"Wrote the cProfile stats to {pstats}")
+
+
+@cli.command()
+@_output_options
 @click.option(
-    "-x",
-    "--xlsx",
-    is_flag=True,
-    default=False,
-    help="Write .XLSX with the breakdown next to definition file.",
+    "-n",
+    "--interval",
+    type=click.FloatRange(min=0.05),
+    default=WATCH_INTERVAL,
+    show_default=True,
+    help="Seconds between the checks for changes.",
 )
+def watch(yaml_file: Path, interval: float, interactive: bool, **outputs):
+    """Watch a budget-definition .yaml file and update the outputs on change."""
+
+    file = Path(yaml_file).absolute().resolve(strict=True)
+    _check_window(outputs["start"], outputs["end"])
+    live_plot = open_live_plot() if interactive else None
+    state = {"budget": None}
+
+    # only the whole daily breakdown is built from the kept event columns
+    options = ("start", "end", "categories", "accounts", "rolling")
+    reuse = (outputs["granularity"] == DAILY) and not any(outputs[name] for name in options)
+
+    def on_change(data: bytes):
+        previous = state["budget"]
+        try:
+            budget = Budget.from_yaml(data.decode("utf-8", errors="surrogateescape"), file.parent)
+            changed = budget.reuse_columns(previous) if (reuse and (previous is not None)) else len(budget.events)
+            rebuilt, _ = _write_outputs(budget, file, data, **outputs)
+            if live_plot is not None:
+                update_live_plot(
+                    live_plot, budget, downsample=outputs["downsample"], start=outputs["start"], end=outputs["end"]
+                )
+        except (ValueError, KeyError, TypeError, YAMLError) as ex:
+            click.echo(f"Invalid budget-definition, waiting for changes: {ex!r}", err=True)
+            return
+        except OSError as ex:
+            click.echo(f"Failed to write the outputs, waiting for changes: {ex!r}", err=True)
+            return
+
+        state["budget"] = budget
+        if reuse:
+            click.echo(
+                f"Rebuilt {len(rebuilt)} outputs of {file.name}, recalculated {changed} of {len(budget.events)} events."
+            )
+        else:
+            click.echo(f"Rebuilt {len(rebuilt)} outputs of {file.name}.")
+
+    wait = pause_live_plot if interactive else time.sleep
+    try:
+        watch_file(file, on_change, interval=interval, wait=wait)
+    except KeyboardInterrupt:
+        click.echo("Stopped watching.")
+
+
+@cli.command()
 @click.option(
-    "-i",
-    "--interactive",
-    is_flag=True,
-    default=False,
-    help="Enter interactive plot mode.",
+    "-e",
+    "--event",
+    "description",
+    required=True,
+    help="Description of the solved event.",
+)
+@click.option(
+    "--goal",
+    type=click.Choice(["amount", "date"]),
+    default="amount",
+    show_default=True,
+    help="Solve the lowest amount, or the date of the event moved to single date.",
+)
+@click.option(
+    "--floor",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="The lowest allowed cumulative total.",
 )
+@click.option("--start", default=None, callback=_validate_date, help="Ignore dates before this ISO-format date.")
+@click.option("--end", default=None, callback=_validate_date, help="Ignore dates after this ISO-format date.")
 @click.argument(
     "yaml_file",
-    type=click.Path(
-        exists=True,
-        file_okay=True,
-        dir_okay=False,
-        writable=False,
-        readable=True,
-        resolve_path=True,
-        allow_dash=False,
-        path_type=Path,
-    ),
-    required=True,
+    type=click.Path(exists=True, dir_okay=False, readable=True, resolve_path=True, path_type=Path),
 )
-def plot(
-    csv: bool, png: bool, txt: bool, xlsx: bool, interactive: bool, yaml_file: Path
-):
-    """Plot a budget-definition .yaml file."""
+def solve(yaml_file: Path, description: str, goal: str, floor: float, start: str, end: str):
+    """Find the event amount or date that keeps the cumulative total above the floor.
 
-    file = Path(yaml_file).absolute().resolve(strict=True)
-    folder = file.parent
+    The amount is the lowest that keeps it, e.g. the minimum income or the largest
+    expense. The date is the earliest for expenses and the latest for incomes.
+    """
 
-    text = read_str(file)
-    budget = Budget.from_yaml(text)
+    _check_window(start, end)
+    definition = _read_definition(yaml_file)
+    budget = Budget.from_yaml(definition.decode("utf-8", errors="surrogateescape"), yaml_file.parent)
+    try:
+        if goal == "amount":
+            amount = solve_amount(budget, description, floor, start, end)
+            click.echo(f"{description}: {math.ceil(round(amount * 100, 6)) / 100:.2f}")
+        else:
+            date = solve_date(budget, description, floor, start, end)
+            click.echo(f"{description}: {'no date' if (date is None) else format_stamp(date)}")
+    except KeyError as ex:
+        raise click.BadParameter(f"No event {description!r}.", param_hint="'--event'") from ex
+    except ValueError as ex:
+        raise click.ClickException(str(ex)) from ex
 
-    if csv:
-        csv_file = folder.joinpath(f"{file.stem}.csv")
-        csv_bytes = budget.to_csv()
-        write_bytes(csv_file, csv_bytes)
 
-    if txt:
-        txt_file = folder.joinpath(f"{file.stem}.txt")
-        write_str(txt_file, str(budget.as_dataframe()))
+@cli.command()
+@click.option(
+    "--floor",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Count the days with cumulative total below this amount as negative.",
+)
+@click.option("--start", default=None, callback=_validate_date, help="Ignore dates before this ISO-format date.")
+@click.option("--end", default=None, callback=_validate_date, help="Ignore dates after this ISO-format date.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+    default=None,
+    help="Write the table to .csv or .xlsx file instead of printing it.",
+)
+@click.argument(
+    "yaml_file",
+    type=click.Path(exists=True, dir_okay=False, readable=True, resolve_path=True, path_type=Path),
+)
+def analyze(yaml_file: Path, floor: float, start: str, end: str, output: Optional[Path]):
+    """Rank the events by how much they lower the minimum cumulative total.
 
-    if xlsx:
-        xlsx_file = folder.joinpath(f"{file.stem}.xlsx")
-        xlsx_bytes = budget.to_xlsx()
-        write_bytes(xlsx_file, xlsx_bytes)
+    For each event prints its part of the minimum and the end cumulative total,
+    and the number of days below the floor that it adds.
+    """
+
+    _check_window(start, end)
+    if (output is not None) and (output.suffix.lower() not in (".csv", ".xlsx")):
+        raise click.BadParameter(f"{output.name!r} is not .csv or .xlsx file.", param_hint="'--output'")
+    definition = _read_definition(yaml_file)
+    budget = Budget.from_yaml(definition.decode("utf-8", errors="surrogateescape"), yaml_file.parent)
+    try:
+        data = event_contributions(budget, start, end, floor)
+    except ValueError as ex:
+        raise click.ClickException(str(ex)) from ex
 
-    if png:
-        png_file = folder.joinpath(f"{file.stem}.png")
+    if output is None:
+        click.echo(tabulate(data.itertuples(), headers=[data.index.name] + data.columns.to_list(), floatfmt=".2f"))
+    elif output.suffix.lower() == ".csv":
+        write_bytes(output, contributions_to_csv(data))
     else:
-        png_file = None
+        write_bytes(output, contributions_to_xlsx(data))
+
+
+@cli.command()
+@click.option(
+    "-d",
+    "--db",
+    type=click.Path(exists=True, dir_okay=False, resolve_path=True, path_type=Path),
+    required=True,
+    help="SQLite database file with stored breakdowns.",
+)
+@click.option(
+    "-b",
+    "--below",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Find budgets with cumulative total below this amount.",
+)
+@click.option("--start", default=None, callback=_validate_date, help="Ignore dates before this ISO-format date.")
+@click.option("--end", default=None, callback=_validate_date, help="Ignore dates after this ISO-format date.")
+@click.option(
+    "--month",
+    type=click.IntRange(1, 12),
+    default=None,
+    help="Ignore dates outside this month number.",
+)
+def query(db: Path, below: float, start: str, end: str, month: int):
+    """Query the breakdowns stored in SQLite database."""
+
+    _check_window(start, end)
+    rows = query_below(db, below, start=start, end=end, month=month)
+    headers = ["budget_id", "first_date", "min_balance"]
+    click.echo(tabulate(rows, headers=headers, floatfmt=".2f"))
+
+
+@cli.command()
+@click.option("--host", default=SERVER_HOST, show_default=True, help="Address to listen on.")
+@click.option(
+    "--port",
+    type=click.IntRange(0, 65535),
+    default=SERVER_PORT,
+    show_default=True,
+    help="Port to listen on.",
+)
+@click.option(
+    "--processes",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of render processes, defaults to the CPU count.",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=0),
+    default=CACHE_SIZE,
+    show_default=True,
+    help="Number of renders kept in the cache.",
+)
+def serve(host: str, port: int, processes: int, cache_size: int):
+    """Serve budget renders over local HTTP server.
+
+    POST budget-definition YAML to /render?format=csv|xlsx|png|svg|json
+    """
 
-    if interactive or png_file:
-        plot_budget(budget, interactive=interactive, file=png_file)
+    click.echo(f"Serving on http://{host}:{port}/render, press Ctrl+C to stop.")
+    try:
+        asyncio.run(serve_http(host, port, processes, cache_size))
+    except KeyboardInterrupt:
+        click.echo("Stopped serving.")
@@ -0,0 +1,235 @@
+"""This module defines the data and logic for processing an account definition.
+
+The balance of an account that earns (or is charged) interest follows the
+affine recurrence ``balance[t] = balance[t - 1] * multiplier[t] + flow[t]``,
+where the multiplier is above 1 only on the compounding dates. It's solved
+with `affine_scan` in blocks of days, each block in closed form from its
+prefix products, so only the block carries are calculated in sequence.
+"""
+from typing import Any, Sequence, Tuple
+
+import numpy
+from pandas import DatetimeIndex
+
+from pybudgetplot.datamodel.event import parse_amount
+
+DAILY = "daily"
+MONTHLY = "monthly"
+YEARLY = "yearly"
+
+# the number of compounding periods per year, by compounding schedule
+COMPOUNDINGS = {DAILY: 365, MONTHLY: 12, YEARLY: 1}
+
+# the number of days solved in closed form at once by `affine_scan`
+BLOCK_SIZE = 256
+
+# the name of the account of the budgets with single account
+DEFAULT_ACCOUNT = "main"
+
+
+def parse_compounding(value: Any) -> str:
+    """Parses compounding schedule, one of `COMPOUNDINGS`.
+
+    Raises:
+        ValueError: Raised if the schedule is not supported.
+    """
+
+    compounding = str(value).strip().lower()
+    if compounding not in COMPOUNDINGS:
+        raise ValueError(f"Unsupported compounding {value!r}, expected one of {tuple(COMPOUNDINGS)}!")
+    return compounding
+
+
+def compounding_counts(dates: DatetimeIndex, compounding: str) -> numpy.ndarray:
+    """Returns the number of compounding dates since the previous date, for each of the sorted dates.
+
+    The compounding dates are each day, the first day of each month or the
+    first day of each year. The first of the dates has none.
+    """
+
+    days = dates.values.astype("datetime64[D]")
+    if compounding == DAILY:
+        numbers = days.astype(numpy.int64)
+    else:
+        unit = "M" if (compounding == MONTHLY) else "Y"
+        numbers = days.astype(f"datetime64[{unit}]").astype(numpy.int64)
+    return numpy.diff(numbers, prepend=numbers[:1])
+
+
+def affine_scan(multipliers, flows, initial=0.0, block_size: int = BLOCK_SIZE) -> numpy.ndarray:
+    """Solves ``balance[t] = balance[t - 1] * multipliers[t] + flows[t]`` for all t.
+
+    Inside each block the balance is ``prefix[t] * (carry + cumsum(flows / prefix)[t])``,
+    with the prefix products of the multipliers restarting in each block, so
+    they stay in the float range for any horizon. The 2-D arrays are solved
+    for all their columns (e.g. scenarios) at once.
+
+    Args:
+        multipliers: Positive multipliers, 1-D or with the shape of the flows.
+        flows: The flows, 1-D with a row for each step or 2-D (steps x scenarios).
+        initial: The balance before the first step, scalar or one per scenario.
+        block_size: The number of steps solved in closed form at once.
+
+    Returns:
+        Array with the balance after each step, with the shape of the flows.
+
+    Raises:
+        ValueError: Raised if any multiplier is not positive.
+    """
+
+    flows = numpy.asarray(flows, dtype=numpy.float64)
+    multipliers = numpy.asarray(multipliers, dtype=numpy.float64)
+    if (multipliers <= 0).any():
+        raise ValueError("The multipliers must be positive!")
+
+    steps = flows.shape[0]
+    if steps == 0:
+        return flows.copy()
+    if (multipliers.ndim == 1) and (flows.ndim == 2):
+        multipliers = multipliers[:, None]
+    multipliers = numpy.broadcast_to(multipliers, flows.shape)
+
+    # pad to whole blocks with steps that keep the balance
+    blocks = -(-steps // block_size)
+    padded_shape = (blocks * block_size,) + flows.shape[1:]
+    padded_flows = numpy.zeros(padded_shape)
+    padded_flows[:steps] = flows
+    padded_multipliers = numpy.ones(padded_shape)
+    padded_multipliers[:steps] = multipliers
+    block_shape = (blocks, block_size) + flows.shape[1:]
+    prefix = numpy.cumprod(padded_multipliers.reshape(block_shape), axis=1)
+    local = prefix * numpy.cumsum(padded_flows.reshape(block_shape) / prefix, axis=1)
+
+    # the balance carried into each block
+    carries = numpy.empty((blocks,) + flows.shape[1:])
+    carry = numpy.broadcast_to(numpy.asarray(initial, dtype=numpy.float64), flows.shape[1:])
+    for block in range(blocks):
+        carries[block] = carry
+        carry = carry * prefix[block, -1] + local[block, -1]
+
+    balances = local + carries[:, None] * prefix
+    return balances.reshape(padded_shape)[:steps]
+
+
+class Account:
+    """Represents the balance of an account, with opening amount and interest.
+
+    The interest 'rate' is nominal per year, compounded on the schedule: the
+    balance of the previous day is multiplied by ``1 + rate / periods`` on
+    each compounding date, where the periods per year are 365, 12 or 1. The
+    same rate applies to negative balances, e.g. loans.
+
+    The instances are immutable and hashable.
+    """
+
+    __slots__ = ("opening", "rate", "compounding", "_hash")
+
+    opening: float
+    rate: float
+    compounding: str
+
+    def __init__(self, opening: Any = 0.0, rate: Any = 0.0, compounding: Any = MONTHLY):
+        """Class constructor.
+
+        Args:
+            opening: The balance before the first date.
+            rate: The nominal interest rate per year, e.g. 0.05 for 5%.
+            compounding: The compounding schedule, one of `COMPOUNDINGS`.
+
+        Raises:
+            ValueError: Raised if any of the values is invalid.
+        """
+
+        opening = parse_amount(opening)
+        rate = parse_amount(rate)
+        compounding = parse_compounding(compounding)
+        if rate <= -COMPOUNDINGS[compounding]:
+            raise ValueError(f"The rate {rate!r} takes more than the whole balance!")
+
+        object.__setattr__(self, "opening", opening)
+        object.__setattr__(self, "rate", rate)
+        object.__setattr__(self, "compounding", compounding)
+        object.__setattr__(self, "_hash", hash((opening, rate, compounding)))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Account":
+        """Creates new Account from dict with the optional 'opening', 'rate' and 'compounding'."""
+
+        return cls(data.get("opening", 0.0), data.get("rate", 0.0), data.get("compounding", MONTHLY))
+
+    def as_dict(self) -> dict:
+        """Returns dict with the current object's data."""
+
+        return {"opening": self.opening, "rate": self.rate, "compounding": self.compounding}
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __reduce__(self):
+        return type(self), (self.opening, self.rate, self.compounding)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Account):
+            return (
+                    (self.opening == other.opening)
+                    and (self.rate == other.rate)
+                    and (self.compounding == other.compounding)
+            )
+        return False
+
+    def __repr__(self) -> str:
+        return "%s(opening=%r, rate=%r, compounding=%r)" % (
+            type(self).__name__,
+            self.opening,
+            self.rate,
+            self.compounding,
+        )
+
+    def multipliers(self, dates: DatetimeIndex) -> numpy.ndarray:
+        """Returns the interest multiplier of the balance on each of the sorted dates."""
+
+        periods = COMPOUNDINGS[self.compounding]
+        return numpy.power(1.0 + self.rate / periods, compounding_counts(dates, self.compounding))
+
+    def balances(self, dates: DatetimeIndex, flows) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Calculates the balance after the flows of each of the sorted dates.
+
+        Args:
+            dates: The sorted dates.
+            flows: The total of the events on each date.
+
+        Returns:
+            Tuple with the balance and the interest on each date.
+        """
+
+        balances, interest = ledger_balances([self], dates, flows)
+        return balances[:, 0], interest[:, 0]
+
+
+def ledger_balances(accounts: Sequence[Account], dates: DatetimeIndex, flows) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Calculates the balances of many accounts at once, see `Account.balances`.
+
+    Args:
+        accounts: The accounts, one for each column of the flows.
+        dates: The sorted dates.
+        flows: The (dates x accounts) matrix with the flows of each account.
+
+    Returns:
+        Tuple with the (dates x accounts) matrices of the balances and the interest.
+    """
+
+    flows = numpy.asarray(flows, dtype=numpy.float64).reshape(len(dates), len(accounts))
+    openings = numpy.array([account.opening for account in accounts], dtype=numpy.float64)
+    if all(account.rate == 0 for account in accounts):
+        return openings + numpy.cumsum(flows, axis=0), numpy.zeros(flows.shape)
+
+    multipliers = numpy.column_stack([account.multipliers(dates) for account in accounts])
+    balances = affine_scan(multipliers, flows, openings)
+    previous = numpy.vstack([openings[None, :], balances[:-1]])
+    return balances, balances - previous - flows
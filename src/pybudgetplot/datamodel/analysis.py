@@ -0,0 +1,118 @@
+"""This module defines the analysis of how much each event contributes to the balance.
+
+The contribution of an event on each date is its cumulative sum, with the
+interest it earns in its account. All events are evaluated at once over
+the (dates x events) occurrence matrix, at the key dates of the balance:
+the date of its minimum and the last date.
+"""
+import logging
+from io import BytesIO
+
+import numpy
+from pandas import DataFrame, Index
+
+from pybudgetplot.datamodel.account import affine_scan
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.datamodel.period import parse_datestamp
+from pybudgetplot.utils.profile_util import stage
+from pybudgetplot.utils.xlsx_util import generate_table_xlsx
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+# the columns of the contributions table, in order
+CONTRIBUTION_COLUMNS = ("min_balance", "end_balance", "negative_days")
+
+# the name of the contributions sheet in the XLSX document
+CONTRIBUTIONS_SHEET = "Contributions"
+
+
+def _event_balances(budget: Budget, occurrences: DataFrame) -> numpy.ndarray:
+    """Returns the (dates x events) matrix with the part of the balance from each event."""
+
+    flows = occurrences.to_numpy()
+    accounts = budget.accounts
+    if all(account.rate == 0 for account in accounts.values()):
+        return numpy.cumsum(flows, axis=0)
+
+    # each event earns the interest of its account
+    default_account = next(iter(accounts))
+    multipliers = {name: account.multipliers(occurrences.index) for (name, account) in accounts.items()}
+    event_multipliers = numpy.column_stack(
+        [multipliers[name or default_account] for name in budget.events.account_list()]
+    )
+    return affine_scan(event_multipliers, flows)
+
+
+def event_contributions(budget: Budget, start=None, end=None, floor: float = 0.0) -> DataFrame:
+    """Calculates how much each event contributes to the balance.
+
+    The 'min_balance' and 'end_balance' columns are the part of the balance
+    from the event on the date of the minimum balance and on the last date.
+    The 'negative_days' column is the number of days below the floor that
+    the event adds, i.e. that are above it without the event.
+
+    The table is ranked by the contribution to the minimum balance, so the
+    events that lower it the most are first.
+
+    Args:
+        budget: The analyzed budget.
+        start: Ignore the balance before this date, if set.
+        end: Ignore the balance after this date, if set.
+        floor: The balance below which the days are counted as negative.
+
+    Returns:
+        DataFrame with row for each event, indexed by description.
+
+    Raises:
+        ValueError: Raised if the window start is after its end, or any of the events uses unknown account.
+    """
+
+    occurrences = budget.as_occurrences(end)
+    balance = budget.as_accounts(None, end).sum(axis=1).reindex(occurrences.index).to_numpy()
+    with stage("analyze_events"):
+        contributions = _event_balances(budget, occurrences)
+        if start is not None:
+            in_window = occurrences.index >= parse_datestamp(start)
+            balance, contributions = balance[in_window], contributions[in_window]
+
+        index = Index(budget.events.description_list(), name="event")
+        if balance.size == 0:
+            return DataFrame(0.0, index=index, columns=list(CONTRIBUTION_COLUMNS))
+
+        key_date = numpy.argmin(balance)
+        negative_days = (balance < floor).sum()
+        data = DataFrame(
+            {
+                "min_balance": contributions[key_date],
+                "end_balance": contributions[-1],
+                "negative_days": negative_days - ((balance[:, None] - contributions) < floor).sum(axis=0),
+            },
+            index=index,
+        )
+        return data.sort_values(["min_balance", "end_balance"], kind="mergesort")
+
+
+def contributions_to_csv(data: DataFrame) -> bytes:
+    """Returns the contributions table as CSV bytes."""
+
+    buffer = BytesIO()
+    with stage("export_csv"):
+        data.to_csv(
+            buffer,
+            float_format="%.2f",
+            index=True,
+            index_label="event",
+            mode="b",
+            encoding="utf-8",
+            errors="surrogateescape",
+            line_terminator="\n",
+        )
+    return buffer.getvalue()
+
+
+def contributions_to_xlsx(data: DataFrame) -> bytes:
+    """Returns XLSX document containing the contributions table."""
+
+    with stage("export_xlsx"):
+        return generate_table_xlsx(data, CONTRIBUTIONS_SHEET)
@@ -1,13 +1,19 @@
 """This module defines the data and logic for processing a budget definition."""
-
+import logging
 from io import BytesIO, StringIO
-from typing import Dict, List, Union
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy
 import yaml
-from pandas import DataFrame, DatetimeIndex, Series, concat, date_range, set_option
+from pandas import DataFrame, DatetimeIndex, Series, Timestamp, concat, date_range, get_option, set_option
 
-from pybudgetplot.datamodel.event import Event
-from pybudgetplot.datamodel.period import Period
+from pybudgetplot.datamodel.account import DEFAULT_ACCOUNT, Account, ledger_balances
+from pybudgetplot.datamodel.calendars import WEEKMASK, Calendar, load_calendar
+from pybudgetplot.datamodel.event import Event, parse_string
+from pybudgetplot.datamodel.event_table import EMPTY_GROUPING, EventTable, Grouping
+from pybudgetplot.datamodel.period import Period, parse_datestamp
+from pybudgetplot.utils.profile_util import stage
 from pybudgetplot.utils.xlsx_util import generate_xlsx
 
 set_option("display.date_yearfirst", True)
@@ -22,90 +28,438 @@ set_option("expand_frame_repr", False)
 set_option("max_colwidth", 50)
 set_option("io.excel.xlsx.writer", "xlsxwriter")
 
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+YEARLY = "yearly"
+GRANULARITIES = (DAILY, WEEKLY, MONTHLY, YEARLY)
+
+# 1970-01-01 was Thursday, the weeks are counted from Monday 1969-12-29
+_WEEK_SHIFT = 3
+
+# the name of the breakdown column with the interest of the accounts
+INTEREST_COLUMN = "interest"
+
+# the suffix of the exported columns with the account balances
+BALANCE_SUFFIX = "_balance"
+
+# the number of rows of the text table formatted at once
+TXT_CHUNK_ROWS = 4096
+
+# the trailing windows of the rolling spend, in days
+ROLLING_WINDOWS = (7, 30, 90)
+
+# the trailing window of the average daily burn, in days
+BURN_WINDOW = 30
+
+# the names of the rolling statistics columns, see `Budget.as_rolling`
+BURN_COLUMN = "daily_burn"
+RUNWAY_COLUMN = "runway_days"
+ROLLING_COLUMNS = tuple(f"spend_{days}d" for days in ROLLING_WINDOWS) + (BURN_COLUMN, RUNWAY_COLUMN)
+
+
+def _parse_window(start, end) -> Tuple[Optional[Timestamp], Optional[Timestamp]]:
+    """Parses the optional window bounds to date-stamps.
+
+    Raises:
+        ValueError: Raised if the window start is after its end.
+    """
+
+    window_start = None if (start is None) else parse_datestamp(start)
+    window_end = None if (end is None) else parse_datestamp(end)
+    if (window_start is not None) and (window_end is not None) and (window_start > window_end):
+        raise ValueError(f"The window start {start!r} is after its end {end!r}!")
+    return window_start, window_end
+
+
+def _bucket_numbers(dates: DatetimeIndex, granularity: str) -> numpy.ndarray:
+    """Returns the number of the week, month or year of each date, counted from 1970."""
+
+    days = dates.values.astype("datetime64[D]")
+    if granularity == WEEKLY:
+        return (days.astype(numpy.int64) + _WEEK_SHIFT) // 7
+    unit = "M" if (granularity == MONTHLY) else "Y"
+    return days.astype(f"datetime64[{unit}]").astype(numpy.int64)
+
+
+def _bucket_labels(numbers: numpy.ndarray, granularity: str) -> DatetimeIndex:
+    """Returns the first date of each numbered week, month or year."""
+
+    if granularity == WEEKLY:
+        return DatetimeIndex((numbers * 7 - _WEEK_SHIFT).astype("datetime64[D]"))
+    unit = "M" if (granularity == MONTHLY) else "Y"
+    return DatetimeIndex(numbers.astype(f"datetime64[{unit}]").astype("datetime64[D]"))
+
+
+def _trailing_starts(dates: DatetimeIndex, days: int) -> numpy.ndarray:
+    """Returns the position of the first date in the trailing window of days that ends on each date."""
+
+    day_numbers = dates.values.astype("datetime64[D]").astype(numpy.int64)
+    return numpy.searchsorted(day_numbers, day_numbers - (days - 1))
+
+
+def _text_cells(values: numpy.ndarray) -> numpy.ndarray:
+    """Formats the float values like the 'display.float_format' of the text tables."""
+
+    cells = numpy.char.mod("%.2f", values)
+    cells[numpy.isnan(values)] = "NaN"
+    return cells
+
+
+def _write_text_table(stream: BinaryIO, data: DataFrame, chunk_rows: int = TXT_CHUNK_ROWS):
+    """Writes the breakdown as text table to binary stream, laid out as `str(data)`.
+
+    The widths of the columns are measured in one pass over the rows, and
+    the rows are formatted and written in chunks in second pass, so only
+    single chunk of the text is held in memory.
+    """
+
+    def write(text: str):
+        stream.write(text.encode("utf-8", errors="surrogateescape"))
+
+    if data.empty:
+        write(str(data))
+        return
+
+    values = data.to_numpy(dtype=float)
+    labels = data.index.strftime("%Y-%m-%d").to_numpy()
+    names = [str(name) for name in data.columns]
+    # the headers of the numeric columns start with space
+    widths = numpy.array([len(name) + 1 for name in names])
+    for offset in range(0, len(data), chunk_rows):
+        cells = _text_cells(values[offset:offset + chunk_rows])
+        widths = numpy.maximum(widths, numpy.char.str_len(cells).max(axis=0))
+
+    # the values are right-justified up to the max column width, the wider headers are padded after them
+    value_widths = numpy.minimum(widths, get_option("display.max_colwidth")).tolist()
+    widths = widths.tolist()
+    column_widths = list(zip(value_widths, widths))
+
+    # the index is left-justified and the columns are separated by space
+    index_name = str(data.index.name or "")
+    index_width = max(len(index_name), max(len(label) for label in labels[:1]))
+    header = " " * index_width + "".join(" " + name.rjust(width) for (name, width) in zip(names, widths))
+    write(header + "\n" + index_name.ljust(len(header)))
+    for offset in range(0, len(data), chunk_rows):
+        cells = _text_cells(values[offset:offset + chunk_rows])
+        rows = [
+            label.ljust(index_width) + "".join(
+                " " + cell.rjust(value_width).ljust(width) for (cell, (value_width, width)) in zip(row, column_widths)
+            )
+            for (label, row) in zip(labels[offset:offset + chunk_rows], cells.tolist())
+        ]
+        write("\n" + "\n".join(rows))
+    write(f"\n\n[{len(data)} rows x {len(names)} columns]")
+
+
+def _datestamp_index(stamps: List[Timestamp]) -> DatetimeIndex:
+    """Returns index of the unique date-stamps, converted from their nanoseconds instead of one by one."""
+
+    return DatetimeIndex(numpy.array([stamp.value for stamp in stamps], dtype="datetime64[ns]")).unique()
+
+
+def _event_dict(event: Event) -> Dict[str, object]:
+    """Returns the 'EVENTS' entry of event, with the optional values only if set."""
+
+    result: Dict[str, object] = {"amount": event.amount, "frequency": event.frequency}
+    if event.category is not None:
+        result["category"] = event.category
+    if event.tags:
+        result["tags"] = list(event.tags)
+    if event.account is not None:
+        result["account"] = event.account
+    if event.transfer_to is not None:
+        result["transfer_to"] = event.transfer_to
+    return result
+
 
 class Budget:
     """Represents the data-definition of a budget."""
 
-    period: Period
-    events: List[Event]
+    accounts: Dict[str, Account]
 
-    def __init__(self, period_start, period_end):
+    def __init__(
+            self,
+            period_start,
+            period_end,
+            account: Optional[Account] = None,
+            calendar: Optional[Calendar] = None,
+    ):
         """Class constructor.
 
         Args:
             period_start: Value for the budget period's start-date.
             period_end: Value for the budget period's end-date.
+            account: Optional opening balance and interest of the cumulative total, see `account`.
+            calendar: Optional business-day calendar with the holidays, see `Period`.
         """
 
-        self.period = Period(period_start, period_end)
-        self.events = []
+        self._columns: Dict[Event, Series] = {}
+        self.period = Period(period_start, period_end, calendar)
+        self.accounts = {}
+        self.account = account
+        self._events = EventTable()
+        self._frame: Optional[DataFrame] = None
+        self._frame_state: Optional[Tuple[Period, int]] = None
 
     def __repr__(self) -> str:
         return f"Budget(period={self.period!r}, events={self.events!r})"
 
     def __eq__(self, other) -> bool:
         if isinstance(other, Budget):
-            return (self.period == other.period) and (self.events == other.events)
+            return (
+                    (self.period == other.period)
+                    and (list(self.accounts.items()) == list(other.accounts.items()))
+                    and (self.events == other.events)
+            )
         return False
 
+    @property
+    def period(self) -> Period:
+        """The budget period, setting different period drops the calculated event columns."""
+
+        return self._period
+
+    @period.setter
+    def period(self, period: Period):
+        if getattr(self, "_period", None) != period:
+            self._columns.clear()
+        self._period = period
+
+    @property
+    def account(self) -> Optional[Account]:
+        """The default account, which is the first of the `accounts`.
+
+        The events without account belong to it. Setting it replaces the
+        first account, or adds account named 'main' if there are none.
+        """
+
+        return next(iter(self.accounts.values()), None)
+
+    @account.setter
+    def account(self, account: Optional[Account]):
+        if account is None:
+            self.accounts = dict(list(self.accounts.items())[1:])
+        elif self.accounts:
+            self.accounts = {name: account if (position == 0) else value
+                             for position, (name, value) in enumerate(self.accounts.items())}
+        else:
+            self.accounts = {DEFAULT_ACCOUNT: account}
+
+    @property
+    def events(self) -> EventTable:
+        """The budget events, stored as columns."""
+
+        return self._events
+
+    @events.setter
+    def events(self, events: Iterable[Event]):
+        self._events = events if isinstance(events, EventTable) else EventTable(events)
+
     @classmethod
-    def from_dict(cls, data: dict) -> "Budget":
-        """Creates and returns new Budget instance from dict data."""
+    def from_dict(cls, data: dict, base_dir: Optional[Path] = None) -> "Budget":
+        """Creates and returns new Budget instance from dict data.
+
+        The business-day calendar of the period is read from the holiday
+        file in its 'calendar', or from its 'holidays' and 'weekmask'.
+
+        Args:
+            data: The budget data.
+            base_dir: The dir of the relative calendar path, the current dir if None.
+        """
 
         period_data = data["PERIOD"]
         period_start = period_data["start_date"]
         period_end = period_data["end_date"]
 
-        result = Budget(period_start, period_end)
+        calendar = None
+        if period_data.get("calendar") is not None:
+            calendar = load_calendar(period_data["calendar"], base_dir)
+        elif ("holidays" in period_data) or ("weekmask" in period_data):
+            calendar = Calendar(period_data.get("holidays") or (), str(period_data.get("weekmask", WEEKMASK)))
 
-        events_data = data["EVENTS"]
-        for description, event in events_data.items():
-            amount = event["amount"]
-            frequency = event["frequency"]
-            result.add_event(description, amount, frequency)
+        account_data = data.get("ACCOUNT")
+        account = None if (account_data is None) else Account.from_dict(account_data)
 
+        result = Budget(period_start, period_end, account, calendar)
+        for name, account_data in (data.get("ACCOUNTS") or {}).items():
+            result.accounts[parse_string(name)] = Account.from_dict(account_data or {})
+        result.events = EventTable.from_dict(data["EVENTS"])
         return result
 
+    def reuse_columns(self, previous: "Budget") -> int:
+        """Reuses the already calculated breakdown columns of previous budget.
+
+        Only the columns of events that are unchanged and belong to the same
+        period are reused, the rest are calculated by the next breakdown.
+
+        Args:
+            previous: Budget that was loaded from older version of the definition.
+
+        Returns:
+            The number of events whose columns need to be calculated.
+        """
+
+        if previous.period == self.period:
+            for event in self.events:
+                column = None if (event in self._columns) else previous.cached_column(event)
+                if column is not None:
+                    self._columns[event] = column
+
+        return sum(1 for event in self.events if event not in self._columns)
+
     @classmethod
-    def from_yaml(cls, text: str) -> "Budget":
-        """Creates new Budget instance from string containing YAML data."""
+    def from_yaml(cls, text: str, base_dir: Optional[Path] = None) -> "Budget":
+        """Creates new Budget instance from string containing YAML data.
 
-        buffer = StringIO(text)
-        data = yaml.load(buffer, Loader=yaml.SafeLoader)
-        return cls.from_dict(data)
+        Args:
+            text: The YAML data.
+            base_dir: The dir of the relative calendar path, usually the dir of the YAML file.
+        """
+
+        with stage("parse_yaml"):
+            buffer = StringIO(text)
+            data = yaml.load(buffer, Loader=yaml.SafeLoader)
+            return cls.from_dict(data, base_dir)
 
-    def add_event(self, description, amount, frequency) -> Event:
+    def add_event(
+            self,
+            description,
+            amount,
+            frequency,
+            category=None,
+            tags=None,
+            account=None,
+            transfer_to=None,
+    ) -> Event:
         """Create and add Event to the list of events.
 
         Args:
             description: Event description.
             amount: Event amount.
             frequency: Event frequency.
+            category: Optional event category.
+            tags: Optional event tags.
+            account: Optional event account, the default account if None.
+            transfer_to: Optional account that receives the amount from the event account.
 
         Returns:
             The newly-created Event after adding it to the list of events.
         """
-        event = Event(description, amount, frequency)
+        event = Event(description, amount, frequency, category, tags, account, transfer_to)
         self.events.append(event)
+        self._patch_frame(len(self.events) - 1, None, event)
         return event
 
+    def update_event(
+            self,
+            description,
+            new_description=None,
+            amount=None,
+            frequency=None,
+            category=None,
+            tags=None,
+            account=None,
+            transfer_to=None,
+    ) -> Event:
+        """Replaces the event with the description by one with the new values.
+
+        The already calculated breakdown is patched instead of recalculated.
+
+        Args:
+            description: Description of the updated event.
+            new_description: The new description, unchanged if None.
+            amount: The new amount, unchanged if None.
+            frequency: The new frequency, unchanged if None.
+            category: The new category, unchanged if None.
+            tags: The new tags, unchanged if None.
+            account: The new account, unchanged if None.
+            transfer_to: The new account that receives the amount, unchanged if None.
+
+        Returns:
+            The new Event.
+
+        Raises:
+            KeyError: Raised if there is no event with the description.
+            ValueError: Raised if more than one event has the description.
+        """
+
+        position = self.events.index_of(parse_string(description))
+        previous = self.events[position]
+        event = Event(
+            previous.description if (new_description is None) else new_description,
+            previous.amount if (amount is None) else amount,
+            previous.frequency if (frequency is None) else frequency,
+            previous.category if (category is None) else category,
+            previous.tags if (tags is None) else tags,
+            previous.account if (account is None) else account,
+            previous.transfer_to if (transfer_to is None) else transfer_to,
+        )
+        self.events[position] = event
+        self._patch_frame(position, previous, event)
+        return event
+
+    def replace_amount(self, description, amount) -> Event:
+        """Replaces the amount of the event with the description, see `update_event`."""
+
+        return self.update_event(description, amount=amount)
+
+    def remove_event(self, description) -> Event:
+        """Removes the event with the description.
+
+        The already calculated breakdown is patched instead of recalculated.
+
+        Returns:
+            The removed Event.
+
+        Raises:
+            KeyError: Raised if there is no event with the description.
+            ValueError: Raised if more than one event has the description.
+        """
+
+        position = self.events.index_of(parse_string(description))
+        previous = self.events[position]
+        del self.events[position]
+        self._patch_frame(position, previous, None)
+        return previous
+
     def as_dict(self) -> Dict[str, Union[Dict[str, str], List[Dict[str, str]]]]:
-        """Returns dict with the current object's data."""
+        """Returns dict with the current object's data.
+
+        The 'EVENTS' are keyed by description, so only the last of the events
+        with the same description is included. The optional values of the
+        events are included only if set. The only account named 'main' is
+        written as 'ACCOUNT', otherwise the accounts are written as 'ACCOUNTS'.
+        The calendar is written as its holiday file, or as its holidays if it
+        wasn't read from file.
+        """
 
-        return {
+        duplicates = self.events.duplicate_descriptions()
+        if duplicates:
+            _log.warning("only the last of the events with the same description is kept: %s", duplicates)
+
+        result = {
             "PERIOD": {
                 "start_date": self.period.start.date(),
                 "end_date": self.period.end.date(),
             },
-            "EVENTS": {
-                event.description: {
-                    "amount": event.amount,
-                    "frequency": event.frequency
-                }
-                for event
-                in self.events
-            },
         }
+        calendar = self.period.calendar
+        if (calendar is not None) and (calendar.source is not None):
+            result["PERIOD"]["calendar"] = calendar.source
+        elif calendar is not None:
+            result["PERIOD"]["holidays"] = list(calendar.holidays)
+            if calendar.weekmask != WEEKMASK:
+                result["PERIOD"]["weekmask"] = calendar.weekmask
+        if list(self.accounts) == [DEFAULT_ACCOUNT]:
+            result["ACCOUNT"] = self.account.as_dict()
+        elif self.accounts:
+            result["ACCOUNTS"] = {name: account.as_dict() for (name, account) in self.accounts.items()}
+        result["EVENTS"] = {event.description: _event_dict(event) for event in self.events}
+        return result
 
     def as_yaml(self) -> str:
         """Returns string containing the current budget data in YAML format."""
@@ -125,57 +479,682 @@ class Budget:
         )
         return buffer.getvalue()
 
-    def as_dataframe(self) -> DataFrame:
-        """Calculates the daily breakdown and returns the data."""
+    def cached_column(self, event: Event) -> Optional[Series]:
+        """Returns the calculated breakdown column of the event, if it's kept."""
 
-        data = DataFrame(
-            index=date_range(
-                start=self.period.start.normalize(),
-                end=self.period.end.normalize(),
-            )
+        return self._columns.get(event)
+
+    def _event_column(self, event: Event, index: DatetimeIndex) -> Series:
+        """Returns the breakdown column of an event, calculating it if missing.
+
+        The column covers the period dates and any event dates outside of it.
+        """
+
+        column = self._columns.get(event)
+        if column is None:
+            with stage("expand_rules"):
+                event_dates = DatetimeIndex(self.period.generate_datestamps(event.frequency))
+            column_index = index if event_dates.isin(index).all() else index.union(event_dates)
+            column = Series(0.00, index=column_index, name=event.description)
+            column[column_index.isin(event_dates)] = event.net_amount
+            self._columns[event] = column
+        return column
+
+    def as_dataframe(self, start=None, end=None, rolling: bool = False) -> DataFrame:
+        """Calculates the daily breakdown and returns copy of the data.
+
+        The breakdown is kept until the period or the events change, the
+        changes done by `add_event`, `update_event`, `replace_amount` and
+        `remove_event` patch it instead.
+
+        With `accounts` the cumulative total is the sum of their balances,
+        which start from their opening amounts and earn the 'interest'
+        column. The transfers between the accounts don't change the totals.
+
+        With 'start' or 'end' only the dates of that window are calculated,
+        unless the whole breakdown is already kept. The cumulative total
+        starts from the total of the events before the window, which is
+        counted without generating their dates where possible.
+
+        Args:
+            start: Leave out the dates before this one, if set.
+            end: Leave out the dates after this one, if set.
+            rolling: Add the `ROLLING_COLUMNS` after the totals, see `as_rolling`.
+
+        Returns:
+            DataFrame with column for each event, 'daily_total' and 'cumulative_total'.
+
+        Raises:
+            ValueError: Raised if the window start is after its end.
+        """
+
+        window_start, window_end = _parse_window(start, end)
+        with stage("build_frame"):
+            data = self._cached_frame()
+            if (start is not None) or (end is not None):
+                if data is None:
+                    data = self._build_window(window_start, window_end)
+                else:
+                    data = data.loc[window_start:window_end].copy()
+            else:
+                if data is None:
+                    data = self._frame = self._build_frame()
+                    self._frame_state = (self.period, self.events.version)
+                data = data.copy()
+        data = self._apply_account(data, DAILY, window_start, window_end)
+        if rolling:
+            data = concat([data, self.as_rolling(start, end).reindex(data.index)], axis=1)
+        return data
+
+    def as_occurrences(self, end=None) -> DataFrame:
+        """Calculates the daily net amount of each event, without the totals of `as_dataframe`.
+
+        The kept breakdown is reused, otherwise all event dates are binned
+        in single pass. The transfers between accounts are zero.
+
+        Args:
+            end: Leave out the dates after this one, if set.
+
+        Returns:
+            DataFrame with column for each event.
+        """
+
+        _, window_end = _parse_window(None, end)
+        with stage("build_occurrences"):
+            data = self._cached_frame()
+            if data is None:
+                data = self._grouped_frame(DAILY, None, window_end, self.events.identity_grouping())
+            return data.loc[:window_end].iloc[:, :len(self.events)].copy()
+
+    def _cached_frame(self) -> Optional[DataFrame]:
+        """Returns the calculated breakdown, if it's up-to-date."""
+
+        if (self._frame is not None) and (self._frame_state == (self.period, self.events.version)):
+            return self._frame
+        return None
+
+    def _patch_frame(self, position: int, previous: Optional[Event], event: Optional[Event]):
+        """Patches the calculated breakdown after the event at position changed.
+
+        The change of the totals is kept as difference array: the daily total
+        changes by the difference of the event columns and the cumulative
+        total by its cumulative sum. Changes that add or remove dates outside
+        of the period drop the breakdown instead. The column of the previous
+        event is dropped afterwards, unless an equal event is still kept.
+
+        Args:
+            position: The position of the changed event.
+            previous: The event before the change, None if added.
+            event: The event after the change, None if removed.
+        """
+
+        try:
+            self._patch_totals(position, previous, event)
+        finally:
+            if (previous is not None) and (previous not in self.events):
+                self._columns.pop(previous, None)
+
+    def _patch_totals(self, position: int, previous: Optional[Event], event: Optional[Event]):
+        """Patches the event column and the totals of the calculated breakdown, see `_patch_frame`."""
+
+        if (self._frame is None) or (self._frame_state != (self.period, self.events.version - 1)):
+            self._frame = None
+            return
+
+        data = self._frame
+        index = date_range(start=self.period.start_date, end=self.period.end_date)
+        delta = numpy.zeros(len(data.index))
+
+        if previous is not None:
+            previous_column = self._event_column(previous, index)
+            if len(previous_column.index) != len(index):
+                self._frame = None
+                return
+            delta -= previous_column.reindex(data.index, fill_value=0.00).to_numpy()
+
+        values = None
+        if event is not None:
+            column = self._event_column(event, index)
+            if not column.index.isin(data.index).all():
+                self._frame = None
+                return
+            values = column.reindex(data.index, fill_value=0.00).to_numpy()
+            delta += values
+
+        if previous is None:
+            data.insert(position, event.description, values, allow_duplicates=True)
+        elif event is None:
+            data = data.iloc[:, [column for column in range(data.shape[1]) if column != position]].copy()
+        else:
+            data.iloc[:, position] = values
+            if event.description != previous.description:
+                data.columns = [
+                    event.description if (column == position) else label
+                    for (column, label) in enumerate(data.columns)
+                ]
+
+        data["daily_total"] += delta
+        data["cumulative_total"] += delta.cumsum()
+        self._frame = data
+        self._frame_state = (self.period, self.events.version)
+
+    def _build_frame(self) -> DataFrame:
+        """Builds the daily breakdown frame from the event columns."""
+
+        index = date_range(
+            start=self.period.start_date,
+            end=self.period.end_date,
         )
 
-        for event in self.events:
-            event_dates = self.period.generate_datestamps(event.frequency)
-            event_data = DataFrame(
-                data={
-                    event.description: event.amount,
-                },
-                index=DatetimeIndex(Series(event_dates, dtype=object)),
-            )
-            data = concat([data, event_data], axis=1).fillna(0.00)
+        columns = [self._event_column(event, index) for event in self.events]
+        data = concat([DataFrame(index=index)] + columns, axis=1).fillna(0.00)
 
         data["daily_total"] = data.sum(axis=1)
         data["cumulative_total"] = data["daily_total"].cumsum()
         data.index.rename("date", inplace=True)
         return data
 
-    def to_csv(self) -> bytes:
-        """Returns the daily breakdown data as CSV bytes."""
+    def _occurrences(
+            self,
+            window_start: Optional[Timestamp],
+            window_end: Optional[Timestamp],
+    ) -> Tuple[DatetimeIndex, Dict[int, DatetimeIndex], float]:
+        """Expands each distinct frequency of the events inside window.
+
+        Returns:
+            Tuple with the period dates in the window, the event dates by
+            frequency code, and the total of the events before the window.
+        """
+
+        period = self.period
+        range_start = period.start_date if (window_start is None) else max(window_start, period.start_date)
+        range_end = period.end_date if (window_end is None) else min(window_end, period.end_date)
+        index = date_range(start=range_start, end=range_end) if (range_start <= range_end) else DatetimeIndex([])
+
+        frequencies = self.events.unique_frequencies
+        codes = self.events.frequency_codes
+        event_dates: Dict[int, DatetimeIndex] = {}
+        counts_before = numpy.zeros(len(frequencies))
+        with stage("expand_rules"):
+            for code in numpy.unique(codes).tolist():
+                dates = period.generate_datestamps(frequencies[code], window_start, window_end)
+                event_dates[code] = _datestamp_index(dates)
+                if window_start is not None:
+                    counts_before[code] = period.count_datestamps(frequencies[code], window_start)
+
+        opening = float(numpy.dot(self.events.net_amounts, counts_before[codes])) if len(codes) else 0.00
+        return index, event_dates, opening
+
+    def _build_window(self, window_start: Optional[Timestamp], window_end: Optional[Timestamp]) -> DataFrame:
+        """Builds the daily breakdown frame of the dates in window.
+
+        Each distinct frequency is expanded only inside the window, and its
+        dates before the window are counted for the opening balance.
+        """
+
+        return self._grouped_frame(DAILY, window_start, window_end, self.events.identity_grouping())
+
+    def _grouped_frame(
+            self,
+            granularity: str,
+            window_start: Optional[Timestamp],
+            window_end: Optional[Timestamp],
+            grouping: Grouping,
+    ) -> DataFrame:
+        """Builds the breakdown of the event groups in window, binned by the granularity.
+
+        The grouping is sparse (events x groups) matrix, so the weighted
+        amount of each event occurrence is added to the cell of every group
+        of the event with single `numpy.bincount` over the (bucket, group)
+        pairs. The totals are summed by event, so they're right even if the
+        groups overlap or leave out events.
+
+        Returns:
+            DataFrame with column for each group, '<granularity>_total' and 'cumulative_total'.
+        """
+
+        index, event_dates, opening = self._occurrences(window_start, window_end)
+        if granularity == DAILY:
+            for dates in event_dates.values():
+                if not dates.isin(index).all():
+                    index = index.union(dates)
+            rows = {code: index.get_indexer(dates) for (code, dates) in event_dates.items()}
+            labels = index
+        else:
+            buckets = {code: _bucket_numbers(dates, granularity) for (code, dates) in event_dates.items()}
+            bounds = [_bucket_numbers(index[[0, -1]], granularity)] if len(index) else []
+            bounds.extend(numbers for numbers in buckets.values() if len(numbers))
+            first_bucket = min(numbers.min() for numbers in bounds) if bounds else 0
+            last_bucket = max(numbers.max() for numbers in bounds) if bounds else -1
+            rows = {code: numbers - first_bucket for (code, numbers) in buckets.items()}
+            labels = _bucket_labels(numpy.arange(first_bucket, last_bucket + 1), granularity)
+
+        event_positions, group_codes, group_weights, names = grouping
+        codes = self.events.frequency_codes
+        amounts = self.events.net_amounts
+        pair_codes = codes[event_positions]
+        pair_amounts = self.events.amounts[event_positions] * group_weights
+        row_count = len(labels)
+        group_count = len(names)
+        cells = []
+        cell_weights = []
+        total_rows = []
+        total_weights = []
+        for code, code_rows in rows.items():
+            pairs = numpy.flatnonzero(pair_codes == code)
+            cells.append(((code_rows * group_count)[:, None] + group_codes[pairs][None, :]).ravel())
+            cell_weights.append(numpy.tile(pair_amounts[pairs], len(code_rows)))
+            total_rows.append(code_rows)
+            total_weights.append(numpy.full(len(code_rows), amounts[codes == code].sum()))
+
+        if cells:
+            values = numpy.bincount(
+                numpy.concatenate(cells),
+                weights=numpy.concatenate(cell_weights),
+                minlength=row_count * group_count,
+            ).reshape(row_count, group_count)
+            totals = numpy.bincount(
+                numpy.concatenate(total_rows),
+                weights=numpy.concatenate(total_weights),
+                minlength=row_count,
+            )
+        else:
+            values = numpy.zeros((row_count, group_count))
+            totals = numpy.zeros(row_count)
+
+        data = DataFrame(values, index=labels, columns=names)
+        data[f"{granularity}_total"] = totals
+        data["cumulative_total"] = opening + data[f"{granularity}_total"].cumsum()
+        data.index.rename("date", inplace=True)
+        return data
+
+    def as_rollup(self, granularity: str, start=None, end=None) -> DataFrame:
+        """Calculates the breakdown summed by week, month or year.
+
+        The event dates are binned straight into the buckets, without
+        calculating the daily breakdown. Each row is labeled with the first
+        date of its bucket (weeks start on Monday), the total of the bucket
+        is in the '<granularity>_total' column.
+
+        Args:
+            granularity: One of `GRANULARITIES`, 'daily' returns `as_dataframe`.
+            start: Leave out the dates before this one, if set.
+            end: Leave out the dates after this one, if set.
+
+        Returns:
+            DataFrame with column for each event, '<granularity>_total' and 'cumulative_total'.
+
+        Raises:
+            ValueError: Raised if the granularity is not supported or the window start is after its end.
+        """
+
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity {granularity!r}, expected one of {GRANULARITIES}!")
+        if granularity == DAILY:
+            return self.as_dataframe(start, end)
+
+        window_start, window_end = _parse_window(start, end)
+        with stage("build_rollup"):
+            data = self._grouped_frame(granularity, window_start, window_end, self.events.identity_grouping())
+        return self._apply_account(data, granularity, window_start, window_end)
+
+    def as_categories(self, start=None, end=None, granularity: str = DAILY) -> DataFrame:
+        """Calculates the breakdown summed by event category.
+
+        Each event belongs to its category, the events without category are
+        in the last '(uncategorized)' column.
+
+        Args:
+            start: Leave out the dates before this one, if set.
+            end: Leave out the dates after this one, if set.
+            granularity: One of `GRANULARITIES`, see `as_rollup`.
+
+        Returns:
+            DataFrame with column for each category, '<granularity>_total' and 'cumulative_total'.
+
+        Raises:
+            ValueError: Raised if the granularity is not supported or the window start is after its end.
+        """
+
+        return self._as_groups(self.events.category_grouping(), start, end, granularity)
+
+    def as_tags(self, start=None, end=None, granularity: str = DAILY) -> DataFrame:
+        """Calculates the breakdown summed by event tag.
+
+        Each event is added to the columns of all its tags, so the tag columns
+        don't add up to the total, which includes the events without tags.
+
+        Args:
+            start: Leave out the dates before this one, if set.
+            end: Leave out the dates after this one, if set.
+            granularity: One of `GRANULARITIES`, see `as_rollup`.
+
+        Returns:
+            DataFrame with column for each tag, '<granularity>_total' and 'cumulative_total'.
+
+        Raises:
+            ValueError: Raised if the granularity is not supported or the window start is after its end.
+        """
+
+        return self._as_groups(self.events.tag_grouping(), start, end, granularity)
+
+    def _as_groups(self, grouping: Grouping, start, end, granularity: str) -> DataFrame:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity {granularity!r}, expected one of {GRANULARITIES}!")
+        window_start, window_end = _parse_window(start, end)
+        with stage("build_groups"):
+            data = self._grouped_frame(granularity, window_start, window_end, grouping)
+        return self._apply_account(data, granularity, window_start, window_end)
+
+    def _daily_flows(self, window_end: Optional[Timestamp]) -> Series:
+        """Returns the daily totals of all dates up to the window end."""
+
+        data = self._cached_frame()
+        if data is not None:
+            return data["daily_total"].loc[:window_end]
+        return self._grouped_frame(DAILY, None, window_end, EMPTY_GROUPING)["daily_total"]
+
+    def _ledger_accounts(self) -> Dict[str, Account]:
+        """Returns the accounts, or single 'main' account without interest if there are none."""
+
+        return self.accounts or {DEFAULT_ACCOUNT: Account()}
+
+    def _account_flows(self, window_end: Optional[Timestamp]) -> Tuple[DatetimeIndex, numpy.ndarray]:
+        """Sums the (dates x accounts) flows from the account grouping of the events in single pass."""
+
+        accounts = self._ledger_accounts()
+        grouping = self.events.account_grouping(list(accounts))
+        if len(accounts) == 1:
+            # all flows are in the only account
+            flows = self._daily_flows(window_end)
+            return flows.index, flows.to_numpy()[:, None]
+        data = self._grouped_frame(DAILY, None, window_end, grouping)
+        return data.index, data.iloc[:, :len(accounts)].to_numpy()
+
+    def _ledger(self, window_end: Optional[Timestamp]) -> Tuple[DatetimeIndex, numpy.ndarray, numpy.ndarray]:
+        """Calculates the daily balances of the accounts up to the window end, all at once.
+
+        Returns:
+            Tuple with the dates, and the (dates x accounts) matrices of the balances and the interest.
+        """
+
+        dates, flows = self._account_flows(window_end)
+        balances, interest = ledger_balances(list(self._ledger_accounts().values()), dates, flows)
+        return dates, balances, interest
+
+    def as_flows(self, end=None) -> DataFrame:
+        """Calculates the daily flows of each account, from which `as_accounts` solves the balances.
+
+        The transfers are taken out of the event account and added to the
+        target account, without changing the total.
+
+        Args:
+            end: Leave out the dates after this one, if set.
+
+        Returns:
+            DataFrame with column for each account, see `as_accounts`.
+
+        Raises:
+            ValueError: Raised if any of the events uses unknown account.
+        """
+
+        _, window_end = _parse_window(None, end)
+        with stage("build_flows"):
+            dates, flows = self._account_flows(window_end)
+            data = DataFrame(flows, index=dates, columns=list(self._ledger_accounts()))
+            data.index.rename("date", inplace=True)
+            return data
+
+    def _apply_account(
+            self,
+            data: DataFrame,
+            granularity: str,
+            window_start: Optional[Timestamp],
+            window_end: Optional[Timestamp],
+    ) -> DataFrame:
+        """Turns the cumulative total of the breakdown into the balance of the account.
+
+        The interest is calculated from the daily totals since the first
+        date, so the balance in a window is the same as in the whole
+        breakdown. The interest of each row is added as column before the
+        totals and included in them.
+        """
+
+        if not self.accounts:
+            return data
+
+        total_column = f"{granularity}_total"
+        opening = sum(account.opening for account in self.accounts.values())
+        if all(account.rate == 0 for account in self.accounts.values()):
+            data["cumulative_total"] += opening
+            return data
+
+        with stage("compound_interest"):
+            dates, _, interest = self._ledger(window_end)
+            interest = interest.sum(axis=1)
+            in_window = numpy.ones(len(dates), dtype=bool) if (window_start is None) else (dates >= window_start)
+            interest_before = float(interest[~in_window].sum())
+            dates = dates[in_window]
+            if granularity != DAILY:
+                dates = _bucket_labels(_bucket_numbers(dates, granularity), granularity)
+            values = Series(interest[in_window], index=dates).groupby(level=0).sum()
+            values = values.reindex(data.index, fill_value=0.00).to_numpy()
+
+            data.insert(len(data.columns) - 2, INTEREST_COLUMN, values, allow_duplicates=True)
+            data[total_column] += values
+            data["cumulative_total"] += opening + interest_before + values.cumsum()
+            return data
+
+    def as_accounts(self, start=None, end=None, granularity: str = DAILY) -> DataFrame:
+        """Calculates the balance of each account.
+
+        The budgets without `accounts` have single 'main' account without
+        interest, whose balance is the cumulative total.
+
+        Args:
+            start: Leave out the dates before this one, if set.
+            end: Leave out the dates after this one, if set.
+            granularity: One of `GRANULARITIES`, the rollups have the balances at the end of each bucket.
+
+        Returns:
+            DataFrame with column for the balance of each account.
+
+        Raises:
+            ValueError: Raised if the granularity is not supported, the window start is after its end,
+                or any of the events uses unknown account.
+        """
+
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity {granularity!r}, expected one of {GRANULARITIES}!")
+        window_start, window_end = _parse_window(start, end)
+        with stage("build_ledger"):
+            dates, balances, _ = self._ledger(window_end)
+            data = DataFrame(balances, index=dates, columns=list(self._ledger_accounts()))
+            data = data.loc[window_start:]
+            if granularity != DAILY:
+                data = data.groupby(_bucket_labels(_bucket_numbers(data.index, granularity), granularity)).last()
+            data.index.rename("date", inplace=True)
+            return data
+
+    def as_rolling(self, start=None, end=None, granularity: str = DAILY) -> DataFrame:
+        """Calculates the rolling spend, the average daily burn and the runway on each date.
+
+        The 'spend_<days>d' columns are the expenses of the trailing 7, 30 and
+        90 days. The 'daily_burn' is the average daily decrease of the
+        cumulative total over the trailing 30 days, and the 'runway_days' is
+        the number of days until the cumulative total reaches zero at that
+        burn. The runway is zero while the total is not positive, and missing
+        while the total doesn't decrease.
+
+        Each window is the difference of two prefix sums of the dates since
+        the period start, so all of them are calculated in linear time. The
+        windows at the start of the period are shorter.
+
+        Args:
+            start: Leave out the dates before this one, if set.
+            end: Leave out the dates after this one, if set.
+            granularity: One of `GRANULARITIES`, the rollups have the values at the end of each bucket.
+
+        Returns:
+            DataFrame with the `ROLLING_COLUMNS`.
+
+        Raises:
+            ValueError: Raised if the granularity is not supported, the window start is after its end,
+                or any of the events uses unknown account.
+        """
+
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity {granularity!r}, expected one of {GRANULARITIES}!")
+        window_start, window_end = _parse_window(start, end)
+        balances = self.as_accounts(None, end).sum(axis=1)
+        with stage("rolling_stats"):
+            spend = self._grouped_frame(DAILY, None, window_end, self.events.expense_grouping("spend"))["spend"]
+            dates = spend.index
+            balance = balances.reindex(dates, method="ffill").to_numpy()
+
+            # the prefix sums start with the values before the first date
+            positions = numpy.arange(1, len(dates) + 1)
+            spend_prefix = numpy.concatenate([[0.0], spend.to_numpy().cumsum()])
+            opening = sum(account.opening for account in self.accounts.values())
+            balance_prefix = numpy.concatenate([[opening], balance])
+
+            data = DataFrame(index=dates)
+            for days in ROLLING_WINDOWS:
+                data[f"spend_{days}d"] = spend_prefix[positions] - spend_prefix[_trailing_starts(dates, days)]
+
+            day_numbers = dates.values.astype("datetime64[D]").astype(numpy.int64)
+            elapsed = (day_numbers - day_numbers[0] + 1) if len(dates) else day_numbers
+            burn = balance_prefix[_trailing_starts(dates, BURN_WINDOW)] - balance
+            burn = burn / numpy.minimum(elapsed, BURN_WINDOW)
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                runway = numpy.where(burn > 0, balance / burn, numpy.nan)
+            data[BURN_COLUMN] = burn
+            data[RUNWAY_COLUMN] = numpy.where(balance > 0, runway, 0.0)
+
+            data = data.loc[window_start:]
+            if granularity != DAILY:
+                data = data.groupby(_bucket_labels(_bucket_numbers(data.index, granularity), granularity)).last()
+            data.index.rename("date", inplace=True)
+            return data
+
+    def _export_frame(self, start, end, granularity: str, accounts: bool, rolling: bool = False) -> DataFrame:
+        """Returns the breakdown for export, with the account balances and the rolling statistics if selected."""
+
+        data = self.as_rollup(granularity, start, end)
+        if accounts:
+            balances = self.as_accounts(start, end, granularity).reindex(data.index, method="ffill")
+            data = concat([data, balances.add_suffix(BALANCE_SUFFIX)], axis=1)
+        if rolling:
+            statistics = self.as_rolling(start, end, granularity).reindex(data.index, method="ffill")
+            data = concat([data, statistics], axis=1)
+        return data
+
+    def as_weekly(self, start=None, end=None) -> DataFrame:
+        """Returns the breakdown summed by week, see `as_rollup`."""
+
+        return self.as_rollup(WEEKLY, start, end)
+
+    def as_monthly(self, start=None, end=None) -> DataFrame:
+        """Returns the breakdown summed by month, see `as_rollup`."""
+
+        return self.as_rollup(MONTHLY, start, end)
+
+    def as_yearly(self, start=None, end=None) -> DataFrame:
+        """Returns the breakdown summed by year, see `as_rollup`."""
+
+        return self.as_rollup(YEARLY, start, end)
+
+    def write_csv(
+            self,
+            stream: BinaryIO,
+            start=None,
+            end=None,
+            granularity: str = DAILY,
+            accounts: bool = False,
+            rolling: bool = False,
+    ):
+        """Writes the breakdown data as CSV to binary stream, see `as_rollup` for the options.
+
+        With 'accounts' the balance of each account is added as '<account>_balance' column, see `as_accounts`.
+        With 'rolling' the `ROLLING_COLUMNS` are added last, see `as_rolling`.
+        """
+
+        data = self._export_frame(start, end, granularity, accounts, rolling)
+        with stage("export_csv"):
+            data.to_csv(
+                stream,
+                float_format="%.2f",
+                index=True,
+                index_label="date",
+                mode="b",
+                encoding="utf-8",
+                errors="surrogateescape",
+                line_terminator="\n",
+                date_format="%Y-%m-%d",
+            )
+
+    def to_csv(
+            self,
+            start=None,
+            end=None,
+            granularity: str = DAILY,
+            accounts: bool = False,
+            rolling: bool = False,
+    ) -> bytes:
+        """Returns the breakdown data as CSV bytes, see `write_csv` for the options."""
 
         buffer = BytesIO()
-        data = self.as_dataframe()
-        data.to_csv(
-            buffer,
-            float_format="%.2f",
-            index=True,
-            index_label="date",
-            mode="b",
-            encoding="utf-8",
-            errors="surrogateescape",
-            line_terminator="\n",
-            date_format="%Y-%m-%d",
-        )
+        self.write_csv(buffer, start, end, granularity, accounts, rolling)
         return buffer.getvalue()
 
-    def to_txt(self) -> str:
-        """Returns the budget breakdown data as text table."""
+    def to_txt(
+            self,
+            start=None,
+            end=None,
+            granularity: str = DAILY,
+            accounts: bool = False,
+            rolling: bool = False,
+    ) -> str:
+        """Returns the budget breakdown data as text table, see `write_csv` for the options."""
+
+        buffer = BytesIO()
+        self.write_txt(buffer, start, end, granularity, accounts, rolling)
+        return buffer.getvalue().decode("utf-8", errors="surrogateescape")
+
+    def write_txt(
+            self,
+            stream: BinaryIO,
+            start=None,
+            end=None,
+            granularity: str = DAILY,
+            accounts: bool = False,
+            rolling: bool = False,
+    ):
+        """Writes the breakdown data as text table to binary stream, see `write_csv` for the options.
 
-        data = self.as_dataframe()
-        return str(data)
+        The table is laid out as the text of the DataFrame, but it's formatted
+        and written in chunks of rows, so the whole text is never held in memory.
+        """
+
+        data = self._export_frame(start, end, granularity, accounts, rolling)
+        with stage("export_txt"):
+            _write_text_table(stream, data)
 
-    def to_xlsx(self) -> bytes:
-        """Returns XLSX document containing table with the breakdown data."""
+    def to_xlsx(
+            self,
+            start=None,
+            end=None,
+            granularity: str = DAILY,
+            categories: bool = False,
+            accounts: bool = False,
+            rolling: bool = False,
+    ) -> bytes:
+        """Returns XLSX document containing table with the breakdown data, see `write_csv` for the options.
+
+        With 'categories' the document has second sheet with the breakdown by category, see `as_categories`.
+        """
 
-        data = self.as_dataframe()
-        return generate_xlsx(data)
+        data = self._export_frame(start, end, granularity, accounts, rolling)
+        category_data = self.as_categories(start, end, granularity) if categories else None
+        with stage("export_xlsx"):
+            return generate_xlsx(data, categories=category_data)
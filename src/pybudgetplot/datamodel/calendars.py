@@ -0,0 +1,194 @@
+"""This module defines the business-day calendars and the roll conventions of the event dates.
+
+The holidays are read from local definition files, with one ISO-format date
+per line and optional name after it, for example:
+
+    # weekmask: 1111100
+    2021-01-01 New Year's Day
+    2021-03-03 Liberation Day
+
+The optional 'weekmask' comment sets the business days of the week, from
+Monday to Sunday. Each calendar precomputes its `numpy.busdaycalendar`, so
+the business days of many dates are checked or rolled with one call.
+"""
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy
+
+from pybudgetplot.datamodel.event import parse_string
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+FOLLOWING = "following"
+PRECEDING = "preceding"
+MODIFIED_FOLLOWING = "modified following"
+
+# the numpy roll of each convention
+CONVENTIONS = {FOLLOWING: "following", PRECEDING: "preceding", MODIFIED_FOLLOWING: "modifiedfollowing"}
+
+# the business days of the week from Monday to Sunday, if not set
+WEEKMASK = "1111100"
+
+_WEEKMASK_LINE = re.compile(r"^#\s*weekmask\s*:\s*(?P<weekmask>[01]{7})\s*$", re.IGNORECASE)
+
+
+def parse_convention(value: Any) -> str:
+    """Parses roll convention, one of `CONVENTIONS`, e.g. 'Modified-Following'.
+
+    Raises:
+        ValueError: Raised if the convention is not supported.
+    """
+
+    convention = " ".join(str(value).replace("-", " ").lower().split())
+    if convention == "modifiedfollowing":
+        convention = MODIFIED_FOLLOWING
+    if convention not in CONVENTIONS:
+        raise ValueError(f"Unsupported roll convention {value!r}, expected one of {tuple(CONVENTIONS)}!")
+    return convention
+
+
+def _as_days(dates) -> numpy.ndarray:
+    return numpy.asarray(dates).astype("datetime64[D]")
+
+
+class Calendar:
+    """Represents the business days: the days of the weekmask that are not holidays.
+
+    The 'source' is the holiday definition file the calendar was read from,
+    if any, and is not compared. The instances are immutable and hashable.
+    """
+
+    __slots__ = ("holidays", "weekmask", "source", "busdaycalendar", "_hash")
+
+    holidays: Tuple[str, ...]
+    weekmask: str
+    source: Optional[str]
+    busdaycalendar: numpy.busdaycalendar
+
+    def __init__(self, holidays: Iterable[Any] = (), weekmask: str = WEEKMASK, source: Optional[str] = None):
+        """Class constructor.
+
+        Args:
+            holidays: The dates that are not business days.
+            weekmask: The business days of the week from Monday to Sunday, e.g. '1111100'.
+            source: The holiday definition file, if any.
+
+        Raises:
+            ValueError: Raised if any of the holidays is not a date or the weekmask is invalid.
+        """
+
+        try:
+            days = numpy.unique(numpy.array([str(holiday) for holiday in holidays], dtype="datetime64[D]"))
+            busdaycalendar = numpy.busdaycalendar(weekmask=weekmask, holidays=days)
+        except (TypeError, ValueError) as ex:
+            raise ValueError(f"Invalid holidays or weekmask {weekmask!r}!") from ex
+
+        # the weekends are left out of the precomputed holidays
+        holidays = tuple(str(day) for day in busdaycalendar.holidays)
+        weekmask = "".join("1" if day else "0" for day in busdaycalendar.weekmask)
+        object.__setattr__(self, "holidays", holidays)
+        object.__setattr__(self, "weekmask", weekmask)
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "busdaycalendar", busdaycalendar)
+        object.__setattr__(self, "_hash", hash((holidays, weekmask)))
+
+    @classmethod
+    def from_text(cls, text: str, source: Optional[str] = None) -> "Calendar":
+        """Creates new Calendar from the contents of holiday definition file.
+
+        Raises:
+            ValueError: Raised if any of the lines doesn't start with date.
+        """
+
+        holidays = []
+        weekmask = WEEKMASK
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            line = line.strip()
+            match = _WEEKMASK_LINE.match(line)
+            if match:
+                weekmask = match.group("weekmask")
+            elif line and not line.startswith("#"):
+                holiday = line.split(maxsplit=1)[0]
+                try:
+                    numpy.datetime64(holiday, "D")
+                except ValueError as ex:
+                    raise ValueError(f"Line {line_number} of the holidays doesn't start with date!") from ex
+                holidays.append(holiday)
+        return cls(holidays, weekmask, source)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __reduce__(self):
+        return type(self), (self.holidays, self.weekmask, self.source)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Calendar):
+            return (self.holidays == other.holidays) and (self.weekmask == other.weekmask)
+        return False
+
+    def __repr__(self) -> str:
+        return "%s(holidays=%r, weekmask=%r, source=%r)" % (
+            type(self).__name__,
+            self.holidays,
+            self.weekmask,
+            self.source,
+        )
+
+    def is_business_day(self, dates) -> numpy.ndarray:
+        """Returns boolean array which is True for the dates that are business days."""
+
+        return numpy.is_busday(_as_days(dates), busdaycal=self.busdaycalendar)
+
+    def roll(self, dates, convention: str) -> numpy.ndarray:
+        """Moves each of the dates that is not a business day to one by the convention.
+
+        Args:
+            dates: The dates, e.g. array of 'datetime64[D]'.
+            convention: One of `CONVENTIONS`.
+
+        Returns:
+            Array with the rolled 'datetime64[D]' dates.
+        """
+
+        return numpy.busday_offset(_as_days(dates), 0, roll=CONVENTIONS[convention], busdaycal=self.busdaycalendar)
+
+
+@lru_cache(maxsize=64)
+def _read_calendar(file: Path, modified: int, source: str) -> Calendar:
+    _log.debug("reading holidays %r, modified at %d", str(file), modified)
+    return Calendar.from_text(file.read_text(encoding="utf-8"), source)
+
+
+def load_calendar(source: Any, base_dir: Optional[Path] = None) -> Calendar:
+    """Loads the calendar from holiday definition file, see the module docs for the format.
+
+    The calendars are cached until their file changes, so the budgets that
+    use the same file share the same precomputed calendar.
+
+    Args:
+        source: The file path, relative to the base dir.
+        base_dir: The dir of the relative paths, the current dir if None.
+
+    Returns:
+        The Calendar, with the source as given.
+
+    Raises:
+        OSError: Raised if the file can't be read.
+        ValueError: Raised if the file contents are invalid.
+    """
+
+    source = parse_string(source)
+    file = Path(base_dir or ".").joinpath(source).absolute().resolve()
+    return _read_calendar(file, file.stat().st_mtime_ns, source)
@@ -1,10 +1,19 @@
 """This module defines the data and logic for processing an event definition."""
 import re
-from typing import Any
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy
+from pandas import Series, to_numeric
 
 REGEX_WS_FLAGS = re.DOTALL | re.IGNORECASE | re.MULTILINE
 REGEX_WS_PATTERN = re.compile(r"\s+", REGEX_WS_FLAGS)
 
+# the names of the event attributes, in the order of the constructor arguments
+_FIELDS = ("description", "amount", "frequency", "category", "tags", "account", "transfer_to")
+
+# the attributes included in the repr only if set
+_OPTIONAL_FIELDS = _FIELDS[3:]
+
 
 def parse_string(value: Any) -> str:
     """Converts a value to string.
@@ -49,39 +58,188 @@ def parse_amount(value) -> float:
         raise ValueError(value) from ex
 
 
+def parse_strings(values: Iterable[Any]) -> numpy.ndarray:
+    """Converts many values to strings at once, like `parse_string`.
+
+    Args:
+        values: Event descriptions or frequencies.
+
+    Returns:
+        Object array with the non-empty, stripped strings with normalized whitespaces.
+
+    Raises:
+        ValueError: Raised with the first value whose result is empty string.
+    """
+
+    source = Series(list(values), dtype=object)
+    result = source.astype(str).str.replace(REGEX_WS_PATTERN, " ", regex=True).str.strip()
+    empty = (result == "").to_numpy()
+    if empty.any():
+        raise ValueError(source[empty].iloc[0])
+    return result.to_numpy(dtype=object)
+
+
+def parse_amounts(values: Iterable[Any]) -> numpy.ndarray:
+    """Parses many amount values to floats at once, like `parse_amount`.
+
+    Args:
+        values: Event amounts.
+
+    Returns:
+        The parsed float64 array.
+
+    Raises:
+        ValueError: Raised with the first value that could not be parsed.
+    """
+
+    source = Series(list(values), dtype=object)
+    result = to_numeric(source, errors="coerce").to_numpy(dtype=numpy.float64)
+
+    # values like None or 'nan' give NaN, leave their validation to `parse_amount`
+    for position in numpy.flatnonzero(numpy.isnan(result)):
+        result[position] = parse_amount(source.iloc[position])
+    return result
+
+
+def parse_optional_string(value: Any) -> Optional[str]:
+    """Parses optional string value, e.g. category or account name, see `parse_string`."""
+
+    return None if (value is None) else parse_string(value)
+
+
+def parse_tags(value: Any) -> Tuple[str, ...]:
+    """Parses optional tags value.
+
+    Args:
+        value: None, comma-separated string or iterable with the tags.
+
+    Returns:
+        Tuple with the unique tags, in their original order.
+
+    Raises:
+        ValueError: Raised if any of the tags is empty string.
+    """
+
+    if value is None:
+        return ()
+    values = value.split(",") if isinstance(value, str) else value
+    return tuple(dict.fromkeys(parse_string(tag) for tag in values))
+
+
 class Event:
-    """Represents the data-definition of recurring 'budget-event'."""
+    """Represents the data-definition of recurring 'budget-event'.
+
+    Each occurrence adds the amount to the event account, or moves it from
+    the event account to the 'transfer_to' account.
+
+    The instances are immutable and hashable, so they can be used as keys of
+    the cached calculations.
+    """
+
+    __slots__ = _FIELDS + ("_hash",)
 
     description: str
     amount: float
     frequency: str
+    category: Optional[str]
+    tags: Tuple[str, ...]
+    account: Optional[str]
+    transfer_to: Optional[str]
 
-    def __init__(self, description, amount, frequency):
+    def __init__(self, description, amount, frequency, category=None, tags=None, account=None, transfer_to=None):
         """Class constructor.
 
         Args:
             description: String with the event description.
             amount: Amount of money that comes or goes with each occurrence.
             frequency: String describing the frequency of the event occurrences.
+            category: Optional name of the category of the event.
+            tags: Optional comma-separated string or iterable with the event tags.
+            account: Optional name of the event account, the default account if None.
+            transfer_to: Optional name of the account that receives the amount.
+
+        Raises:
+            ValueError: Raised if any of the values is invalid or the event transfers to its own account.
         """
 
-        self.description = parse_string(description)
-        self.amount = parse_amount(amount)
-        self.frequency = parse_string(frequency)
+        account = parse_optional_string(account)
+        transfer_to = parse_optional_string(transfer_to)
+        if (transfer_to is not None) and (transfer_to == account):
+            raise ValueError(f"The event can't transfer to its own account {account!r}!")
+
+        self._init(
+            parse_string(description),
+            parse_amount(amount),
+            parse_string(frequency),
+            parse_optional_string(category),
+            parse_tags(tags),
+            account,
+            transfer_to,
+        )
+
+    def _init(self, *values):
+        for name, value in zip(_FIELDS, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_hash", hash(values))
+
+    @classmethod
+    def _from_parsed(
+            cls,
+            description: str,
+            amount: float,
+            frequency: str,
+            category: Optional[str] = None,
+            tags: Tuple[str, ...] = (),
+            account: Optional[str] = None,
+            transfer_to: Optional[str] = None,
+    ) -> "Event":
+        """Creates Event from already parsed values, skipping the parsing."""
+
+        event = cls.__new__(cls)
+        event._init(description, amount, frequency, category, tags, account, transfer_to)
+        return event
+
+    @property
+    def is_transfer(self) -> bool:
+        """Checks if the event moves its amount between two accounts."""
+
+        return self.transfer_to is not None
+
+    @property
+    def net_amount(self) -> float:
+        """The change of the budget total with each occurrence, zero for transfers."""
+
+        return 0.0 if self.is_transfer else self.amount
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in _FIELDS)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __reduce__(self):
+        return type(self), self._values()
 
     def __repr__(self) -> str:
-        return "%s(description=%r, amount=%r, frequency=%r)" % (
+        result = "%s(description=%r, amount=%r, frequency=%r" % (
             type(self).__name__,
             self.description,
             self.amount,
             self.frequency,
         )
+        for name in _OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value:
+                result += ", %s=%r" % (name, value)
+        return result + ")"
+
+    def __hash__(self) -> int:
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if isinstance(other, Event):
-            return (
-                    (self.description == other.description)
-                    and (self.amount == other.amount)
-                    and (self.frequency == other.frequency)
-            )
+            return (self._hash == other._hash) and (self._values() == other._values())
         return False
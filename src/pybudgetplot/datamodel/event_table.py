@@ -0,0 +1,631 @@
+"""This module defines the columnar storage of the budget events.
+
+The `EventTable` keeps the events as columns instead of `Event` objects:
+
+- the descriptions, the frequencies, the categories and the sets of tags
+  are interned, each row stores only the integer code of its value;
+- the amounts are stored in float64 array.
+
+The `Event` objects are created on access, so the table can be used as the
+list of events of a budget:
+
+    >>> table = EventTable.from_dict({"Rent": {"amount": -450, "frequency": "every month"}})
+    >>> table.append(Event("Food", -15, "every day"))
+    >>> table[1]
+    Event(description='Food', amount=-15.0, frequency='every day')
+"""
+from collections.abc import MutableSequence
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy
+from pandas import Categorical, DataFrame, factorize, read_csv
+
+from pybudgetplot.datamodel.event import Event, parse_amounts, parse_strings, parse_tags
+
+# the minimal number of rows allocated for the columns
+INITIAL_CAPACITY = 16
+
+# the names of the columns used by `from_dataframe`, `from_csv` and `to_dataframe`
+EVENT_COLUMNS = ("description", "amount", "frequency")
+
+# the names of the optional columns used by `from_dataframe`, `from_csv` and `to_dataframe`
+OPTIONAL_COLUMNS = ("category", "tags", "account", "transfer_to")
+
+# the category of the events without one, in the category groups
+UNCATEGORIZED = "(uncategorized)"
+
+# the code of missing category or account
+_MISSING = -1
+
+# the names of the column arrays, in the order of `_row`
+_COLUMNS = (
+    "_description_codes",
+    "_amounts",
+    "_frequency_codes",
+    "_category_codes",
+    "_tags_codes",
+    "_account_codes",
+    "_transfer_codes",
+)
+
+
+class Grouping(NamedTuple):
+    """Sparse (events x groups) matrix in coordinate format.
+
+    The amount of the event at each of the 'positions' is added to the group
+    with the code at the same place in 'groups', multiplied by the weight.
+    """
+
+    positions: numpy.ndarray
+    groups: numpy.ndarray
+    weights: numpy.ndarray
+    names: List[str]
+
+
+# grouping without groups, e.g. for calculating only the totals
+EMPTY_GROUPING = Grouping(numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0), [])
+
+
+class _StringPool:
+    """Interned strings (or tuples of strings), each identified by its integer code."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: Sequence[Any] = ()):
+        self.values: List[Any] = list(values)
+        self.codes: Dict[Any, int] = {value: code for (code, value) in enumerate(self.values)}
+
+    def intern(self, value: Any) -> int:
+        """Returns the code of the value, adding it to the pool if missing."""
+
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _none_if_missing(value: Any) -> Any:
+    """Returns None for the missing values of the CSV and DataFrame columns."""
+
+    if (value is None) or (isinstance(value, float) and numpy.isnan(value)) or (value == ""):
+        return None
+    return value
+
+
+def _parse_optional_strings(values: Optional[Iterable[Any]], size: int) -> numpy.ndarray:
+    """Parses the optional strings, e.g. categories, the missing values (or column) are None."""
+
+    if values is None:
+        return numpy.full(size, None, dtype=object)
+    result = numpy.array([_none_if_missing(value) for value in values], dtype=object)
+    present = numpy.array([value is not None for value in result], dtype=bool)
+    if present.any():
+        result[present] = parse_strings(result[present])
+    return result
+
+
+class EventTable(MutableSequence):
+    """Columnar list of events."""
+
+    def __init__(self, events: Iterable[Event] = ()):
+        """Class constructor.
+
+        Args:
+            events: The initial events.
+        """
+
+        self._descriptions = _StringPool()
+        self._frequencies = _StringPool()
+        self._categories = _StringPool()
+        self._tag_sets = _StringPool([()])
+        self._accounts = _StringPool()
+        self._description_codes = numpy.zeros(INITIAL_CAPACITY, dtype=numpy.int64)
+        self._amounts = numpy.zeros(INITIAL_CAPACITY, dtype=numpy.float64)
+        self._frequency_codes = numpy.zeros(INITIAL_CAPACITY, dtype=numpy.int64)
+        self._category_codes = numpy.full(INITIAL_CAPACITY, _MISSING, dtype=numpy.int64)
+        self._tags_codes = numpy.zeros(INITIAL_CAPACITY, dtype=numpy.int64)
+        self._account_codes = numpy.full(INITIAL_CAPACITY, _MISSING, dtype=numpy.int64)
+        self._transfer_codes = numpy.full(INITIAL_CAPACITY, _MISSING, dtype=numpy.int64)
+        self._size = 0
+        self._version = 0
+        self._index: Optional[Dict[str, List[int]]] = None
+        for event in events:
+            self.append(event)
+
+    @classmethod
+    def from_columns(
+            cls,
+            descriptions: Iterable[Any],
+            amounts: Iterable[Any],
+            frequencies: Iterable[Any],
+            categories: Optional[Iterable[Any]] = None,
+            tags: Optional[Iterable[Any]] = None,
+            accounts: Optional[Iterable[Any]] = None,
+            transfers: Optional[Iterable[Any]] = None,
+    ) -> "EventTable":
+        """Creates new table from the column values, validating them at once.
+
+        Args:
+            descriptions: The event descriptions.
+            amounts: The event amounts.
+            frequencies: The event frequencies.
+            categories: The optional event categories, None for events without one.
+            tags: The optional event tags, see `parse_tags`.
+            accounts: The optional event accounts, None for the default account.
+            transfers: The optional accounts that receive the event amounts, None for non-transfers.
+
+        Returns:
+            The new EventTable instance.
+
+        Raises:
+            ValueError: Raised if the columns have different lengths, any value is invalid or any event
+                transfers to its own account.
+        """
+
+        description_values = parse_strings(descriptions)
+        amount_values = parse_amounts(amounts)
+        frequency_values = parse_strings(frequencies)
+        size = len(amount_values)
+        category_values = _parse_optional_strings(categories, size)
+        tag_sets = [()] * size if (tags is None) else [parse_tags(_none_if_missing(value)) for value in tags]
+        account_values = _parse_optional_strings(accounts, size)
+        transfer_values = _parse_optional_strings(transfers, size)
+        lengths = {len(values) for values in (description_values, frequency_values, category_values, tag_sets)}
+        if lengths.union((len(account_values), len(transfer_values))) != {size}:
+            raise ValueError("The event columns must have the same length!")
+        own_transfers = [
+            description
+            for (description, account, transfer) in zip(description_values, account_values, transfer_values)
+            if (transfer is not None) and (transfer == account)
+        ]
+        if own_transfers:
+            raise ValueError(f"The events {own_transfers!r} can't transfer to their own account!")
+
+        description_codes, description_uniques = factorize(description_values)
+        frequency_codes, frequency_uniques = factorize(frequency_values)
+        category_codes, category_uniques = factorize(category_values)
+        account_codes, account_uniques = factorize(numpy.concatenate([account_values, transfer_values]))
+
+        result = cls()
+        result._descriptions = _StringPool(description_uniques)
+        result._frequencies = _StringPool(frequency_uniques)
+        result._categories = _StringPool(category_uniques)
+        result._accounts = _StringPool(account_uniques)
+        result._description_codes = description_codes.astype(numpy.int64)
+        result._amounts = amount_values
+        result._frequency_codes = frequency_codes.astype(numpy.int64)
+        result._category_codes = category_codes.astype(numpy.int64)
+        result._tags_codes = numpy.array([result._tag_sets.intern(value) for value in tag_sets], dtype=numpy.int64)
+        result._account_codes = account_codes[:size].astype(numpy.int64)
+        result._transfer_codes = account_codes[size:].astype(numpy.int64)
+        result._size = size
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Mapping[Any, Mapping[str, Any]]) -> "EventTable":
+        """Creates new table from the 'EVENTS' section of budget definition.
+
+        Args:
+            data: Dict with the 'amount', 'frequency' and the optional 'category',
+                'tags', 'account' and 'transfer_to' of the events, by description.
+
+        Returns:
+            The new EventTable instance.
+        """
+
+        amounts = [event["amount"] for event in data.values()]
+        frequencies = [event["frequency"] for event in data.values()]
+        categories = [event.get("category") for event in data.values()]
+        tags = [event.get("tags") for event in data.values()]
+        accounts = [event.get("account") for event in data.values()]
+        transfers = [event.get("transfer_to") for event in data.values()]
+        return cls.from_columns(data.keys(), amounts, frequencies, categories, tags, accounts, transfers)
+
+    @classmethod
+    def from_dataframe(cls, data: DataFrame) -> "EventTable":
+        """Creates new table from DataFrame with 'description', 'amount' and 'frequency' columns.
+
+        The `OPTIONAL_COLUMNS` may be left out, their empty values are missing.
+
+        Raises:
+            KeyError: Raised if any of the required columns is missing.
+        """
+
+        missing = [column for column in EVENT_COLUMNS if column not in data.columns]
+        if missing:
+            raise KeyError(missing)
+        return cls.from_columns(
+            data["description"],
+            data["amount"],
+            data["frequency"],
+            *(data[column] if (column in data.columns) else None for column in OPTIONAL_COLUMNS),
+        )
+
+    @classmethod
+    def from_csv(cls, file: Union[str, Path, bytes, StringIO, BytesIO]) -> "EventTable":
+        """Creates new table from CSV file with 'description', 'amount' and 'frequency' columns.
+
+        Args:
+            file: The CSV file path or buffer, or the CSV document as bytes.
+
+        Returns:
+            The new EventTable instance.
+        """
+
+        if isinstance(file, bytes):
+            file = BytesIO(file)
+        data = read_csv(file, dtype=str, keep_default_na=False, encoding="utf-8")
+        return cls.from_dataframe(data)
+
+    def to_dataframe(self) -> DataFrame:
+        """Returns DataFrame with the event columns, the tags are comma-separated."""
+
+        return DataFrame(
+            {
+                "description": self.descriptions,
+                "amount": self.amounts,
+                "frequency": self.frequencies,
+                "category": self.category_list(),
+                "tags": [",".join(tags) for tags in self.tags_list()],
+                "account": self.account_list(),
+                "transfer_to": self.transfer_list(),
+            },
+            columns=list(EVENT_COLUMNS + OPTIONAL_COLUMNS),
+        )
+
+    @property
+    def descriptions(self) -> Categorical:
+        """The descriptions of the events."""
+
+        codes = self._description_codes[:self._size]
+        return Categorical.from_codes(codes, categories=self._descriptions.values)
+
+    @property
+    def amounts(self) -> numpy.ndarray:
+        """Read-only array with the amounts of the events."""
+
+        result = self._amounts[:self._size]
+        result.flags.writeable = False
+        return result
+
+    @property
+    def net_amounts(self) -> numpy.ndarray:
+        """Array with the change of the budget total by each event, zero for the transfers."""
+
+        return numpy.where(self._transfer_codes[:self._size] == _MISSING, self._amounts[:self._size], 0.0)
+
+    @property
+    def frequencies(self) -> Categorical:
+        """The frequencies of the events."""
+
+        return Categorical.from_codes(self.frequency_codes, categories=self._frequencies.values)
+
+    @property
+    def frequency_codes(self) -> numpy.ndarray:
+        """Read-only array with the codes of the event frequencies, see `unique_frequencies`."""
+
+        result = self._frequency_codes[:self._size]
+        result.flags.writeable = False
+        return result
+
+    @property
+    def unique_frequencies(self) -> List[str]:
+        """The interned frequencies, the codes are positions in this list."""
+
+        return list(self._frequencies.values)
+
+    @property
+    def version(self) -> int:
+        """Counter increased by each change of the events."""
+
+        return self._version
+
+    def _description_index(self) -> Dict[str, List[int]]:
+        """Returns the positions of the events by description, building them if missing."""
+
+        if self._index is None:
+            index: Dict[str, List[int]] = {}
+            for position, description in enumerate(self.description_list()):
+                index.setdefault(description, []).append(position)
+            self._index = index
+        return self._index
+
+    def positions(self, description: str) -> List[int]:
+        """Returns the positions of the events with the description."""
+
+        return list(self._description_index().get(description, ()))
+
+    def index_of(self, description: str) -> int:
+        """Returns the position of the only event with the description.
+
+        Raises:
+            KeyError: Raised if there is no event with the description.
+            ValueError: Raised if more than one event has the description.
+        """
+
+        positions = self._description_index().get(description)
+        if not positions:
+            raise KeyError(description)
+        if len(positions) > 1:
+            raise ValueError(f"{len(positions)} events have description {description!r}!")
+        return positions[0]
+
+    def duplicate_descriptions(self) -> List[str]:
+        """Returns the descriptions shared by more than one event."""
+
+        return [description for (description, positions) in self._description_index().items() if len(positions) > 1]
+
+    def description_list(self) -> List[str]:
+        """Returns list with the event descriptions."""
+
+        values = self._descriptions.values
+        return [values[code] for code in self._description_codes[:self._size].tolist()]
+
+    def frequency_list(self) -> List[str]:
+        """Returns list with the event frequencies."""
+
+        values = self._frequencies.values
+        return [values[code] for code in self._frequency_codes[:self._size].tolist()]
+
+    def category_list(self) -> List[Optional[str]]:
+        """Returns list with the event categories, None for events without one."""
+
+        values = self._categories.values
+        return [None if (code == _MISSING) else values[code] for code in self._category_codes[:self._size].tolist()]
+
+    def tags_list(self) -> List[Tuple[str, ...]]:
+        """Returns list with the event tags."""
+
+        values = self._tag_sets.values
+        return [values[code] for code in self._tags_codes[:self._size].tolist()]
+
+    def account_list(self) -> List[Optional[str]]:
+        """Returns list with the event accounts, None for the default account."""
+
+        values = self._accounts.values
+        return [None if (code == _MISSING) else values[code] for code in self._account_codes[:self._size].tolist()]
+
+    def transfer_list(self) -> List[Optional[str]]:
+        """Returns list with the accounts that receive the event amounts, None for non-transfers."""
+
+        values = self._accounts.values
+        return [None if (code == _MISSING) else values[code] for code in self._transfer_codes[:self._size].tolist()]
+
+    def account_names(self) -> List[str]:
+        """Returns the names of the accounts used by the events, in order of appearance."""
+
+        used = numpy.concatenate([self._account_codes[:self._size], self._transfer_codes[:self._size]])
+        return [self._accounts.values[code] for code in sorted(set(used.tolist()) - {_MISSING})]
+
+    def has_categories(self) -> bool:
+        """Checks if any of the events has category."""
+
+        return bool((self._category_codes[:self._size] != _MISSING).any())
+
+    def has_transfers(self) -> bool:
+        """Checks if any of the events is transfer."""
+
+        return bool((self._transfer_codes[:self._size] != _MISSING).any())
+
+    def _net_weights(self, positions: numpy.ndarray) -> numpy.ndarray:
+        """Returns the weights of the events at the positions, zero for the transfers."""
+
+        return (self._transfer_codes[positions] == _MISSING).astype(numpy.float64)
+
+    def identity_grouping(self) -> Grouping:
+        """Returns the events grouped one per group, named by their descriptions."""
+
+        positions = numpy.arange(self._size)
+        return Grouping(positions, positions, self._net_weights(positions), self.description_list())
+
+    def expense_grouping(self, name: str) -> Grouping:
+        """Returns the expenses in single group with the name, as positive amounts.
+
+        The transfers between accounts are not expenses.
+        """
+
+        positions = numpy.flatnonzero(self.net_amounts < 0)
+        groups = numpy.zeros(len(positions), dtype=numpy.int64)
+        return Grouping(positions, groups, -self._net_weights(positions), [name])
+
+    def category_grouping(self) -> Grouping:
+        """Returns the events grouped by category.
+
+        Each event belongs to exactly one group, the events without category
+        are in the `UNCATEGORIZED` group, which is last.
+        """
+
+        codes = self._category_codes[:self._size]
+        used, group_codes = numpy.unique(codes, return_inverse=True)
+        names = [UNCATEGORIZED if (code == _MISSING) else self._categories.values[code] for code in used.tolist()]
+        if names and (names[0] == UNCATEGORIZED):
+            # move the uncategorized group from first to last
+            names = names[1:] + names[:1]
+            group_codes = (group_codes - 1) % len(names)
+        positions = numpy.arange(self._size)
+        return Grouping(positions, group_codes.astype(numpy.int64), self._net_weights(positions), names)
+
+    def tag_grouping(self) -> Grouping:
+        """Returns the events grouped by tag, in order of appearance.
+
+        Each event belongs to the groups of all its tags, so the groups may
+        overlap and the events without tags are in none.
+        """
+
+        codes = self._tags_codes[:self._size]
+        tag_codes: Dict[str, int] = {}
+        positions = []
+        groups = []
+        for tags_code in numpy.unique(codes).tolist():
+            events = numpy.flatnonzero(codes == tags_code)
+            for tag in self._tag_sets.values[tags_code]:
+                positions.append(events)
+                groups.append(numpy.full(len(events), tag_codes.setdefault(tag, len(tag_codes)), dtype=numpy.int64))
+        if not positions:
+            return EMPTY_GROUPING
+        positions = numpy.concatenate(positions)
+        return Grouping(positions, numpy.concatenate(groups), self._net_weights(positions), list(tag_codes))
+
+    def account_grouping(self, names: Sequence[str]) -> Grouping:
+        """Returns the flows of the events grouped by account.
+
+        Each event adds its amount to its account, the first of the names if
+        it has none, and each transfer also takes the amount from its account
+        and adds it to the 'transfer_to' account.
+
+        Args:
+            names: The names of the accounts, in order of their groups.
+
+        Raises:
+            ValueError: Raised if any of the events uses account that is not in the names.
+        """
+
+        unknown = [name for name in self.account_names() if name not in names]
+        if unknown:
+            raise ValueError(f"The events use unknown accounts {unknown!r}, expected one of {list(names)!r}!")
+
+        # the group of each interned account, the missing code -1 picks the default group from the end
+        groups = {name: group for (group, name) in enumerate(names)}
+        group_of = numpy.array([groups.get(name, 0) for name in self._accounts.values] + [0], dtype=numpy.int64)
+
+        positions = numpy.arange(self._size)
+        transfer_codes = self._transfer_codes[:self._size]
+        transfers = numpy.flatnonzero(transfer_codes != _MISSING)
+        source_weights = numpy.where(transfer_codes == _MISSING, 1.0, -1.0)
+        return Grouping(
+            numpy.concatenate([positions, transfers]),
+            numpy.concatenate([group_of[self._account_codes[:self._size]], group_of[transfer_codes[transfers]]]),
+            numpy.concatenate([source_weights, numpy.ones(len(transfers))]),
+            list(names),
+        )
+
+    def _position(self, index: int) -> int:
+        if not isinstance(index, (int, numpy.integer)):
+            raise TypeError(index, int, type(index))
+        position = index + self._size if index < 0 else index
+        if not 0 <= position < self._size:
+            raise IndexError(index)
+        return int(position)
+
+    def _row(self, event: Event) -> Tuple[int, float, int, int, int, int, int]:
+        if not isinstance(event, Event):
+            raise TypeError(event, Event, type(event))
+        return (
+            self._descriptions.intern(event.description),
+            event.amount,
+            self._frequencies.intern(event.frequency),
+            _MISSING if (event.category is None) else self._categories.intern(event.category),
+            self._tag_sets.intern(event.tags),
+            _MISSING if (event.account is None) else self._accounts.intern(event.account),
+            _MISSING if (event.transfer_to is None) else self._accounts.intern(event.transfer_to),
+        )
+
+    def _set_row(self, position: int, row: Tuple[int, float, int, int, int, int, int]):
+        for name, value in zip(_COLUMNS, row):
+            getattr(self, name)[position] = value
+
+    def _event(self, position: int) -> Event:
+        category_code = self._category_codes[position]
+        account_code = self._account_codes[position]
+        transfer_code = self._transfer_codes[position]
+        return Event._from_parsed(  # pylint: disable=protected-access
+            self._descriptions.values[self._description_codes[position]],
+            float(self._amounts[position]),
+            self._frequencies.values[self._frequency_codes[position]],
+            None if (category_code == _MISSING) else self._categories.values[category_code],
+            self._tag_sets.values[self._tags_codes[position]],
+            None if (account_code == _MISSING) else self._accounts.values[account_code],
+            None if (transfer_code == _MISSING) else self._accounts.values[transfer_code],
+        )
+
+    def _reserve(self, size: int):
+        """Grows the columns to fit the size, doubling their capacity."""
+
+        capacity = len(self._amounts)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, INITIAL_CAPACITY)
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            grown = numpy.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._event(position) for position in range(*index.indices(self._size))]
+        return self._event(self._position(index))
+
+    def __setitem__(self, index, event: Event):
+        position = self._position(index)
+        row = self._row(event)
+        if self._index is not None:
+            previous = self._descriptions.values[self._description_codes[position]]
+            self._index[previous].remove(position)
+            if not self._index[previous]:
+                del self._index[previous]
+            positions = self._index.setdefault(event.description, [])
+            positions.append(position)
+            positions.sort()
+        self._set_row(position, row)
+        self._version += 1
+
+    def __delitem__(self, index):
+        position = self._position(index)
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            column[position:self._size - 1] = column[position + 1:self._size]
+        self._size -= 1
+        self._version += 1
+        self._index = None
+
+    def insert(self, index: int, value: Event):
+        """Inserts the event before the index."""
+
+        row = self._row(value)
+        position = max(0, min(index + self._size if index < 0 else index, self._size))
+        self._reserve(self._size + 1)
+        for name, cell in zip(_COLUMNS, row):
+            column = getattr(self, name)
+            column[position + 1:self._size + 1] = column[position:self._size]
+            column[position] = cell
+        self._size += 1
+        self._version += 1
+        self._index = None
+
+    def append(self, value: Event):
+        """Appends the event to the end, without rebuilding the description index."""
+
+        row = self._row(value)
+        self._reserve(self._size + 1)
+        position = self._size
+        self._set_row(position, row)
+        self._size += 1
+        self._version += 1
+        if self._index is not None:
+            self._index.setdefault(value.description, []).append(position)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, EventTable):
+            return (
+                    (self._size == other._size)
+                    and numpy.array_equal(self.amounts, other.amounts)
+                    and (self.description_list() == other.description_list())
+                    and (self.frequency_list() == other.frequency_list())
+                    and (self.category_list() == other.category_list())
+                    and (self.tags_list() == other.tags_list())
+                    and (self.account_list() == other.account_list())
+                    and (self.transfer_list() == other.transfer_list())
+            )
+        if isinstance(other, list):
+            return list(self) == other
+        return False
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
@@ -1,11 +1,29 @@
 """This module defines the data and logic for processing a period definition."""
+import re
 import warnings
-from typing import Any, List
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Tuple, Union
 
+import numpy
 from dateutil import rrule
-from pandas import Timestamp
+from pandas import DateOffset, Timedelta, Timestamp, date_range
 from recurrent import RecurringEvent
 
+from pybudgetplot.datamodel.calendars import Calendar, parse_convention
+
+# the calendar of the budgets without holidays
+WEEKDAYS = Calendar()
+
+# the frequency of all business days of the calendar
+_BUSINESS_DAYS = re.compile(r"^every\s+(business|working|work)\s*days?$", re.IGNORECASE)
+
+# the roll convention at the end of frequency, e.g. 'every month on the 25th, preceding'
+_CONVENTION_SUFFIX = re.compile(
+    r"^(?P<frequency>.+?)\s*,\s*(?P<convention>following|preceding|modified[\s-]*following)$",
+    re.IGNORECASE,
+)
+
 
 def is_datestamp(stamp: Timestamp) -> bool:
     """Checks if a ``Timestamp`` is normalized (e.g. 'date-stamp').
@@ -85,6 +103,19 @@ def parse_datestamp(value: Any) -> Timestamp:
     return stamp if is_datestamp(stamp) else stamp.normalize()
 
 
+def split_convention(frequency: str) -> Tuple[str, Optional[str]]:
+    """Splits the roll convention from the end of frequency, e.g. 'Every Month starting 2020-11-25, preceding'.
+
+    Returns:
+        Tuple with the frequency without the convention, and the convention or None.
+    """
+
+    match = _CONVENTION_SUFFIX.match(frequency.strip())
+    if match is None:
+        return frequency, None
+    return match.group("frequency"), parse_convention(match.group("convention"))
+
+
 def format_stamp(stamp: Timestamp) -> str:
     """Formats a ``Timestamp`` instance to string using ISO format.
 
@@ -107,37 +138,85 @@ def format_stamp(stamp: Timestamp) -> str:
 
 
 class Period:
-    """Represents the fixed period of time between 'start' and 'end' stamps."""
+    """Represents the fixed period of time between 'start' and 'end' stamps.
+
+    With business-day 'calendar' the weekday frequencies (e.g. 'Every
+    WeekDay') skip its holidays. Any frequency can end with roll convention
+    (e.g. 'Every Month on the 25th, preceding'), which moves its dates that
+    are not business days, and 'Every Business Day' has all business days.
+
+    The instances are immutable and hashable, the normalized start and end
+    dates and the number of days are calculated once on creation.
+    """
 
-    def __init__(self, start: Any, end: Any):
+    __slots__ = ("start", "end", "start_date", "end_date", "days", "calendar", "_hash")
+
+    start: Timestamp
+    end: Timestamp
+    start_date: Timestamp
+    end_date: Timestamp
+    days: int
+    calendar: Optional[Calendar]
+
+    def __init__(self, start: Any, end: Any, calendar: Optional[Calendar] = None):
         """Class constructor.
 
         Args:
             start: Period start date/datetime.
             end: Period end date/datetime.
+            calendar: Optional business-day calendar with the holidays.
         """
 
-        self.start = parse_timestamp(start)
-        self.end = parse_timestamp(end)
+        start = parse_timestamp(start)
+        end = parse_timestamp(end)
+        start_date = parse_datestamp(start)
+        end_date = parse_datestamp(end)
+
+        object.__setattr__(self, "start", start)
+        object.__setattr__(self, "end", end)
+        object.__setattr__(self, "start_date", start_date)
+        object.__setattr__(self, "end_date", end_date)
+        object.__setattr__(self, "days", (end_date - start_date).days + 1)
+        object.__setattr__(self, "calendar", calendar)
+        object.__setattr__(self, "_hash", hash((start, end, calendar)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable!")
+
+    def __reduce__(self):
+        return type(self), (self.start, self.end, self.calendar)
+
+    def __hash__(self) -> int:
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if isinstance(other, Period):
-            return (self.start == other.start) and (self.end == other.end)
+            return (self.start == other.start) and (self.end == other.end) and (self.calendar == other.calendar)
         return False
 
     def __repr__(self) -> str:
-        return f"{type(self).__name__}(start={self.start!r}, end={self.end!r})"
+        if self.calendar is None:
+            return f"{type(self).__name__}(start={self.start!r}, end={self.end!r})"
+        return f"{type(self).__name__}(start={self.start!r}, end={self.end!r}, calendar={self.calendar!r})"
 
     def __str__(self) -> str:
         start_str = format_stamp(self.start)
         end_str = format_stamp(self.end)
         return f"['{start_str}' - '{end_str}']"
 
-    def generate_datestamps(self, frequency: str) -> List[Timestamp]:
+    def generate_datestamps(self, frequency: str, start_date: Any = None, end_date: Any = None) -> List[Timestamp]:
         """Generates a list of 'date-stamps' with the given frequency.
 
+        The recurring frequencies always start at the period start, so the
+        dates in a window are the same as in the whole period.
+
         Args:
             frequency: Sentence describing the frequency, or date in ISO-format.
+            start_date: Ignore dates before this one, if set.
+            end_date: Ignore dates after this one, if set.
 
         Returns:
             List of normalized Timestamps referring to dates in the Period.
@@ -150,35 +229,349 @@ class Period:
         if not isinstance(frequency, str):
             raise TypeError(frequency, str, type(frequency))
 
+        window_start = None if (start_date is None) else parse_datestamp(start_date)
+        window_end = None if (end_date is None) else parse_datestamp(end_date)
+
+        if self._uses_calendar(frequency):
+            # the rolled dates may move across the window bounds, so all of them are generated
+            dates = self._business_datestamps(frequency)
+            first = 0 if (window_start is None) else bisect_left(dates, window_start)
+            last = len(dates) if (window_end is None) else bisect_left(dates, window_end + Timedelta(days=1))
+            return list(dates[first:last])
+
         try:
             # check if the frequency can be parsed to a single date-stamp.
             result = [parse_datestamp(frequency)]
         except ValueError:
             result = None
 
-        if result is None:
+        if result is not None:
+            after_start = (window_start is None) or (window_start <= result[0])
+            before_end = (window_end is None) or (result[0] <= window_end)
+            return result if (after_start and before_end) else []
+
+        range_start = self.start_date if (window_start is None) else max(window_start, self.start_date)
+        range_end = self.end_date if (window_end is None) else min(window_end, self.end_date)
+        if range_start > range_end:
+            return []
+        if range_start == self.start_date:
+            return list(expand_frequency(frequency, range_start, range_end))
+        return list(expand_frequency(frequency, range_start, range_end, self.start_date))
 
-            # ensure that `date-stamps` are used for the calculations
-            start_date = parse_datestamp(self.start)
-            end_date = parse_datestamp(self.end)
+    def count_datestamps(self, frequency: str, before_date: Any) -> int:
+        """Counts the 'date-stamps' with the given frequency before a date.
 
-            try:
-                # silence `parsedatetime` warning due bad call from `recurrent`
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
+        The recurring frequencies are counted by `count_frequency`, mostly
+        without generating the dates.
+
+        Args:
+            frequency: Sentence describing the frequency, or date in ISO-format.
+            before_date: Count only the dates before this one.
+
+        Returns:
+            The number of dates that `generate_datestamps` returns before the date.
+
+        Raises:
+            TypeError: Raised if the frequency is not a string instance.
+            ValueError: Raised if the frequency could not be parsed.
+        """
+
+        if not isinstance(frequency, str):
+            raise TypeError(frequency, str, type(frequency))
+
+        before_date = parse_datestamp(before_date)
+
+        if self._uses_calendar(frequency):
+            return bisect_left(self._business_datestamps(frequency), before_date)
+
+        try:
+            # check if the frequency can be parsed to a single date-stamp.
+            return int(parse_datestamp(frequency) < before_date)
+        except ValueError:
+            pass
+
+        range_end = min(before_date - Timedelta(days=1), self.end_date)
+        if range_end < self.start_date:
+            return 0
+        return count_frequency(frequency, self.start_date, range_end)
+
+    def _uses_calendar(self, frequency: str) -> bool:
+        """Checks if the dates of the frequency depend on the business days."""
+
+        frequency, convention = split_convention(frequency)
+        if (convention is not None) or _BUSINESS_DAYS.match(frequency.strip()):
+            return True
+        if self.calendar is None:
+            return False
+        try:
+            parse_datestamp(frequency)
+            return False
+        except ValueError:
+            return parse_rule(frequency, self.start_date).weekdays
+
+    def _business_datestamps(self, frequency: str) -> Tuple[Timestamp, ...]:
+        """Returns the sorted dates of frequency that depends on the business days."""
+
+        frequency, convention = split_convention(frequency)
+        calendar = WEEKDAYS if (self.calendar is None) else self.calendar
+        return expand_business_frequency(frequency, convention, self.start_date, self.end_date, calendar)
+
+
+# the rule parameters whose occurrences repeat after fixed number of days or months
+_CYCLIC_PARAMETERS = {
+    "DAILY": {"FREQ", "INTERVAL", "WKST"},
+    "WEEKLY": {"FREQ", "INTERVAL", "WKST", "BYDAY"},
+    "MONTHLY": {"FREQ", "INTERVAL", "WKST", "BYMONTHDAY"},
+    "YEARLY": {"FREQ", "INTERVAL", "WKST", "BYMONTH", "BYMONTHDAY"},
+}
+
+
+class Rule(NamedTuple):
+    """Parsed recurring frequency."""
+
+    rule: Union[rrule.rrule, rrule.rruleset]
+
+    # the days or months after which the occurrences repeat, if known
+    cycle: Optional[Union[Timedelta, DateOffset]]
+
+    # whether the occurrences are each day from Monday to Friday
+    weekdays: bool = False
+
+
+def _is_weekdays_rule(rfc_rrule: str) -> bool:
+    """Checks if the rule occurs each day from Monday to Friday, e.g. 'every weekday'."""
+
+    lines = [line for line in rfc_rrule.splitlines() if line.strip() and not line.startswith("DTSTART:")]
+    if (len(lines) != 1) or not lines[0].startswith("RRULE:"):
+        return False
+    parameters = dict(part.split("=", 1) for part in lines[0][len("RRULE:"):].split(";") if "=" in part)
+    return (
+            (parameters.get("FREQ") in ("DAILY", "WEEKLY"))
+            and (parameters.get("INTERVAL", "1") == "1")
+            and (set(parameters.get("BYDAY", "").split(",")) == {"MO", "TU", "WE", "TH", "FR"})
+            and set(parameters).issubset({"FREQ", "INTERVAL", "BYDAY", "WKST"})
+    )
+
+
+def _rule_cycle(rfc_rrule: str, start_date: Timestamp) -> Optional[Union[Timedelta, DateOffset]]:
+    """Returns the days or months after which the occurrences of the rule repeat.
+
+    Only the rules with one occurrence per date, without count or end date,
+    and that don't depend on the month lengths have cycle.
+    """
 
-                    event = RecurringEvent(now_date=start_date)
-                    event.parse(frequency)
+    lines = [line for line in rfc_rrule.splitlines() if line.strip()]
+    rule_lines = [line for line in lines if line.startswith("RRULE:")]
+    if (len(rule_lines) != 1) or any(not line.startswith(("RRULE:", "DTSTART:")) for line in lines):
+        return None
 
-                    rfc_rrule = event.get_RFC_rrule()
-                    rule = rrule.rrulestr(rfc_rrule, dtstart=start_date)
+    parameters = dict(part.split("=", 1) for part in rule_lines[0][len("RRULE:"):].split(";") if "=" in part)
+    frequency = parameters.get("FREQ")
+    if (frequency not in _CYCLIC_PARAMETERS) or not set(parameters).issubset(_CYCLIC_PARAMETERS[frequency]):
+        return None
 
-                    result = [
-                        Timestamp(occurrence).normalize()
-                        for occurrence in rule.between(start_date, end_date, inc=True)
-                    ]
+    if not parameters.get("INTERVAL", "1").isdigit():
+        return None
+    interval = int(parameters.get("INTERVAL", "1"))
+    if interval < 1:
+        return None
 
-            except Exception as ex:
-                raise ValueError(frequency) from ex
+    if frequency == "DAILY":
+        return Timedelta(days=interval)
 
-        return result
+    if frequency == "WEEKLY":
+        weekdays = parameters.get("BYDAY", "MO").split(",")
+        if not all(weekday in ("MO", "TU", "WE", "TH", "FR", "SA", "SU") for weekday in weekdays):
+            return None
+        return Timedelta(weeks=interval)
+
+    # the month days after the 28th are skipped in the shorter months
+    month_days = parameters.get("BYMONTHDAY", str(start_date.day)).split(",")
+    if not all(day.isdigit() and (1 <= int(day) <= 28) for day in month_days):
+        return None
+    return DateOffset(months=interval * (12 if frequency == "YEARLY" else 1))
+
+
+@lru_cache(maxsize=4096)
+def parse_rule(frequency: str, start_date: Timestamp) -> Rule:
+    """Parses a recurring frequency that starts at a date.
+
+    Args:
+        frequency: Sentence describing the frequency.
+        start_date: The date when the recurrence starts.
+
+    Returns:
+        The parsed Rule.
+
+    Raises:
+        ValueError: Raised if the frequency could not be parsed.
+    """
+
+    try:
+        # silence `parsedatetime` warning due bad call from `recurrent`
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+
+            event = RecurringEvent(now_date=start_date)
+            event.parse(frequency)
+
+            rfc_rrule = event.get_RFC_rrule()
+            rule = rrule.rrulestr(rfc_rrule, dtstart=start_date)
+            first = next(iter(rule), None)
+            cycle = None if (first is None) else _rule_cycle(rfc_rrule, Timestamp(first))
+            return Rule(rule, cycle, _is_weekdays_rule(rfc_rrule))
+
+    except Exception as ex:
+        raise ValueError(frequency) from ex
+
+
+@lru_cache(maxsize=4096)
+def expand_frequency(
+        frequency: str,
+        start_date: Timestamp,
+        end_date: Timestamp,
+        anchor_date: Optional[Timestamp] = None,
+) -> Tuple[Timestamp, ...]:
+    """Expands a recurring frequency to the 'date-stamps' between two dates.
+
+    The results are cached, so parsing the same frequency for the same dates
+    again (e.g. after reloading a budget definition) is almost free.
+
+    Args:
+        frequency: Sentence describing the frequency.
+        start_date: The first date of the range.
+        end_date: The last date of the range.
+        anchor_date: The date when the recurrence starts, the start date if None.
+
+    Returns:
+        Tuple of normalized Timestamps referring to dates in the range.
+
+    Raises:
+        ValueError: Raised if the frequency could not be parsed.
+    """
+
+    rule = parse_rule(frequency, start_date if (anchor_date is None) else anchor_date).rule
+    try:
+        return tuple(
+            Timestamp(occurrence).normalize()
+            for occurrence in rule.between(start_date, end_date, inc=True)
+        )
+    except Exception as ex:
+        raise ValueError(frequency) from ex
+
+
+@lru_cache(maxsize=4096)
+def expand_business_frequency(
+        frequency: str,
+        convention: Optional[str],
+        start_date: Timestamp,
+        end_date: Timestamp,
+        calendar: Calendar,
+) -> Tuple[Timestamp, ...]:
+    """Expands frequency to the 'date-stamps' between two dates, on the business days of calendar.
+
+    The weekday rules and 'every business day' skip the holidays, and the
+    dates of frequency with roll convention are rolled to business days,
+    all in single vectorized call of the calendar. The dates that roll to
+    the same business day are included once.
+
+    Args:
+        frequency: Sentence describing the frequency, or date in ISO-format.
+        convention: The roll convention, if any.
+        start_date: The first date of the range.
+        end_date: The last date of the range.
+        calendar: The business-day calendar.
+
+    Returns:
+        Sorted tuple of normalized Timestamps, the rolled dates may be outside the range.
+
+    Raises:
+        ValueError: Raised if the frequency could not be parsed.
+    """
+
+    try:
+        days = numpy.array([parse_datestamp(frequency).to_datetime64()], dtype="datetime64[D]")
+        weekdays = False
+    except ValueError:
+        if _BUSINESS_DAYS.match(frequency.strip()):
+            days = date_range(start_date, end_date).to_numpy().astype("datetime64[D]")
+            weekdays = True
+        else:
+            dates = expand_frequency(frequency, start_date, end_date)
+            days = numpy.array([stamp.value for stamp in dates], dtype="datetime64[ns]").astype("datetime64[D]")
+            weekdays = parse_rule(frequency, start_date).weekdays
+
+    if weekdays:
+        days = days[calendar.is_business_day(days)]
+    if convention is not None:
+        days = numpy.unique(calendar.roll(days, convention))
+    return tuple(Timestamp(day) for day in days)
+
+
+def _count_dates(rule: Union[rrule.rrule, rrule.rruleset], start_date: Timestamp, end_date: Timestamp) -> int:
+    """Counts the distinct dates of the occurrences between two dates, by generating them."""
+
+    return len({Timestamp(occurrence).normalize() for occurrence in rule.between(start_date, end_date, inc=True)})
+
+
+def _count_before(parsed: Rule, before_date: Timestamp) -> int:
+    """Counts the occurrences of a cyclic rule before a date.
+
+    The occurrences of the whole cycles are counted from the first cycle,
+    only the occurrences of the last partial cycle are generated.
+    """
+
+    first = Timestamp(next(iter(parsed.rule)))
+    if before_date <= first:
+        return 0
+
+    day = Timedelta(days=1)
+    cycle = parsed.cycle
+    if isinstance(cycle, Timedelta):
+        cycles = (before_date - first) // cycle
+        rest_start = first + cycles * cycle
+    else:
+        months = (before_date.year - first.year) * 12 + (before_date.month - first.month)
+        if first + DateOffset(months=months) > before_date:
+            months -= 1
+        cycles = months // cycle.months
+        rest_start = first + DateOffset(months=cycles * cycle.months)
+
+    per_cycle = _count_dates(parsed.rule, first, first + cycle - day)
+    return cycles * per_cycle + _count_dates(parsed.rule, rest_start, before_date - day)
+
+
+def count_frequency(
+        frequency: str,
+        start_date: Timestamp,
+        end_date: Timestamp,
+        anchor_date: Optional[Timestamp] = None,
+) -> int:
+    """Counts the 'date-stamps' of a recurring frequency between two dates.
+
+    Returns the same as ``len(expand_frequency(...))``, but the occurrences
+    of the rules that repeat after fixed number of days or months (e.g.
+    'every 2 weeks on Friday') are counted in closed form, without
+    generating them.
+
+    Args:
+        frequency: Sentence describing the frequency.
+        start_date: The first date of the range.
+        end_date: The last date of the range.
+        anchor_date: The date when the recurrence starts, the start date if None.
+
+    Returns:
+        The number of dates in the range.
+
+    Raises:
+        ValueError: Raised if the frequency could not be parsed.
+    """
+
+    parsed = parse_rule(frequency, start_date if (anchor_date is None) else anchor_date)
+    try:
+        if parsed.cycle is None:
+            return _count_dates(parsed.rule, start_date, end_date)
+        day = Timedelta(days=1)
+        return _count_before(parsed, end_date + day) - _count_before(parsed, start_date)
+    except Exception as ex:
+        raise ValueError(frequency) from ex
@@ -0,0 +1,191 @@
+"""This module defines the goal solver, which finds the event values that keep the balance above a floor.
+
+The account flows of all other events are calculated once, and each guess
+only adds the flows of the solved event and solves the account balances.
+The balance on each date is linear in the amount of the event, so the
+amount goal is solved in closed form. The date goal is solved by bisection
+over the period dates.
+"""
+import logging
+from typing import Iterable, Optional
+
+import numpy
+from pandas import DataFrame, Timestamp, date_range
+
+from pybudgetplot.datamodel.account import DEFAULT_ACCOUNT, Account, ledger_balances
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.datamodel.event import Event, parse_string
+from pybudgetplot.datamodel.period import format_stamp, parse_datestamp
+from pybudgetplot.utils.profile_util import stage
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+# the balance differences below this are treated as rounding errors
+TOLERANCE = 1e-9
+
+
+def _replaced(event: Event, amount=None, frequency=None) -> Event:
+    """Returns copy of the event with the new amount or frequency."""
+
+    return Event(
+        event.description,
+        event.amount if (amount is None) else amount,
+        event.frequency if (frequency is None) else frequency,
+        event.category,
+        event.tags,
+        event.account,
+        event.transfer_to,
+    )
+
+
+class _Evaluator:
+    """Evaluates the balance of a budget with one of its events replaced."""
+
+    def __init__(self, budget: Budget, description, start, end):
+        self.description = parse_string(description)
+        position = budget.events.index_of(self.description)
+        self.event = budget.events[position]
+        self.budget = budget
+        self.end = end
+        self.accounts = list((budget.accounts or {DEFAULT_ACCOUNT: Account()}).values())
+
+        events = list(budget.events)
+        events[position] = _replaced(self.event, amount=0.0)
+        self.flows = self._flows_of(events)
+        self.dates = self.flows.index
+        self.in_window = numpy.ones(len(self.dates), dtype=bool)
+        if start is not None:
+            self.in_window = self.dates >= parse_datestamp(start)
+
+    def _flows_of(self, events: Iterable[Event]) -> DataFrame:
+        """Returns the account flows of the events, in the period and the accounts of the budget."""
+
+        period = self.budget.period
+        budget = Budget(period.start_date, period.end_date, calendar=period.calendar)
+        budget.accounts = dict(self.budget.accounts)
+        budget.events = events
+        return budget.as_flows(self.end)
+
+    def unit_flows(self, frequency: str) -> numpy.ndarray:
+        """Returns the (dates x accounts) flows of the event with amount 1.0 and the frequency."""
+
+        flows = self._flows_of([_replaced(self.event, amount=1.0, frequency=frequency)])
+        return flows.reindex(self.dates, fill_value=0.0).to_numpy()
+
+    def balance(self, flows) -> numpy.ndarray:
+        """Returns the total balance of each date in the window, with the flows of the event added."""
+
+        balances, _ = ledger_balances(self.accounts, self.dates, self.flows.to_numpy() + flows)
+        return balances.sum(axis=1)[self.in_window]
+
+
+def solve_amount(budget: Budget, description, floor: float = 0.0, start=None, end=None) -> float:
+    """Finds the lowest amount of the event that keeps the balance at or above the floor.
+
+    For incomes it's the minimum needed, e.g. the minimum 'Salary'. For
+    expenses the amount is negative, so it's the largest affordable cost.
+
+    Args:
+        budget: The budget, which is not changed.
+        description: Description of the solved event.
+        floor: The lowest allowed balance.
+        start: Ignore the balance before this date, if set.
+        end: Ignore the balance after this date, if set.
+
+    Returns:
+        The lowest amount that keeps the balance at or above the floor on each date.
+
+    Raises:
+        KeyError: Raised if there is no event with the description.
+        ValueError: Raised if more than one event has the description, the window start is after its end,
+            or no amount keeps the balance.
+    """
+
+    with stage("solve_amount"):
+        evaluator = _Evaluator(budget, description, start, end)
+        margins = evaluator.balance(0.0) - floor
+        gains = evaluator.balance(evaluator.unit_flows(evaluator.event.frequency)) - floor - margins
+
+        # each date bounds the amount from below if the event raises its balance, and from above if it lowers it
+        raised = gains > TOLERANCE
+        lowered = gains < -TOLERANCE
+        fixed = ~(raised | lowered) & (margins < -TOLERANCE)
+        if fixed.any():
+            first_date = evaluator.dates[evaluator.in_window][fixed][0]
+            raise ValueError(
+                f"The balance is below {floor} on {format_stamp(first_date)} "
+                f"regardless of the amount of {evaluator.description!r}!"
+            )
+        if not raised.any():
+            raise ValueError(f"No lowest amount of {evaluator.description!r}, it doesn't raise the balance!")
+
+        bounds = -margins / numpy.where(raised | lowered, gains, 1.0)
+        lowest = float(bounds[raised].max())
+        highest = float(bounds[lowered].min()) if lowered.any() else numpy.inf
+        if lowest > highest + TOLERANCE:
+            raise ValueError(f"No amount of {evaluator.description!r} keeps the balance at or above {floor}!")
+
+    _log.debug("solved amount %r of %r", lowest, evaluator.description)
+    return lowest
+
+
+def solve_date(budget: Budget, description, floor: float = 0.0, start=None, end=None) -> Optional[Timestamp]:
+    """Finds the date for the event that keeps the balance at or above the floor.
+
+    The event is moved to single date of the period. The later dates keep
+    more balance for expenses, so the earliest such date is returned, e.g.
+    when a purchase can be afforded. For incomes it's the latest date, e.g.
+    how late a payment can arrive. The bisection expects that ordering, so
+    it solves the balances only about log2(days) times.
+
+    Args:
+        budget: The budget, which is not changed.
+        description: Description of the solved event.
+        floor: The lowest allowed balance.
+        start: Ignore the balance and the dates before this date, if set.
+        end: Ignore the balance and the dates after this date, if set.
+
+    Returns:
+        The date, or None if no date keeps the balance.
+
+    Raises:
+        KeyError: Raised if there is no event with the description.
+        ValueError: Raised if more than one event has the description, the window start is after its end,
+            or the event doesn't change the balance.
+    """
+
+    with stage("solve_date"):
+        evaluator = _Evaluator(budget, description, start, end)
+        if evaluator.event.net_amount == 0:
+            raise ValueError(f"No date of {evaluator.description!r}, it doesn't change the balance!")
+
+        period = budget.period
+        range_start = period.start_date if (start is None) else max(parse_datestamp(start), period.start_date)
+        range_end = period.end_date if (end is None) else min(parse_datestamp(end), period.end_date)
+        dates = date_range(range_start, range_end)
+        if evaluator.event.net_amount > 0:
+            dates = dates[::-1]
+
+        # the flows of the event on single date, by account
+        unit = evaluator.unit_flows(format_stamp(period.start_date))
+        account_flows = evaluator.event.amount * unit[evaluator.dates.get_loc(period.start_date)]
+        rows = evaluator.dates.get_indexer(dates)
+
+        def keeps_balance(row: int) -> bool:
+            flows = numpy.zeros(evaluator.flows.shape)
+            flows[row] = account_flows
+            return bool((evaluator.balance(flows) >= floor - TOLERANCE).all())
+
+        # find the first date that keeps the balance, all dates after it keep it too
+        low, high = 0, len(dates)
+        while low < high:
+            middle = (low + high) // 2
+            if keeps_balance(rows[middle]):
+                high = middle
+            else:
+                low = middle + 1
+
+    result = dates[low] if (low < len(dates)) else None
+    _log.debug("solved date %r of %r", result, evaluator.description)
+    return result
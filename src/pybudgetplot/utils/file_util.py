@@ -1,36 +1,185 @@
 """This module defines logic for file related operations."""
+import bz2
+import gzip
+import io
 import logging
+import lzma
 from pathlib import Path
+from typing import BinaryIO, Optional
 
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
 
+CHUNK_SIZE = 64 * 1024
 
-def read_bytes(file) -> bytes:
-    """Reads file as bytes."""
+COMPRESSIONS = ("gz", "xz", "bz2", "zst")
+
+COMPRESSION_MAGIC = {
+    "gz": b"\x1f\x8b",
+    "xz": b"\xfd7zXZ\x00",
+    "bz2": b"BZh",
+    "zst": b"\x28\xb5\x2f\xfd",
+}
+
+
+def get_compression(file) -> Optional[str]:
+    """Returns the compression matching the file suffix or None."""
+
+    suffix = Path(file).suffix.lstrip(".").lower()
+    return suffix if (suffix in COMPRESSIONS) else None
+
+
+def get_stem(file) -> str:
+    """Returns the file name without the compression and the format suffixes."""
+
+    file_path = Path(file)
+    if get_compression(file_path):
+        file_path = Path(file_path.stem)
+    return file_path.stem
+
+
+def detect_compression(data: bytes) -> Optional[str]:
+    """Returns the compression matching the leading bytes of the data or None."""
+
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if data.startswith(magic):
+            return compression
+    return None
+
+
+def _import_zstandard():
+    """Imports the optional 'zstandard' package or raises."""
+
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as ex:
+        raise ImportError("The 'zst' compression requires 'pybudgetplot[zst]' to be installed!") from ex
+    return zstandard
+
+
+def check_compression(compression: Optional[str]):
+    """Ensures the compression is supported and its package is installed.
+
+    Raises:
+        ValueError: Raised if the compression is not supported.
+        ImportError: Raised if the compression requires missing package.
+    """
+
+    if (compression is not None) and (compression not in COMPRESSIONS):
+        raise ValueError(f"Unsupported compression {compression!r}!")
+    if compression == "zst":
+        _import_zstandard()
+
+
+def open_read(file: BinaryIO, compression: Optional[str]) -> BinaryIO:
+    """Wraps binary file object with streaming decompressor.
+
+    Args:
+        file: Binary file object.
+        compression: One of the supported ``COMPRESSIONS`` or None.
+
+    Returns:
+        Binary file object that decompresses the data on the fly,
+        or the same file object if the compression is None.
+
+    Raises:
+        ValueError: Raised if the compression is not supported.
+        ImportError: Raised if the compression requires missing package.
+    """
+
+    if compression is None:
+        return file
+    if compression == "gz":
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    if compression == "xz":
+        return lzma.LZMAFile(file, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(file, mode="rb")
+    if compression == "zst":
+        zstandard = _import_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(file, closefd=False)
+    raise ValueError(f"Unsupported compression {compression!r}!")
+
+
+def open_write(file, compression: Optional[str] = None) -> BinaryIO:
+    """Opens file for streaming binary write, creates the parent dir if missing.
+
+    Args:
+        file: Target file.
+        compression: One of the supported ``COMPRESSIONS``, by default it's
+            chosen by the file suffix, uncompressed if the suffix is unknown.
+
+    Returns:
+        Binary file object, the data written to it is compressed on the fly.
+
+    Raises:
+        ValueError: Raised if the compression is not supported.
+        ImportError: Raised if the compression requires missing package.
+    """
+
+    file_path = Path(file).absolute().resolve(strict=False)
+    compression = get_compression(file_path) if (compression is None) else compression
+    check_compression(compression)
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    if compression is None:
+        return file_path.open("wb")
+    if compression == "gz":
+        return gzip.open(file_path, "wb")
+    if compression == "xz":
+        return lzma.open(file_path, "wb")
+    if compression == "bz2":
+        return bz2.open(file_path, "wb")
+    zstandard = _import_zstandard()
+    return zstandard.ZstdCompressor().stream_writer(file_path.open("wb"), closefd=True)
+
+
+def read_bytes(file, decompress=False) -> bytes:
+    """Reads file as bytes, optionally decompressing the contents."""
 
     file_path = Path(file).absolute().resolve(strict=True)
-    return file_path.read_bytes()
+    if not decompress:
+        return file_path.read_bytes()
+
+    with file_path.open("rb") as raw_file:
+        magic = raw_file.read(max(len(_) for _ in COMPRESSION_MAGIC.values()))
+        raw_file.seek(0)
+        compression = detect_compression(magic)
+        if compression is None:
+            return raw_file.read()
+        with open_read(raw_file, compression) as stream:
+            return stream.read()
 
 
 def read_str(file, encoding="utf-8", errors="surrogateescape") -> str:
-    """Reads file as string."""
+    """Reads file as string, transparently decompressing the contents."""
 
-    file_bytes = read_bytes(file)
+    file_bytes = read_bytes(file, decompress=True)
     file_text = file_bytes.decode(encoding=encoding, errors=errors)
     return file_text.replace("\r\n", "\n")
 
 
-def write_bytes(file, data: bytes):
-    """Writes bytes to file, creates the parent dir if missing."""
+def write_bytes(file, data: bytes, compression: Optional[str] = None):
+    """Writes bytes to file, creates the parent dir if missing.
+
+    The data is compressed in chunks if compression is passed or if the file
+    suffix matches one of the supported ``COMPRESSIONS``.
+    """
+
+    view = memoryview(data)
+    with open_write(file, compression) as stream:
+        for offset in range(0, len(view), CHUNK_SIZE):
+            stream.write(view[offset : offset + CHUNK_SIZE])
 
-    file_path = Path(file).absolute().resolve(strict=False)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_bytes(data)
 
+def write_str(file, data: str, encoding="utf-8", errors="surrogateescape", compression: Optional[str] = None):
+    """Writes string to file, creates the parent dir if missing.
 
-def write_str(file, data: str, encoding="utf-8", errors="surrogateescape"):
-    """Writes string to file, creates the parent dir if missing."""
+    The string is encoded and compressed in chunks, so the whole encoded data
+    is never held in memory.
+    """
 
-    data_bytes = data.encode(encoding=encoding, errors=errors)
-    write_bytes(file, data_bytes)
+    with open_write(file, compression) as stream:
+        with io.TextIOWrapper(stream, encoding=encoding, errors=errors, newline="") as text_stream:
+            for offset in range(0, len(data), CHUNK_SIZE):
+                text_stream.write(data[offset : offset + CHUNK_SIZE])
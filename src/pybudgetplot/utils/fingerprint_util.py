@@ -0,0 +1,72 @@
+"""Helper module for the make-style freshness checks of the written outputs.
+
+Each written output gets a fingerprint of the definition contents, the library
+version and the export options it was written with, stored in a sidecar file
+next to it. The output is fresh while the file exists and its stored
+fingerprint matches the current one.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+from pybudgetplot.__about__ import __version__
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+
+def compute_fingerprint(definition: bytes, output: str, **options) -> str:
+    """Computes the fingerprint of an output.
+
+    Args:
+        definition: The decompressed contents of the budget-definition file.
+        output: Name of the output kind, e.g. 'csv' or 'png'.
+        **options: The export options that affect the output contents.
+
+    Returns:
+        Hex-digest that changes if any of the inputs changes.
+    """
+
+    payload = {
+        "definition": hashlib.sha256(definition).hexdigest(),
+        "version": __version__,
+        "output": output,
+        "options": options,
+    }
+    payload_bytes = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload_bytes).hexdigest()
+
+
+def get_fingerprint_file(file) -> Path:
+    """Returns the sidecar file that stores the fingerprint of an output file."""
+
+    file_path = Path(file).absolute()
+    return file_path.with_name(file_path.name + FINGERPRINT_SUFFIX)
+
+
+def read_fingerprint(file) -> Optional[str]:
+    """Returns the stored fingerprint of an output file or None if missing."""
+
+    try:
+        return get_fingerprint_file(file).read_text(encoding="ascii").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def write_fingerprint(file, fingerprint: str):
+    """Stores the fingerprint of an output file in its sidecar file."""
+
+    get_fingerprint_file(file).write_text(fingerprint + "\n", encoding="ascii")
+
+
+def is_fresh(file, fingerprint: str) -> bool:
+    """Checks if the output file exists and was written with the same fingerprint."""
+
+    file_path = Path(file).absolute()
+    fresh = file_path.is_file() and (read_fingerprint(file_path) == fingerprint)
+    _log.debug("output %r is %s", str(file_path), "fresh" if fresh else "stale")
+    return fresh
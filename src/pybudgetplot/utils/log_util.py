@@ -1,12 +1,17 @@
 """Helper module for initializing the logging framework."""
 import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import re
 import sys
 import time
+import weakref
 from os import PathLike
 from pathlib import Path
-from typing import Any, Callable, NoReturn, Optional, TextIO, Union
+from typing import Any, Callable, Dict, NoReturn, Optional, TextIO, Union
 
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
@@ -55,9 +60,30 @@ LOG_FORMATTER_CONVERTER_INFO = time.localtime
 LOG_FILE_MODE = "a"
 LOG_FILE_ENCODING = "latin1"
 LOG_FILE_DELAY = False
+LOG_FILE_BACKUP_COUNT = 1
+
+LOG_QUEUE_SIZE = 10000
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_NEW = "drop_new"
+OVERFLOW_DROP_OLD = "drop_old"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEW, OVERFLOW_DROP_OLD)
 
 FormatterConverter = Callable[[int], time.struct_time]
 
+# the attributes of every LogRecord, the rest are 'extra' fields
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+# formats the tracebacks of the queued records on the calling thread
+_EXC_FORMATTER = logging.Formatter()
+
+# the listener of the queued logging and the logger whose handlers it runs
+_QUEUE_LISTENER: Optional["BoundedQueueListener"] = None
+_QUEUE_LOGGER: Optional[logging.Logger] = None
+
+# the handlers created by this module, dropped once closed and collected
+_OWNED_HANDLERS: "weakref.WeakSet[logging.Handler]" = weakref.WeakSet()
+
 
 def to_level(value: Any) -> Optional[int]:
     """Cconvert any value to log-level integer or None.
@@ -179,22 +205,60 @@ def create_formatter(level: Any) -> logging.Formatter:
     return formatter
 
 
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as single-line JSON object.
+
+    The object contains the UTC time in ISO-format, the level, the logger name,
+    the message, the traceback if any, and the 'extra' fields of the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRIBUTES:
+                data[name] = value
+        return json.dumps(data, default=str)
+
+
 def create_file_handler(
     file: Union[str, PathLike, Path],
     mode: Optional[str] = None,
     encoding: Optional[str] = None,
     delay: Optional[bool] = None,
+    *,
+    max_bytes: Optional[int] = None,
+    backup_count: Optional[int] = None,
+    when: Optional[str] = None,
 ) -> logging.FileHandler:
     """Creates and returns new FileHandler with the given settings.
 
+    The handler rotates the file when it reaches 'max_bytes' in size, or at
+    the 'when' interval, keeping 'backup_count' old files, so the total size
+    on disk is capped at 'max_bytes' x ('backup_count' + 1).
+
     Args:
         file: Target file.
         mode: File mode (default: 'a').
         encoding: File encoding (default: 'latin1').
         delay: File delay (default: False).
+        max_bytes: Optional file size that triggers rotation.
+        backup_count: Number of rotated files to keep (default: 1).
+        when: Optional ``TimedRotatingFileHandler`` interval, e.g. 'midnight'.
 
     Returns:
         The newly-created FileHandler instance.
+
+    Raises:
+        ValueError: Raised if both 'max_bytes' and 'when' are passed.
     """
 
     # process args
@@ -205,6 +269,10 @@ def create_file_handler(
     mode = LOG_FILE_MODE if (mode is None) else mode
     delay = LOG_FILE_DELAY if (delay is None) else delay
     encoding = LOG_FILE_ENCODING if (encoding is None) else encoding
+    backup_count = LOG_FILE_BACKUP_COUNT if (backup_count is None) else backup_count
+
+    if (max_bytes is not None) and (when is not None):
+        raise ValueError("Can't rotate the log file both by size and by time!")
 
     # ensure the file's parent folder exists
     if file_dir.exists() and (not file_dir.is_dir()):
@@ -212,9 +280,13 @@ def create_file_handler(
     file_dir.mkdir(parents=True, exist_ok=True)
 
     # create and configure the FileHandler
-    handler = logging.FileHandler(file_name, mode, encoding, delay)
-    atexit.register(handler.flush)
-    atexit.register(handler.close)
+    if max_bytes is not None:
+        handler = logging.handlers.RotatingFileHandler(file_name, mode, max_bytes, backup_count, encoding, delay)
+    elif when is not None:
+        handler = logging.handlers.TimedRotatingFileHandler(file_name, when, 1, backup_count, encoding, delay)
+    else:
+        handler = logging.FileHandler(file_name, mode, encoding, delay)
+    _OWNED_HANDLERS.add(handler)
 
     return handler
 
@@ -233,36 +305,223 @@ def remove_handlers(logger: logging.Logger) -> NoReturn:
         logger.removeHandler(handler)
 
 
+def remove_owned_handlers(logger: logging.Logger):
+    """Removes the handlers created by this module from the given logger.
+
+    Args:
+        logger: Target logger.
+    """
+
+    for handler in list(logger.handlers):
+        if handler in _OWNED_HANDLERS:
+            handler.flush()
+            handler.close()
+            logger.removeHandler(handler)
+            _OWNED_HANDLERS.discard(handler)
+
+
 def add_file_handler(
-    logger: logging.Logger, file: Union[str, PathLike, Path], level: Any
+    logger: logging.Logger,
+    file: Union[str, PathLike, Path],
+    level: Any,
+    *,
+    max_bytes: Optional[int] = None,
+    backup_count: Optional[int] = None,
+    when: Optional[str] = None,
+    json_lines: bool = False,
 ) -> logging.FileHandler:
-    """Creates a new FileHandler, adds it to the given Logger and returns it."""
+    """Creates a new FileHandler, adds it to the given Logger and returns it.
+
+    See `create_file_handler` for the rotation args, 'json_lines' selects the
+    `JsonLinesFormatter` instead of the text one.
+    """
 
     # process args
     log_level = to_level(level)
 
     # create Formatter
-    formatter = create_formatter(log_level)
+    formatter = JsonLinesFormatter() if json_lines else create_formatter(log_level)
 
     # create and configure FileHandler
-    handler = create_file_handler(file)
+    handler = create_file_handler(file, max_bytes=max_bytes, backup_count=backup_count, when=when)
     handler.setFormatter(formatter)
     handler.setLevel(log_level)
 
     # attach FileHandler to the Logger
     logger.addHandler(handler)
-    atexit.register(logger.removeHandler, handler)
 
     return handler
 
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that applies overflow policy when its bounded queue is full.
+
+    The policies are:
+
+    * 'block' - the logging call waits until the listener frees space.
+    * 'drop_new' - the new record is discarded.
+    * 'drop_old' - the oldest queued record is discarded.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = OVERFLOW_BLOCK):
+        """Class constructor.
+
+        Args:
+            log_queue: The queue shared with the listener.
+            overflow: One of the ``OVERFLOW_POLICIES``.
+
+        Raises:
+            ValueError: Raised if the overflow policy is not supported.
+        """
+
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy {overflow!r}!")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merges the message args, leaving the formatting to the listener thread."""
+
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.overflow == OVERFLOW_BLOCK:
+            self.queue.put(record)
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                self.dropped += 1
+                if self.overflow == OVERFLOW_DROP_NEW:
+                    return
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """QueueListener that waits for space in bounded queue to stop."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def start_queued_logging(
+    logger: logging.Logger,
+    queue_size: int = LOG_QUEUE_SIZE,
+    overflow: str = OVERFLOW_BLOCK,
+) -> BoundedQueueListener:
+    """Moves the handlers of the logger behind a queue served by background thread.
+
+    The logging calls then only put the records in the queue, while the
+    listener thread formats and writes them with the original handlers.
+
+    Args:
+        logger: Logger whose handlers are moved, usually the root logger.
+        queue_size: The maximum number of queued records.
+        overflow: One of the ``OVERFLOW_POLICIES``, applied when the queue is full.
+
+    Returns:
+        The started listener.
+    """
+
+    global _QUEUE_LISTENER, _QUEUE_LOGGER  # pylint: disable=global-statement
+
+    stop_queued_logging()
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, overflow)
+    handlers = list(logger.handlers)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    _QUEUE_LISTENER, _QUEUE_LOGGER = listener, logger
+    _OWNED_HANDLERS.add(queue_handler)
+    return listener
+
+
+def stop_queued_logging():
+    """Writes the queued records and moves the handlers back to their logger."""
+
+    global _QUEUE_LISTENER, _QUEUE_LOGGER  # pylint: disable=global-statement
+
+    listener, logger = _QUEUE_LISTENER, _QUEUE_LOGGER
+    if (listener is None) or (logger is None):
+        return
+    _QUEUE_LISTENER, _QUEUE_LOGGER = None, None
+
+    dropped = 0
+    for handler in list(logger.handlers):
+        if isinstance(handler, BoundedQueueHandler) and (handler.queue is listener.queue):
+            logger.removeHandler(handler)
+            _OWNED_HANDLERS.discard(handler)
+            dropped += handler.dropped
+    listener.stop()
+    for handler in listener.handlers:
+        logger.addHandler(handler)
+
+    if dropped:
+        _log.warning("dropped %d log records due to full queue", dropped)
+
+
+def shutdown_logging():
+    """Stops the queued logging and removes the handlers created by this module.
+
+    It's the single exit hook of the module, registered once on import.
+    """
+
+    stop_queued_logging()
+    remove_owned_handlers(logging.getLogger())
+
+
 def init_logging(
     level: Any,
     *,
     stream: Optional[TextIO] = sys.stdout,
-    file: Optional[Union[str, PathLike, Path]] = None
+    file: Optional[Union[str, PathLike, Path]] = None,
+    queued: bool = False,
+    queue_size: int = LOG_QUEUE_SIZE,
+    overflow: str = OVERFLOW_BLOCK,
+    max_bytes: Optional[int] = None,
+    backup_count: Optional[int] = None,
+    when: Optional[str] = None,
+    json_lines: bool = False,
 ) -> NoReturn:
-    """Initialize the global logging framework with the settings."""
+    """Initialize the global logging framework with the settings.
+
+    Calling it again replaces the handlers installed by the previous call,
+    so the logging can be reconfigured any number of times.
+
+    Args:
+        level: Log-level name or value.
+        stream: Stream for the console handler, None for 'sys.stderr'.
+        file: Optional file for additional file handler.
+        queued: Run the handlers on background thread, see `start_queued_logging`.
+        queue_size: The maximum number of queued records.
+        overflow: One of the ``OVERFLOW_POLICIES``, applied when the queue is full.
+        max_bytes: Rotate the log file at that size, see `create_file_handler`.
+        backup_count: Number of rotated log files to keep.
+        when: Rotate the log file at that interval, e.g. 'midnight'.
+        json_lines: Write the log file as JSON-lines, see `JsonLinesFormatter`.
+    """
+
+    root_logger = logging.getLogger()
+    shutdown_logging()
 
     log_level = to_level(level)
     log_stream = stream
@@ -272,15 +531,28 @@ def init_logging(
     formatter_converter = get_log_formatter_converter(log_level)
     logging.Formatter.converter = formatter_converter
 
+    previous_handlers = list(root_logger.handlers)
     logging.basicConfig(
         level=log_level,
         format=log_format,
         datefmt=log_date_format,
         stream=log_stream,
     )
+    _OWNED_HANDLERS.update(handler for handler in root_logger.handlers if handler not in previous_handlers)
 
     if file is not None:
-        root_logger = logging.getLogger()
-        add_file_handler(root_logger, file, log_level)
+        add_file_handler(
+            root_logger,
+            file,
+            log_level,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            when=when,
+            json_lines=json_lines,
+        )
+
+    if queued:
+        start_queued_logging(root_logger, queue_size, overflow)
+
 
-    atexit.register(logging.shutdown)
+atexit.register(shutdown_logging)
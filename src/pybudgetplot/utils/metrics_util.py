@@ -0,0 +1,253 @@
+"""Helper module for collecting counters and timing histograms of the processed budgets.
+
+The metrics are kept in memory by a `MetricsRegistry` and can be exported in
+the OpenMetrics text format, e.g. for the textfile collector of a scheduler:
+
+    >>> registry = MetricsRegistry()
+    >>> registry.counter("budgets", "Processed budgets.").inc()
+    >>> print(registry.to_openmetrics(), end="")
+    # TYPE pybudgetplot_budgets counter
+    # HELP pybudgetplot_budgets Processed budgets.
+    pybudgetplot_budgets_total 1.0
+    # EOF
+"""
+import logging
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+METRICS_PREFIX = "pybudgetplot_"
+
+# upper bounds of the timing histogram buckets, in seconds
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Mapping[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for (name, value) in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for (_, value) in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for ((name, _), value) in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if (value == float("inf")) else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        """Class constructor.
+
+        Args:
+            name: Metric name, without the prefix and the '_total' suffix.
+            help_text: Description of the metric.
+        """
+
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Increases the counter with the given labels.
+
+        Raises:
+            ValueError: Raised if the amount is negative.
+        """
+
+        if amount < 0:
+            raise ValueError(f"Counter {self.name!r} can't be decreased!")
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """Returns the counter value with the given labels."""
+
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self, full_name: str) -> List[str]:
+        """Returns the sample lines in OpenMetrics format."""
+
+        return [f"{full_name}_total{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Histogram:
+    """Histogram of observed values, e.g. durations in seconds."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = TIME_BUCKETS):
+        """Class constructor.
+
+        Args:
+            name: Metric name, without the prefix.
+            help_text: Description of the metric.
+            buckets: Sorted upper bounds of the buckets, '+Inf' is added.
+        """
+
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels):
+        """Adds observed value with the given labels."""
+
+        key = _label_key(labels)
+        counts = self._counts.setdefault(key, [0] * len(self.buckets))
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        """Returns the number of observed values with the given labels."""
+
+        return sum(self._counts.get(_label_key(labels), []))
+
+    def sum(self, **labels) -> float:
+        """Returns the sum of the observed values with the given labels."""
+
+        return self._sums.get(_label_key(labels), 0.0)
+
+    def samples(self, full_name: str) -> List[str]:
+        """Returns the sample lines in OpenMetrics format."""
+
+        lines = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{full_name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{full_name}_count{_format_labels(key)} {cumulative}")
+            lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(self._sums[key])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named counters and histograms."""
+
+    def __init__(self, prefix: str = METRICS_PREFIX):
+        """Class constructor.
+
+        Args:
+            prefix: Prepended to the metric names on export.
+        """
+
+        self.prefix = prefix
+        self._metrics: Dict[str, Any] = {}
+
+    def _get_or_create(self, metric_cls, name: str, help_text: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = metric_cls(name, help_text, **kwargs)
+        elif not isinstance(metric, metric_cls):
+            raise ValueError(f"Metric {name!r} is already registered as {metric.metric_type}!")
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """Returns the counter with the given name, creating it if missing."""
+
+        return self._get_or_create(Counter, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = TIME_BUCKETS) -> Histogram:
+        """Returns the histogram with the given name, creating it if missing."""
+
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def clear(self):
+        """Removes all metrics."""
+
+        self._metrics.clear()
+
+    def to_openmetrics(self) -> str:
+        """Returns the metrics in OpenMetrics text format."""
+
+        lines = []
+        for metric in self._metrics.values():
+            full_name = self.prefix + metric.name
+            lines.append(f"# TYPE {full_name} {metric.metric_type}")
+            if metric.help_text:
+                lines.append(f"# HELP {full_name} {metric.help_text}")
+            lines.extend(metric.samples(full_name))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, file):
+        """Writes the metrics in OpenMetrics text format to file."""
+
+        file_path = Path(file).absolute()
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(self.to_openmetrics(), encoding="utf-8")
+
+
+# the registry used by the library unless another one is passed
+REGISTRY = MetricsRegistry()
+
+
+def record_budget(
+    budget_id: str,
+    *,
+    events: int,
+    days: int,
+    cache_hits: int,
+    cache_misses: int,
+    expansion_time: float,
+    total_time: float,
+    export_sizes: Mapping[str, int],
+    registry: MetricsRegistry = REGISTRY,
+) -> Dict[str, Any]:
+    """Updates the registry with the metrics of processed budget and logs them.
+
+    The record is logged at INFO level with the 'budget' extra attribute, so
+    the `JsonLinesFormatter` writes it as structured fields.
+
+    Args:
+        budget_id: Identifier of the budget, e.g. the definition file stem.
+        events: The number of events.
+        days: The number of days in the period.
+        cache_hits: The number of rules served by the expansion cache.
+        cache_misses: The number of rules expanded.
+        expansion_time: Seconds spent expanding the rules.
+        total_time: Seconds spent processing the budget.
+        export_sizes: The sizes in bytes of the written outputs, by output name.
+        registry: The updated registry.
+
+    Returns:
+        Dict with the recorded values.
+    """
+
+    registry.counter("budgets", "Processed budgets.").inc()
+    registry.counter("events", "Events of the processed budgets.").inc(events)
+    registry.counter("days", "Days of the processed budgets.").inc(days)
+    registry.counter("rule_cache_hits", "Rules served by the expansion cache.").inc(cache_hits)
+    registry.counter("rule_cache_misses", "Rules expanded.").inc(cache_misses)
+    registry.histogram("expansion_seconds", "Time spent expanding the rules per budget.").observe(expansion_time)
+    registry.histogram("budget_seconds", "Time spent processing budget.").observe(total_time)
+    export_bytes = registry.counter("export_bytes", "Size of the written outputs.")
+    for output, size in export_sizes.items():
+        export_bytes.inc(size, output=output)
+
+    record = {
+        "budget_id": budget_id,
+        "events": events,
+        "days": days,
+        "rule_cache_hits": cache_hits,
+        "rule_cache_misses": cache_misses,
+        "expansion_seconds": expansion_time,
+        "budget_seconds": total_time,
+        "export_bytes": dict(export_sizes),
+    }
+    _log.info("processed budget %r", budget_id, extra={"budget": record})
+    return record
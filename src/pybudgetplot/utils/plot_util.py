@@ -1,43 +1,350 @@
-"""Helper module for plotting a budget to file or interactively."""
+"""Helper module for plotting a budget to file or interactively.
+
+The ``matplotlib`` package is imported on first plot, so the callers that only
+need the tabular outputs do not pay for its startup. The renders to file are
+drawn on a ``Figure`` with an Agg canvas, without touching ``pyplot``, while
+the interactive mode uses the default GUI backend.
+"""
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
 
-from matplotlib import pyplot
+import numpy
 from pandas import DataFrame
-from pandas.plotting import register_matplotlib_converters
 
-from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.datamodel.budget import BURN_WINDOW, ROLLING_WINDOWS, RUNWAY_COLUMN, Budget
+from pybudgetplot.utils.profile_util import stage
 
 logging.getLogger("PIL.PngImagePlugin").disabled = True
 logging.getLogger("matplotlib.font_manager").disabled = True
 
-register_matplotlib_converters()
-
 _FIG_NUM = 42
 _FIG_WIDTH = 16
 _FIG_HEIGHT = 9
+_FIG_DPI = 100
+
+# lines with more points than the figure has horizontal pixels get downsampled
+DOWNSAMPLE_BUCKETS = _FIG_WIDTH * _FIG_DPI
 
 _LABEL_DAILY = "Daily Total"
 _LABEL_CUMULATIVE = "Cumulative Total"
+_LABEL_RUNWAY = "Runway [days]"
 
+# the rolling spend plotted with the runway, the window closest to the burn window
+_SPEND_WINDOW = min(ROLLING_WINDOWS, key=lambda days: abs(days - BURN_WINDOW))
+_SPEND_COLUMN = f"spend_{_SPEND_WINDOW}d"
+_LABEL_SPEND = f"{_SPEND_WINDOW}-Day Spend"
 
-def _draw_figure(data: DataFrame):
-    """Draws graph of the 'daily_total' and 'cumulative_total' data values."""
+_CONVERTERS_REGISTERED = False
 
-    pyplot.figure(num=_FIG_NUM, figsize=(_FIG_WIDTH, _FIG_HEIGHT), clear=True)
-    pyplot.plot(data.index, data.cumulative_total, label=_LABEL_CUMULATIVE)
-    pyplot.plot(data.index, data.daily_total, label=_LABEL_DAILY)
-    pyplot.legend()
+# the figure reused by `render_batch` within the current process
+_BATCH_FIGURE = None
 
 
-def plot_budget(budget: Budget, *, file=None, interactive=False):
-    """Plots the budget to file or interactively or both."""
+def _register_converters():
+    """Registers the pandas converters for matplotlib once."""
 
-    data = budget.as_dataframe()
+    global _CONVERTERS_REGISTERED  # pylint: disable=global-statement
+    if not _CONVERTERS_REGISTERED:
+        from pandas.plotting import register_matplotlib_converters  # pylint: disable=import-outside-toplevel
+
+        register_matplotlib_converters()
+        _CONVERTERS_REGISTERED = True
+
+
+def downsample_minmax(x_values, y_values, buckets: int = DOWNSAMPLE_BUCKETS) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Reduces line points to the min and max of each bucket, keeping the line shape.
+
+    The points are split into equal-sized buckets and only the minimum and the
+    maximum of each bucket are kept in their original order, together with the
+    first and the last point, so the peaks and the drops remain visible.
+
+    Args:
+        x_values: Sequence with the X-axis values.
+        y_values: Sequence with the Y-axis values, same length as the X-values.
+        buckets: Number of buckets, usually the width of the plot in pixels.
+
+    Returns:
+        Tuple with the X and Y arrays, unchanged if they fit in 2 x buckets.
+    """
 
-    _draw_figure(data)
+    x_array = numpy.asarray(x_values)
+    y_array = numpy.asarray(y_values, dtype=float)
+    count = len(y_array)
+    if count <= 2 * buckets:
+        return x_array, y_array
 
-    if file is not None:
-        pyplot.savefig(file)
+    bucket_size = -(-count // buckets)
+    padded = numpy.full(bucket_size * buckets, numpy.nan)
+    padded[:count] = y_array
+    padded = padded.reshape(buckets, bucket_size)
+
+    # the trailing buckets may be padding only, skip them
+    valid = ~numpy.isnan(padded).all(axis=1)
+    offsets = numpy.arange(buckets)[valid] * bucket_size
+    min_indexes = offsets + numpy.nanargmin(padded[valid], axis=1)
+    max_indexes = offsets + numpy.nanargmax(padded[valid], axis=1)
+
+    indexes = numpy.unique(numpy.concatenate([[0, count - 1], min_indexes, max_indexes]))
+    return x_array[indexes], y_array[indexes]
+
+
+def _create_figure(interactive: bool):
+    """Creates Figure for interactive use or Figure with Agg canvas."""
+
+    _register_converters()
+    figsize = (_FIG_WIDTH, _FIG_HEIGHT)
 
     if interactive:
+        from matplotlib import pyplot  # pylint: disable=import-outside-toplevel
+
+        return pyplot.figure(num=_FIG_NUM, figsize=figsize, dpi=_FIG_DPI, clear=True)
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # pylint: disable=import-outside-toplevel
+    from matplotlib.figure import Figure  # pylint: disable=import-outside-toplevel
+
+    figure = Figure(figsize=figsize, dpi=_FIG_DPI)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _draw_figure(
+        figure,
+        data: DataFrame,
+        downsample: bool,
+        categories: Optional[DataFrame] = None,
+        accounts: Optional[DataFrame] = None,
+        rolling: Optional[DataFrame] = None,
+):
+    """Draws graph of the 'daily_total' and 'cumulative_total' data values.
+
+    With 'categories' also draws dashed line with the cumulative total of each category,
+    and with 'accounts' dotted line with the balance of each account. With 'rolling'
+    draws dash-dot line with the 30-day spend, and the runway on secondary axis.
+    """
+
+    dates = data.index.to_numpy()
+    cumulative_points = (dates, data.cumulative_total.to_numpy())
+    daily_points = (dates, data.daily_total.to_numpy())
+    if downsample:
+        cumulative_points = downsample_minmax(*cumulative_points)
+        daily_points = downsample_minmax(*daily_points)
+
+    axes = figure.add_subplot()
+    axes.plot(*cumulative_points, label=_LABEL_CUMULATIVE)
+    axes.plot(*daily_points, label=_LABEL_DAILY)
+    if categories is not None:
+        category_dates = categories.index.to_numpy()
+        for category in categories.columns[:-2]:
+            category_points = (category_dates, categories[category].cumsum().to_numpy())
+            if downsample:
+                category_points = downsample_minmax(*category_points)
+            axes.plot(*category_points, label=str(category), linestyle="--", linewidth=1)
+    if accounts is not None:
+        account_dates = accounts.index.to_numpy()
+        for account in accounts.columns:
+            account_points = (account_dates, accounts[account].to_numpy())
+            if downsample:
+                account_points = downsample_minmax(*account_points)
+            axes.plot(*account_points, label=str(account), linestyle=":", linewidth=1)
+    if rolling is not None:
+        rolling_dates = rolling.index.to_numpy()
+        spend_points = (rolling_dates, rolling[_SPEND_COLUMN].to_numpy())
+        runway_points = (rolling_dates, rolling[RUNWAY_COLUMN].to_numpy())
+        if downsample:
+            spend_points = downsample_minmax(*spend_points)
+            runway_points = downsample_minmax(*runway_points)
+        axes.plot(*spend_points, label=_LABEL_SPEND, linestyle="-.", linewidth=1)
+        runway_axes = axes.twinx()
+        runway_axes.plot(*runway_points, label=_LABEL_RUNWAY, color="gray", linestyle="-.", linewidth=1)
+        runway_axes.set_ylabel(_LABEL_RUNWAY)
+        runway_axes.legend(loc="upper right")
+    axes.legend()
+
+
+def plot_budget(
+    budget: Budget,
+    *,
+    file=None,
+    interactive=False,
+    downsample=True,
+    start=None,
+    end=None,
+    categories=False,
+    accounts=False,
+    rolling=False,
+):
+    """Plots the budget to file or interactively or both.
+
+    Args:
+        budget: The budget to plot.
+        file: Optional file or list of files to save the graph to.
+        interactive: Show the graph in interactive window.
+        downsample: Reduce the long lines to what the figure can show.
+        start: Leave out the dates before this one, if set.
+        end: Leave out the dates after this one, if set.
+        categories: Draw the cumulative total of each event category too.
+        accounts: Draw the balance of each account too.
+        rolling: Draw the 30-day spend and the runway too.
+    """
+
+    data = budget.as_dataframe(start, end)
+    category_data = budget.as_categories(start, end) if categories else None
+    account_data = budget.as_accounts(start, end) if accounts else None
+    rolling_data = budget.as_rolling(start, end) if rolling else None
+
+    with stage("plot"):
+        figure = _create_figure(interactive)
+        _draw_figure(figure, data, downsample, category_data, account_data, rolling_data)
+
+        files = file if isinstance(file, (list, tuple)) else [file]
+        for graph_file in files:
+            if graph_file is not None:
+                figure.savefig(graph_file)
+
+    if interactive:
+        from matplotlib import pyplot  # pylint: disable=import-outside-toplevel
+
         pyplot.show()
+
+
+def render_budget(budget: Budget, *, fmt="png", downsample=True) -> bytes:
+    """Renders the budget graph and returns the image bytes in the given format."""
+
+    data = budget.as_dataframe()
+    with stage("plot"):
+        figure = _create_figure(False)
+        _draw_figure(figure, data, downsample)
+        buffer = BytesIO()
+        figure.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+
+
+class LineFigure(NamedTuple):
+    """Figure with lines whose data is updated in place."""
+
+    figure: Any
+    axes: Any
+    cumulative_line: Any
+    daily_line: Any
+
+
+def _create_line_figure(interactive: bool) -> LineFigure:
+    """Creates Figure with empty lines that are updated for each rendered budget."""
+
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter  # pylint: disable=import-outside-toplevel
+
+    figure = _create_figure(interactive)
+    axes = figure.add_subplot()
+    cumulative_line = axes.plot([], [], label=_LABEL_CUMULATIVE)[0]
+    daily_line = axes.plot([], [], label=_LABEL_DAILY)[0]
+    axes.legend()
+
+    locator = AutoDateLocator()
+    axes.xaxis.set_major_locator(locator)
+    axes.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    return LineFigure(figure, axes, cumulative_line, daily_line)
+
+
+def _update_lines(line_figure: LineFigure, data: DataFrame, downsample: bool):
+    """Replaces the lines data with the budget breakdown and rescales the axes."""
+
+    from matplotlib.dates import date2num  # pylint: disable=import-outside-toplevel
+
+    dates = date2num(data.index.to_pydatetime())
+    cumulative_points = (dates, data.cumulative_total.to_numpy())
+    daily_points = (dates, data.daily_total.to_numpy())
+    if downsample:
+        cumulative_points = downsample_minmax(*cumulative_points)
+        daily_points = downsample_minmax(*daily_points)
+
+    line_figure.cumulative_line.set_data(*cumulative_points)
+    line_figure.daily_line.set_data(*daily_points)
+    line_figure.axes.relim()
+    line_figure.axes.autoscale_view()
+
+
+def open_live_plot() -> LineFigure:
+    """Opens non-blocking interactive figure that is updated by `update_live_plot`."""
+
+    from matplotlib import pyplot  # pylint: disable=import-outside-toplevel
+
+    pyplot.ion()
+    line_figure = _create_line_figure(True)
+    pyplot.show(block=False)
+    return line_figure
+
+
+def update_live_plot(line_figure: LineFigure, budget: Budget, *, downsample=True, start=None, end=None):
+    """Redraws the interactive figure with the breakdown of the budget, see `plot_budget` for the window."""
+
+    _update_lines(line_figure, budget.as_dataframe(start, end), downsample)
+    line_figure.figure.canvas.draw_idle()
+
+
+def pause_live_plot(interval: float):
+    """Processes the interactive figure events for the given number of seconds."""
+
+    from matplotlib import pyplot  # pylint: disable=import-outside-toplevel
+
+    pyplot.pause(interval)
+
+
+def _init_batch_worker():
+    """Warms up the worker process by importing matplotlib and creating the figure."""
+
+    global _BATCH_FIGURE  # pylint: disable=global-statement
+    if _BATCH_FIGURE is None:
+        _BATCH_FIGURE = _create_line_figure(False)
+
+
+def _render_batch_item(item: Tuple[Budget, Path], downsample: bool) -> Path:
+    """Renders single budget to file by updating the lines of the reused figure."""
+
+    _init_batch_worker()
+    budget, file = item
+    _update_lines(_BATCH_FIGURE, budget.as_dataframe(), downsample)
+    _BATCH_FIGURE.figure.savefig(file)
+    return Path(file)
+
+
+def _render_batch_chunk(items: List[Tuple[Budget, Path]], downsample: bool) -> List[Path]:
+    """Renders chunk of budgets within the worker process."""
+
+    return [_render_batch_item(item, downsample) for item in items]
+
+
+def render_batch(
+    items: Iterable[Tuple[Budget, Path]],
+    *,
+    processes: Optional[int] = None,
+    chunk_size: int = 8,
+    downsample: bool = True,
+) -> List[Path]:
+    """Renders many budgets to files, reusing a single figure per process.
+
+    The file format is chosen by the file suffix, e.g. '.png' or '.svg'.
+
+    Args:
+        items: Pairs of budget and target file.
+        processes: Number of worker processes, by default the CPU count,
+            when it's 1 all budgets are rendered in the current process.
+        chunk_size: Number of budgets sent to a worker at once.
+        downsample: Reduce the long lines to what the figure can show.
+
+    Returns:
+        List with the written files, in the order of the items.
+    """
+
+    items = [(budget, Path(file)) for (budget, file) in items]
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    if processes == 1:
+        results = [_render_batch_chunk(chunk, downsample) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker) as executor:
+            results = list(executor.map(_render_batch_chunk, chunks, [downsample] * len(chunks)))
+
+    return [file for chunk_files in results for file in chunk_files]
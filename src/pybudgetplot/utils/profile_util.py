@@ -0,0 +1,153 @@
+"""Helper module for timing the stages of the budget processing.
+
+The library wraps its stages (parsing, rules expansion, frame build, exports)
+in `stage` blocks, which cost almost nothing unless a `Profiler` is active:
+
+    >>> with Profiler(trace_memory=False) as profiler:
+    ...     with stage("some_stage"):
+    ...         pass
+    >>> [(stats.name, stats.calls) for stats in profiler.stats]
+    [('some_stage', 1)]
+"""
+import cProfile
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+# the currently active profilers, the innermost is last
+_ACTIVE: List["Profiler"] = []
+
+
+class StageStats(NamedTuple):
+    """Accumulated measurements of a stage."""
+
+    name: str
+    calls: int
+    wall_time: float
+    peak_memory: int
+
+
+class _OpenStage:
+    """Measurements of a stage that has not finished yet."""
+
+    __slots__ = ("name", "start_time", "start_memory", "peak_memory")
+
+    def __init__(self, name: str, start_memory: int):
+        self.name = name
+        self.start_time = time.perf_counter()
+        self.start_memory = start_memory
+        self.peak_memory = start_memory
+
+
+class Profiler:
+    """Collects the wall time and the peak memory of each stage.
+
+    The peak memory is measured with ``tracemalloc`` relative to the memory
+    allocated when the stage starts. On Python older than 3.9 the peak can't
+    be reset, so it's the peak since the profiler started.
+    """
+
+    def __init__(self, trace_memory: bool = True, profile_calls: bool = False):
+        """Class constructor.
+
+        Args:
+            trace_memory: Measure the peak memory, slows down the allocations.
+            profile_calls: Collect ``cProfile`` stats, see `dump_stats`.
+        """
+
+        self.trace_memory = trace_memory
+        self.profile = cProfile.Profile() if profile_calls else None
+        self._stats: Dict[str, StageStats] = {}
+        self._open: List[_OpenStage] = []
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile is not None:
+            self.profile.enable()
+        _ACTIVE.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _ACTIVE.remove(self)
+        if self.profile is not None:
+            self.profile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def stats(self) -> List[StageStats]:
+        """The stats of the finished stages, in order of their first start."""
+
+        return list(self._stats.values())
+
+    def _traced_memory(self) -> int:
+        """Returns the current traced memory, after updating the peaks of open stages."""
+
+        if not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for open_stage in self._open:
+            open_stage.peak_memory = max(open_stage.peak_memory, peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        return current
+
+    def start_stage(self, name: str):
+        """Starts measuring stage, prefer the `stage` context-manager."""
+
+        self._stats.setdefault(name, StageStats(name, 0, 0.0, 0))
+        self._open.append(_OpenStage(name, self._traced_memory()))
+
+    def end_stage(self):
+        """Ends measuring the last started stage."""
+
+        self._traced_memory()
+        open_stage = self._open.pop()
+        wall_time = time.perf_counter() - open_stage.start_time
+        peak_memory = open_stage.peak_memory - open_stage.start_memory
+
+        previous = self._stats[open_stage.name]
+        self._stats[open_stage.name] = StageStats(
+            open_stage.name,
+            previous.calls + 1,
+            previous.wall_time + wall_time,
+            max(previous.peak_memory, peak_memory),
+        )
+        if self._open:
+            self._open[-1].peak_memory = max(self._open[-1].peak_memory, open_stage.peak_memory)
+
+    def dump_stats(self, file):
+        """Writes the ``cProfile`` stats to .pstats file.
+
+        Raises:
+            RuntimeError: Raised if the profiler was created without 'profile_calls'.
+        """
+
+        if self.profile is None:
+            raise RuntimeError("The calls were not profiled!")
+        self.profile.dump_stats(str(file))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Optional[Profiler]]:
+    """Measures the enclosed block as stage of the active profiler, if any."""
+
+    if not _ACTIVE:
+        yield None
+        return
+
+    profiler = _ACTIVE[-1]
+    profiler.start_stage(name)
+    try:
+        yield profiler
+    finally:
+        profiler.end_stage()
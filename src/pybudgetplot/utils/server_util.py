@@ -0,0 +1,292 @@
+"""Helper module for serving budget renders over local HTTP server.
+
+The server accepts ``POST /render?format=<format>`` requests with a budget
+definition in YAML format as body, and responds with the rendered output.
+The rendering runs in a process pool, while the event-loop only parses the
+requests and serves the cached results.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from yaml import YAMLError
+
+from pybudgetplot.datamodel.budget import Budget
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+CACHE_SIZE = 128
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 4 * 1024 * 1024
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "json": "application/json",
+}
+
+CacheKey = Tuple[str, str]
+
+# errors raised by the renders of invalid budget definitions
+RENDER_ERRORS = (ValueError, KeyError, TypeError, YAMLError)
+
+
+class HttpError(Exception):
+    """Raised when a request can not be served."""
+
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(status, message)
+        self.status = status
+        self.message = message or status.phrase
+
+
+def render(text: str, fmt: str) -> bytes:
+    """Renders the budget definition to the given format.
+
+    Args:
+        text: Budget definition in YAML format.
+        fmt: One of the ``CONTENT_TYPES`` keys.
+
+    Returns:
+        The rendered output.
+    """
+
+    budget = Budget.from_yaml(text)
+
+    if fmt == "csv":
+        return budget.to_csv()
+
+    if fmt == "xlsx":
+        return budget.to_xlsx()
+
+    if fmt == "json":
+        data = budget.as_dataframe()
+        totals = {
+            "date": data.index.strftime("%Y-%m-%d").tolist(),
+            "daily_total": data["daily_total"].tolist(),
+            "cumulative_total": data["cumulative_total"].tolist(),
+        }
+        return json.dumps(totals).encode("utf-8")
+
+    from pybudgetplot.utils.plot_util import render_budget  # pylint: disable=import-outside-toplevel
+
+    return render_budget(budget, fmt=fmt)
+
+
+def create_executor(processes: Optional[int] = None) -> ProcessPoolExecutor:
+    """Creates process pool for the renders.
+
+    The workers are started with the 'spawn' method, so they never inherit the
+    listening socket or the open client connections of the server process.
+    """
+
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+class RenderCache:
+    """LRU cache of the pending and completed renders."""
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """Class constructor.
+
+        Args:
+            max_size: The maximum number of cached renders.
+        """
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[CacheKey, asyncio.Future]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: CacheKey) -> Optional[asyncio.Future]:
+        """Returns the cached render future and marks it as recently used."""
+
+        future = self._items.get(key)
+        if future is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._items.move_to_end(key)
+        return future
+
+    def put(self, key: CacheKey, future: asyncio.Future):
+        """Adds render future to the cache, evicts the least recently used."""
+
+        self._items[key] = future
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def discard(self, key: CacheKey):
+        """Removes render from the cache, e.g. if it has failed."""
+
+        self._items.pop(key, None)
+
+
+class BudgetServer:
+    """Local HTTP server that renders budget definitions."""
+
+    def __init__(self, executor: Optional[Executor] = None, cache_size: int = CACHE_SIZE):
+        """Class constructor.
+
+        Args:
+            executor: Runs the renders, by default one from `create_executor`.
+            cache_size: The maximum number of cached renders.
+        """
+
+        self.executor = create_executor() if (executor is None) else executor
+        self.cache = RenderCache(cache_size)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = SERVER_HOST, port: int = SERVER_PORT) -> Tuple[str, int]:
+        """Starts listening for connections and returns the bound address."""
+
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_SIZE)
+        address = self.server.sockets[0].getsockname()
+        _log.info("serving on http://%s:%d", address[0], address[1])
+        return address[0], address[1]
+
+    async def close(self):
+        """Stops the server and the executor."""
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def get_render(self, body: bytes, fmt: str) -> bytes:
+        """Returns the cached render or schedules new one in the executor."""
+
+        key = (hashlib.sha256(body).hexdigest(), fmt)
+        future = self.cache.get(key)
+        if future is None:
+            text = body.decode("utf-8", errors="surrogateescape")
+            loop = asyncio.get_running_loop()
+            future = asyncio.ensure_future(loop.run_in_executor(self.executor, render, text, fmt))
+            self.cache.put(key, future)
+
+        try:
+            return await asyncio.shield(future)
+        except RENDER_ERRORS as ex:
+            self.cache.discard(key)
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Invalid budget-definition: {ex!r}") from ex
+        except Exception:
+            self.cache.discard(key)
+            raise
+
+    async def handle_request(self, method: str, target: str, body: bytes) -> Tuple[bytes, str]:
+        """Serves single request and returns the response body and content-type."""
+
+        url = urlsplit(target)
+        if url.path != "/render":
+            raise HttpError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        fmt = parse_qs(url.query).get("format", ["json"])[0].lower()
+        if fmt not in CONTENT_TYPES:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Unsupported format {fmt!r}!")
+
+        return await self.get_render(body, fmt), CONTENT_TYPES[fmt]
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Reads single HTTP request from the connection and writes the response."""
+
+        try:
+            try:
+                method, target, body = await _read_request(reader)
+                content, content_type = await self.handle_request(method, target, body)
+                status = HTTPStatus.OK
+            except HttpError as ex:
+                content, content_type = ex.message.encode("utf-8"), "text/plain; charset=utf-8"
+                status = ex.status
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as ex:  # pylint: disable=broad-except
+                _log.exception("failed to serve request")
+                content, content_type = f"Internal error: {ex!r}".encode("utf-8"), "text/plain; charset=utf-8"
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+            await _write_response(writer, status, content, content_type)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            _log.debug("connection closed before the response was sent")
+        finally:
+            writer.close()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """Reads the method, target and body of HTTP request."""
+
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError as ex:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE) from ex
+
+    lines = head.decode("latin1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError as ex:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line!") from ex
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError as ex:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length!") from ex
+    if length < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length!")
+    if length > MAX_BODY_SIZE:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+    body = await reader.readexactly(length)
+    return method.upper(), target, body
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, content: bytes, content_type: str):
+    """Writes HTTP response and closes the connection."""
+
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        "Connection: close\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin1"))
+    writer.write(content)
+    await writer.drain()
+
+
+async def serve(
+    host: str = SERVER_HOST,
+    port: int = SERVER_PORT,
+    processes: Optional[int] = None,
+    cache_size: int = CACHE_SIZE,
+):
+    """Runs the server until cancelled."""
+
+    server = BudgetServer(create_executor(processes), cache_size)
+    await server.start(host, port)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
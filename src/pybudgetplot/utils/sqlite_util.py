@@ -0,0 +1,170 @@
+"""Helper module for storing and querying budget breakdowns in SQLite database."""
+import logging
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from numpy import nonzero
+from pandas import DataFrame
+
+from pybudgetplot.datamodel.budget import BALANCE_SUFFIX, INTEREST_COLUMN, ROLLING_COLUMNS
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS breakdown (
+    budget_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    event TEXT NOT NULL,
+    amount REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS breakdown_budget_date ON breakdown (budget_id, date);
+CREATE TABLE IF NOT EXISTS totals (
+    budget_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    daily_total REAL NOT NULL,
+    cumulative_total REAL NOT NULL,
+    PRIMARY KEY (budget_id, date)
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    budget_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+SQL_DELETE_BREAKDOWN = "DELETE FROM breakdown WHERE budget_id = ?"
+SQL_DELETE_TOTALS = "DELETE FROM totals WHERE budget_id = ?"
+SQL_INSERT_BREAKDOWN = "INSERT INTO breakdown (budget_id, date, event, amount) VALUES (?, ?, ?, ?)"
+SQL_INSERT_TOTALS = "INSERT INTO totals (budget_id, date, daily_total, cumulative_total) VALUES (?, ?, ?, ?)"
+SQL_SELECT_FINGERPRINT = "SELECT fingerprint FROM fingerprints WHERE budget_id = ?"
+SQL_UPSERT_FINGERPRINT = "INSERT OR REPLACE INTO fingerprints (budget_id, fingerprint) VALUES (?, ?)"
+
+SQL_SELECT_BELOW = """
+SELECT budget_id, MIN(date) AS first_date, MIN(cumulative_total) AS min_balance
+FROM totals
+WHERE cumulative_total < :threshold
+  AND (:start IS NULL OR date >= :start)
+  AND (:end IS NULL OR date <= :end)
+  AND (:month IS NULL OR CAST(strftime('%m', date) AS INTEGER) = :month)
+GROUP BY budget_id
+ORDER BY budget_id
+"""
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# the breakdown columns that are not events, besides the '<account>_balance' columns
+TOTAL_COLUMNS = (INTEREST_COLUMN, "daily_total", "cumulative_total") + ROLLING_COLUMNS
+
+
+def connect(file) -> sqlite3.Connection:
+    """Opens connection to the database file, creates the file and schema if missing."""
+
+    file_path = Path(file).absolute().resolve(strict=False)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    connection = sqlite3.connect(str(file_path))
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def insert_breakdown(
+    connection: sqlite3.Connection,
+    budget_id: str,
+    data: DataFrame,
+    fingerprint: Optional[str] = None,
+):
+    """Replaces the stored breakdown of a budget within a single transaction.
+
+    The event amounts are stored in long format and only the non-zero values
+    are kept, while the totals table contains a row for each date. The
+    interest, the balances and the statistics columns are not events.
+
+    Args:
+        connection: Open database connection.
+        budget_id: Identifier of the budget.
+        data: DataFrame with the budget breakdown, as returned by ``Budget.as_dataframe``.
+        fingerprint: Optional fingerprint of the stored breakdown, see ``fingerprint_util``.
+    """
+
+    dates = data.index.strftime(DATE_FORMAT).to_numpy()
+    # select by mask of the names, the event descriptions may repeat
+    names = data.columns.astype(str)
+    block = data.loc[:, ~(names.isin(TOTAL_COLUMNS) | names.str.endswith(BALANCE_SUFFIX))]
+    events = block.columns.to_numpy()
+    amounts = block.to_numpy(dtype=float)
+    rows, cols = nonzero(amounts)
+
+    breakdown_rows = zip(
+        [budget_id] * len(rows),
+        dates[rows].tolist(),
+        events[cols].tolist(),
+        amounts[rows, cols].tolist(),
+    )
+    totals_rows = zip(
+        [budget_id] * len(dates),
+        dates.tolist(),
+        data["daily_total"].to_numpy(dtype=float).tolist(),
+        data["cumulative_total"].to_numpy(dtype=float).tolist(),
+    )
+
+    with connection:
+        connection.execute(SQL_DELETE_BREAKDOWN, (budget_id,))
+        connection.execute(SQL_DELETE_TOTALS, (budget_id,))
+        connection.executemany(SQL_INSERT_BREAKDOWN, breakdown_rows)
+        connection.executemany(SQL_INSERT_TOTALS, totals_rows)
+        if fingerprint is not None:
+            connection.execute(SQL_UPSERT_FINGERPRINT, (budget_id, fingerprint))
+
+    _log.debug("stored breakdown of %r with %d events and %d dates", budget_id, len(events), len(dates))
+
+
+def write_breakdown(file, budget_id: str, data: DataFrame, fingerprint: Optional[str] = None):
+    """Writes the budget breakdown to database file, replacing any previous data."""
+
+    with closing(connect(file)) as connection:
+        insert_breakdown(connection, budget_id, data, fingerprint)
+
+
+def read_breakdown_fingerprint(file, budget_id: str) -> Optional[str]:
+    """Returns the fingerprint of the stored budget breakdown or None if missing."""
+
+    file_path = Path(file).absolute()
+    if not file_path.is_file():
+        return None
+    with closing(connect(file_path)) as connection:
+        row = connection.execute(SQL_SELECT_FINGERPRINT, (budget_id,)).fetchone()
+    return None if (row is None) else row[0]
+
+
+def query_below(
+    file,
+    threshold: float = 0.0,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    month: Optional[int] = None,
+) -> List[Tuple[str, str, float]]:
+    """Finds the stored budgets with cumulative total below the threshold.
+
+    Args:
+        file: Database file.
+        threshold: The balance value to compare against.
+        start: Optional ISO-format date, dates before it are ignored.
+        end: Optional ISO-format date, dates after it are ignored.
+        month: Optional month number, dates from other months are ignored.
+
+    Returns:
+        List of (budget_id, first_date, min_balance) tuples sorted by budget_id.
+
+    Raises:
+        FileNotFoundError: Raised if the database file does not exist.
+    """
+
+    file_path = Path(file).absolute().resolve(strict=True)
+    params = {"threshold": threshold, "start": start, "end": end, "month": month}
+    with closing(connect(file_path)) as connection:
+        return connection.execute(SQL_SELECT_BELOW, params).fetchall()
@@ -0,0 +1,97 @@
+"""Helper module for watching a budget definition file for changes."""
+import hashlib
+import logging
+import lzma
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Optional
+
+from pybudgetplot.utils.file_util import read_bytes
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+# errors raised while reading file that is replaced or still being written
+READ_ERRORS = (OSError, EOFError, lzma.LZMAError, zlib.error)
+
+WATCH_INTERVAL = 1.0
+
+
+class FileWatcher:
+    """Polls a file for changes of its modification time and contents hash."""
+
+    def __init__(self, file):
+        """Class constructor.
+
+        Args:
+            file: The watched file.
+        """
+
+        self.file = Path(file).absolute()
+        self._mtime_ns: Optional[int] = None
+        self._digest: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(file={str(self.file)!r})"
+
+    def poll(self) -> Optional[bytes]:
+        """Checks the file for changes.
+
+        The contents are read only if the modification time has changed, and
+        are returned only if their hash differs from the previous contents.
+
+        Returns:
+            The decompressed file contents if changed since the last poll, None otherwise.
+        """
+
+        try:
+            mtime_ns = self.file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        if mtime_ns == self._mtime_ns:
+            return None
+
+        try:
+            data = read_bytes(self.file, decompress=True)
+        except READ_ERRORS as ex:
+            _log.warning("failed to read %r, retrying on next poll: %r", self, ex)
+            return None
+
+        self._mtime_ns = mtime_ns
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == self._digest:
+            _log.debug("%r touched but contents unchanged", self)
+            return None
+
+        self._digest = digest
+        return data
+
+
+def watch_file(
+    file,
+    on_change: Callable[[bytes], None],
+    *,
+    interval: float = WATCH_INTERVAL,
+    wait: Callable[[float], None] = time.sleep,
+    max_polls: Optional[int] = None,
+):
+    """Calls back with the file contents initially and after every change.
+
+    Args:
+        file: The watched file.
+        on_change: Called with the decompressed file contents.
+        interval: Seconds to wait between the polls.
+        wait: Called with the interval between the polls, e.g. to process GUI events.
+        max_polls: Stop after that many polls, by default watches until interrupted.
+    """
+
+    watcher = FileWatcher(file)
+    polls = 0
+    while (max_polls is None) or (polls < max_polls):
+        data = watcher.poll()
+        if data is not None:
+            on_change(data)
+        polls += 1
+        wait(interval)
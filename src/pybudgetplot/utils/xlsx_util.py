@@ -1,6 +1,8 @@
 """Helper module for creating XLSX file with the budget breakdown data."""
 import logging
+import math
 from io import BytesIO
+from typing import Optional
 
 from pandas import DataFrame
 from xlsxwriter import Workbook
@@ -47,13 +49,39 @@ FMT_CUMULATIVE = {
     "right": 2,
 }
 
+# the name of the sheet with the breakdown by category
+CATEGORIES_SHEET = "Categories"
 
-def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
-    """Generates Excel document from DataFrame containing budged breakdown."""
 
-    # prepare worksheet
+def _cell_number(value) -> Optional[float]:
+    """Returns the value as float, or None for the missing values, which are written as blank cells."""
+
+    number = float(value)
+    return None if math.isnan(number) else number
+
+
+def generate_xlsx(data: DataFrame, sheet_name="Breakdown", categories: Optional[DataFrame] = None) -> bytes:
+    """Generates Excel document from DataFrame containing budged breakdown.
+
+    Args:
+        data: The breakdown, with column for each event, the two totals and optionally the account balances.
+        sheet_name: Name of the breakdown sheet.
+        categories: Optional breakdown by category, written to the 'Categories' sheet.
+    """
+
     buffer = BytesIO()
     workbook = Workbook(buffer)
+    _add_breakdown_sheet(workbook, sheet_name, data)
+    if categories is not None:
+        _add_breakdown_sheet(workbook, CATEGORIES_SHEET, categories)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def _add_breakdown_sheet(workbook: Workbook, sheet_name: str, data: DataFrame):
+    """Adds sheet with table of the breakdown to the workbook."""
+
+    # prepare worksheet
     worksheet = workbook.add_worksheet(sheet_name)
 
     # init formats
@@ -63,13 +91,14 @@ def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
     fmt_daily = workbook.add_format(FMT_DAILY)
     fmt_cumulative = workbook.add_format(FMT_CUMULATIVE)
 
-    # extract the column names
+    # extract the column names, the columns after the cumulative total are the balances and the statistics
     column_names = ["DATE"] + data.axes[1].to_list()
-    column_names[-2:] = ["DAILY", "CUMULATIVE"]
-
-    # calculate the indexes of the 'daily' and 'cumulative' columns
-    idx_cumulative = len(column_names) - 1
+    idx_cumulative = column_names.index("cumulative_total") if ("cumulative_total" in column_names) else -1
+    idx_cumulative %= len(column_names)
     idx_daily = idx_cumulative - 1
+    total_name = str(column_names[idx_daily])
+    total_name = total_name[:-len("_total")] if total_name.endswith("_total") else total_name
+    column_names[idx_daily:idx_cumulative + 1] = [total_name.upper(), "CUMULATIVE"]
 
     def get_cell_format(column_index_: int):
         """Get format for a cell that belongs to column with the given index."""
@@ -77,7 +106,7 @@ def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
         if column_index_ == 0:
             return fmt_date
 
-        if column_index_ == idx_cumulative:
+        if column_index_ >= idx_cumulative:
             return fmt_cumulative
 
         if column_index_ == idx_daily:
@@ -87,9 +116,13 @@ def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
 
     # extract the rows data
     rows_data = [
-        ([item[0].date()] + [float(_) for _ in item[1:]]) for item in data.itertuples()
+        ([item[0].date()] + [_cell_number(_) for _ in item[1:]]) for item in data.itertuples()
     ]
 
+    # the cumulative total may start from opening balance, e.g. of a window or an account
+    opening = (rows_data[0][idx_cumulative] - rows_data[0][idx_daily]) if rows_data else 0.0
+    opening = round(opening, 10)
+
     # replace the values of all 'daily' and 'cumulative' cells with formulas
     for row_index, row_cells in enumerate(rows_data, start=1):
         first_amount_cell = xl_rowcol_to_cell(row_index, 1)
@@ -103,6 +136,8 @@ def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
                 row_index - 1, idx_cumulative
             )
             cumulative_formula += f"+{previous_row_cumulative_cell}"
+        elif opening:
+            cumulative_formula += f"+({opening!r})"
         row_cells[idx_cumulative] = cumulative_formula  # noqa
 
     # prepare columns for Excel table
@@ -135,7 +170,7 @@ def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
     }
 
     # add the Excel table to the sheet
-    worksheet.add_table(0, 0, len(rows_data) + 1, idx_cumulative, excel_table)
+    worksheet.add_table(0, 0, len(rows_data) + 1, len(column_names) - 1, excel_table)
 
     # freeze the first row and the first column
     worksheet.freeze_panes(1, 1)
@@ -150,5 +185,43 @@ def generate_xlsx(data: DataFrame, sheet_name="Breakdown") -> bytes:
         column_width = 10 if (column_index == 0) else (len(column_name) + 2)
         worksheet.set_column(column_xl_address, column_width)
 
+
+def generate_table_xlsx(data: DataFrame, sheet_name: str) -> bytes:
+    """Generates Excel document with single table of the DataFrame values, with the index as first column.
+
+    Args:
+        data: The table, with numeric columns.
+        sheet_name: Name of the table sheet.
+    """
+
+    buffer = BytesIO()
+    workbook = Workbook(buffer)
+    worksheet = workbook.add_worksheet(sheet_name)
+    fmt_header = workbook.add_format(FMT_HEADER)
+    fmt_amount = workbook.add_format(FMT_AMOUNT)
+
+    column_names = [str(data.index.name or "")] + [str(name) for name in data.columns]
+    rows_data = [[str(item[0])] + [float(_) for _ in item[1:]] for item in data.itertuples()]
+    excel_table_columns = [
+        {"header": col_name, "header_format": fmt_header, "format": None if (col_idx == 0) else fmt_amount}
+        for (col_idx, col_name) in enumerate(column_names)
+    ]
+    excel_table = {
+        "header_row": 1,
+        "autofilter": True,
+        "style": "Table Style Light 11",
+        "first_column": True,
+        "banded_rows": False,
+        "data": rows_data,
+        "columns": excel_table_columns,
+    }
+    worksheet.add_table(0, 0, max(len(rows_data), 1), len(column_names) - 1, excel_table)
+    worksheet.freeze_panes(1, 1)
+
+    first_width = max([len(row[0]) for row in rows_data] + [len(column_names[0]), 8]) + 2
+    worksheet.set_column(0, 0, first_width)
+    for column_index, column_name in enumerate(column_names[1:], start=1):
+        worksheet.set_column(column_index, column_index, len(column_name) + 2)
+
     workbook.close()
     return buffer.getvalue()
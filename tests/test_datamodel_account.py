@@ -0,0 +1,99 @@
+"""Unit-tests for the `pybudgetplot.datamodel.account` module."""
+import pickle
+from unittest import TestCase
+
+import numpy
+from pandas import DatetimeIndex, date_range
+
+from pybudgetplot.datamodel.account import Account, affine_scan, compounding_counts
+
+
+def _loop_scan(multipliers, flows, initial):
+    balances = []
+    balance = initial
+    for multiplier, flow in zip(multipliers, flows):
+        balance = balance * multiplier + flow
+        balances.append(balance)
+    return numpy.array(balances)
+
+
+class AffineScanTests(TestCase):
+    """Unit-tests for the `affine_scan` method."""
+
+    def test_given_flows_then_equals_loop(self):
+        rng = numpy.random.default_rng(0)
+        multipliers = rng.uniform(0.99, 1.01, 1000)
+        flows = rng.uniform(-100.0, 100.0, 1000)
+        for block_size in (1, 7, 256, 2000):
+            with self.subTest(block_size=block_size):
+                actual = affine_scan(multipliers, flows, 500.0, block_size=block_size)
+                numpy.testing.assert_allclose(_loop_scan(multipliers, flows, 500.0), actual)
+
+    def test_given_scenarios_then_solves_each_column(self):
+        rng = numpy.random.default_rng(1)
+        multipliers = rng.uniform(0.99, 1.01, (300, 4))
+        flows = rng.uniform(-100.0, 100.0, (300, 4))
+        initial = numpy.array([0.0, 1.0, 2.0, 3.0])
+        actual = affine_scan(multipliers, flows, initial, block_size=64)
+        self.assertTupleEqual((300, 4), actual.shape)
+        for column in range(4):
+            expected = _loop_scan(multipliers[:, column], flows[:, column], initial[column])
+            numpy.testing.assert_allclose(expected, actual[:, column])
+
+    def test_given_empty_flows_then_returns_empty(self):
+        self.assertEqual(0, len(affine_scan([], [])))
+
+    def test_given_non_positive_multiplier_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            affine_scan([1.0, 0.0], [1.0, 1.0])
+
+
+class CompoundingCountsTests(TestCase):
+    """Unit-tests for the `compounding_counts` method."""
+
+    def test_given_dates_then_counts_compounding_dates_since_previous(self):
+        dates = DatetimeIndex(["2020-01-30", "2020-01-31", "2020-02-01", "2020-04-15", "2021-01-01"])
+        self.assertListEqual([0, 1, 1, 74, 261], compounding_counts(dates, "daily").tolist())
+        self.assertListEqual([0, 0, 1, 2, 9], compounding_counts(dates, "monthly").tolist())
+        self.assertListEqual([0, 0, 0, 0, 1], compounding_counts(dates, "yearly").tolist())
+
+
+class AccountTests(TestCase):
+    """Unit-tests for the `Account` class."""
+
+    def test_constructor(self):
+        account = Account("1000", 0.05, " Daily ")
+        self.assertEqual(Account(1000, 0.05, "daily"), account)
+        self.assertEqual(account, Account.from_dict(account.as_dict()))
+        self.assertEqual(Account(), Account.from_dict({}))
+
+    def test_constructor_when_bad_values_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            Account(compounding="hourly")
+        with self.assertRaises(ValueError):
+            Account(rate=-12, compounding="monthly")
+
+    def test_immutable_hashable_and_picklable(self):
+        account = Account(1000, 0.05)
+        with self.assertRaises(AttributeError):
+            account.rate = 0.1  # noqa
+        self.assertEqual(1, len({account, Account(1000.0, "0.05")}))
+        self.assertEqual(account, pickle.loads(pickle.dumps(account)))
+        self.assertEqual("Account(opening=1000.0, rate=0.05, compounding='monthly')", repr(account))
+
+    def test_balances_monthly(self):
+        dates = date_range("2020-01-30", "2020-03-02")
+        flows = numpy.zeros(len(dates))
+        flows[0] = 100.0
+        balances, interest = Account(1000, 0.12, "monthly").balances(dates, flows)
+        self.assertAlmostEqual(1100.0, balances[1])
+        self.assertAlmostEqual(1111.0, balances[2])
+        self.assertAlmostEqual(1122.11, balances[-1])
+        self.assertAlmostEqual(22.11, interest.sum())
+        numpy.testing.assert_allclose(balances, 1000.0 + numpy.cumsum(flows + interest))
+
+    def test_balances_without_rate(self):
+        dates = date_range("2020-01-01", "2020-01-03")
+        balances, interest = Account(10).balances(dates, [1.0, 2.0, 3.0])
+        self.assertListEqual([11.0, 13.0, 16.0], balances.tolist())
+        self.assertListEqual([0.0, 0.0, 0.0], interest.tolist())
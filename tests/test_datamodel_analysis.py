@@ -0,0 +1,63 @@
+"""Unit-tests for the `pybudgetplot.datamodel.analysis` module."""
+from io import BytesIO
+from unittest import TestCase
+from zipfile import ZipFile
+
+from pybudgetplot.datamodel.account import Account
+from pybudgetplot.datamodel.analysis import contributions_to_csv, contributions_to_xlsx, event_contributions
+from pybudgetplot.datamodel.budget import Budget
+
+BUDGET = Budget("2020-11-01", "2020-12-31")
+BUDGET.add_event("Cash", 200, "2020-11-01")
+BUDGET.add_event("Salary", 1300, "Every Month starting 2020-11-03")
+BUDGET.add_event("Rent", -450, "Every Month starting 2020-11-15")
+BUDGET.add_event("Food", -15, "Every day")
+BUDGET.add_event("TV", -1500, "2020-11-20")
+
+
+def _without(budget: Budget, description: str) -> Budget:
+    result = Budget.from_yaml(budget.as_yaml())
+    result.remove_event(description)
+    return result
+
+
+class EventContributionsTests(TestCase):
+    """Unit-tests for the `event_contributions` method."""
+
+    def test_given_budget_then_ranks_events_by_min_balance(self):
+        data = event_contributions(BUDGET)
+        self.assertListEqual(["min_balance", "end_balance", "negative_days"], data.columns.to_list())
+        self.assertListEqual(["TV", "Food", "Rent", "Cash", "Salary"], data.index.to_list())
+
+        balance = BUDGET.as_dataframe()["cumulative_total"]
+        key_date = balance.idxmin()
+        for description in data.index:
+            with self.subTest(description=description):
+                rest = _without(BUDGET, description).as_dataframe()["cumulative_total"]
+                self.assertAlmostEqual(balance[-1] - rest[-1], data.loc[description, "end_balance"])
+                self.assertAlmostEqual(balance[key_date] - rest[key_date], data.loc[description, "min_balance"])
+                added_days = (balance < 0).sum() - (rest < 0).sum()
+                self.assertEqual(added_days, data.loc[description, "negative_days"])
+
+    def test_given_window_and_floor_then_counts_days_in_window(self):
+        data = event_contributions(BUDGET, start="2020-12-01", floor=100.0)
+        balance = BUDGET.as_dataframe("2020-12-01")["cumulative_total"]
+        rest = _without(BUDGET, "TV").as_dataframe("2020-12-01")["cumulative_total"]
+        self.assertEqual((balance < 100).sum() - (rest < 100).sum(), data.loc["TV", "negative_days"])
+
+    def test_given_account_with_interest_then_includes_interest(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(1000, 0.5, "daily")
+        data = event_contributions(budget)
+        balance = budget.as_dataframe()["cumulative_total"]
+        rest = _without(budget, "Salary").as_dataframe()["cumulative_total"]
+        self.assertAlmostEqual(balance[-1] - rest[-1], data.loc["Salary", "end_balance"])
+        self.assertGreater(data.loc["Salary", "end_balance"], 2600.0)
+
+    def test_export(self):
+        data = event_contributions(BUDGET)
+        lines = contributions_to_csv(data).decode("utf-8").splitlines()
+        self.assertEqual("event,min_balance,end_balance,negative_days", lines[0])
+        self.assertTrue(lines[1].startswith("TV,-1500.00,"))
+        with ZipFile(BytesIO(contributions_to_xlsx(data))) as document:
+            self.assertIn(b"Salary", document.read("xl/sharedStrings.xml"))
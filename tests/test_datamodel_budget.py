@@ -1,12 +1,20 @@
 """Unit-tests for the `pybudgetplot.definitions.budget` module."""
 from datetime import date
+from io import BytesIO
+from math import isnan
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
+from zipfile import ZipFile
 
 from pandas import Timestamp
+from pandas.testing import assert_frame_equal, assert_series_equal
 
-from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.datamodel.account import Account
+from pybudgetplot.datamodel.budget import ROLLING_COLUMNS, Budget, _write_text_table
+from pybudgetplot.datamodel.calendars import Calendar
 from pybudgetplot.datamodel.event import Event
+from pybudgetplot.datamodel.event_table import EventTable
 from pybudgetplot.datamodel.period import Period
 from pybudgetplot.utils.file_util import read_bytes, read_str
 
@@ -33,7 +41,7 @@ class BudgetTests(TestCase):
         budget = Budget("2022-01-01", "2022-01-31")
 
         self.assertIsInstance(budget.period, Period)
-        self.assertIsInstance(budget.events, list)
+        self.assertIsInstance(budget.events, EventTable)
 
         expected_period = Period(
             Timestamp(year=2022, month=1, day=1), Timestamp(year=2022, month=1, day=31)
@@ -42,7 +50,7 @@ class BudgetTests(TestCase):
         self.assertEqual(expected_period, actual_period)
 
         expected_events = []
-        actual_events = budget.events
+        actual_events = list(budget.events)
         self.assertListEqual(expected_events, actual_events)
 
     def test_repr(self):
@@ -68,7 +76,7 @@ class BudgetTests(TestCase):
         actual_event = budget.add_event(desc, amount, freq)
         self.assertEqual(expected_event, actual_event)
         self.assertIn(actual_event, budget.events)
-        self.assertListEqual([actual_event], budget.events)
+        self.assertListEqual([actual_event], list(budget.events))
 
     def test_as_dict(self):
         budget = Budget("2022-01-01", "2022-01-31")
@@ -109,6 +117,25 @@ class BudgetTests(TestCase):
         actual = Budget.from_dict(data)
         self.assertEqual(expected, actual)
 
+    def test_from_yaml_with_calendar(self):
+        with TemporaryDirectory() as temp_dir:
+            Path(temp_dir).joinpath("holidays.txt").write_text("2020-12-24\n2020-12-25\n", encoding="utf-8")
+            budget = Budget("2020-12-20", "2020-12-31", calendar=Calendar(["2020-12-24", "2020-12-25"]))
+            budget.add_event("Commute", -5, "Every WeekDay")
+            budget.add_event("Rent", -450, "Every Month on the 26th, following")
+            self.assertIn("holidays:", budget.as_yaml())
+            self.assertEqual(budget, Budget.from_yaml(budget.as_yaml()))
+
+            text = budget.as_yaml().replace("holidays:\n  - '2020-12-24'\n  - '2020-12-25'", "calendar: holidays.txt")
+            actual = Budget.from_yaml(text, Path(temp_dir))
+            self.assertEqual(budget, actual)
+            self.assertEqual("holidays.txt", actual.period.calendar.source)
+            self.assertIn("calendar: holidays.txt", actual.as_yaml())
+
+            totals = actual.as_dataframe()["daily_total"]
+            self.assertEqual(-35, totals.sum() + 450)
+            self.assertEqual(-455, totals[Timestamp("2020-12-28")])
+
     def test_as_yaml(self):
         sample_file = SAMPLES_DIR.joinpath("budget.yaml")
         expected_str = read_str(sample_file)
@@ -142,6 +169,338 @@ class BudgetTests(TestCase):
         actual_str = BUDGET.to_txt()
         self.assertEqual(expected_str, actual_str)
 
+    def test_write_txt_when_chunked_then_same_as_dataframe_text(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(-1000, 0.5, "daily")
+        budget.add_event("Description that is longer than the widest column of the text table", -1, "2020-11-05")
+        for granularity in ("daily", "monthly"):
+            data = budget._export_frame(None, None, granularity, True, True)
+            for chunk_rows in (1, 7, len(data)):
+                with self.subTest(granularity=granularity, chunk_rows=chunk_rows):
+                    buffer = BytesIO()
+                    _write_text_table(buffer, data, chunk_rows)
+                    self.assertEqual(str(data), buffer.getvalue().decode("utf-8"))
+
+        buffer = BytesIO()
+        budget.write_txt(buffer, start="2020-12-01", rolling=True)
+        self.assertEqual(budget.to_txt(start="2020-12-01", rolling=True), buffer.getvalue().decode("utf-8"))
+
+    def test_as_dataframe_when_event_date_outside_period_then_date_included(self):
+        budget = Budget("2020-11-01", "2020-11-05")
+        budget.add_event("Opening", 1000, "2020-10-31")
+        budget.add_event("Food", -10, "every day")
+
+        data = budget.as_dataframe()
+
+        self.assertEqual(Timestamp("2020-10-31"), data.index[0])
+        self.assertEqual(6, len(data))
+        self.assertEqual(950.0, data["cumulative_total"].iloc[-1])
+
+    def test_as_dataframe_in_window(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.add_event("Opening", 1000, "2020-10-31")
+
+        for start, end in (("2020-11-20", "2020-12-10"), (None, "2020-11-10"), ("2020-12-01", None)):
+            with self.subTest(start=start, end=end):
+                actual = budget.as_dataframe(start, end)
+                self.assertIsNone(budget._cached_frame())
+                expected = Budget.from_yaml(budget.as_yaml()).as_dataframe().loc[start:end]
+                assert_frame_equal(expected, actual, check_freq=False)
+
+        budget.as_dataframe()
+        assert_frame_equal(
+            budget.as_dataframe().loc["2020-11-20":"2020-12-10"],
+            budget.as_dataframe("2020-11-20", "2020-12-10"),
+        )
+
+    def test_as_dataframe_when_window_start_after_end_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            BUDGET.as_dataframe("2020-12-10", "2020-11-20")
+
+    def test_as_rollup_equals_resampled_daily_breakdown(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.add_event("Opening", 1000, "2020-10-30")
+        daily = budget.as_dataframe()
+
+        for granularity, rule in (("weekly", "W-MON"), ("monthly", "MS"), ("yearly", "AS")):
+            with self.subTest(granularity=granularity):
+                expected = daily.iloc[:, :-2].resample(rule, label="left", closed="left").sum()
+                expected[f"{granularity}_total"] = expected.sum(axis=1)
+                expected["cumulative_total"] = expected[f"{granularity}_total"].cumsum()
+                expected.index.rename("date", inplace=True)
+                actual = budget.as_rollup(granularity)
+                assert_frame_equal(expected, actual, check_freq=False)
+
+    def test_as_monthly_in_window(self):
+        data = BUDGET.as_monthly("2020-11-10", "2020-12-05")
+        self.assertListEqual([Timestamp("2020-11-01"), Timestamp("2020-12-01")], data.index.to_list())
+        expected = BUDGET.as_dataframe().loc["2020-12-05", "cumulative_total"]
+        self.assertAlmostEqual(expected, data["cumulative_total"].iloc[-1])
+
+    def test_as_weekly_and_as_yearly(self):
+        self.assertEqual(Timestamp("2020-10-26"), BUDGET.as_weekly().index[0])
+        self.assertIn("yearly_total", BUDGET.as_yearly().columns)
+
+    def test_as_rollup_when_bad_granularity_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            BUDGET.as_rollup("hourly")
+
+    def test_as_categories_equals_grouped_daily_breakdown(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.update_event("Salary", category="Income")
+        budget.update_event("Rent", category="Home", tags="fixed")
+        budget.update_event("PowerBill", category="Home", tags="fixed,utility")
+        daily = budget.as_dataframe()
+        categories = ["Income", "Home", "Home"] + ["(uncategorized)"] * (len(budget.events) - 3)
+        descriptions = ["Salary", "Rent", "PowerBill"] + [
+            description for description in daily.columns[:-2] if description not in ("Salary", "Rent", "PowerBill")
+        ]
+        expected = daily[descriptions].groupby(categories, axis=1, sort=False).sum()
+        expected["daily_total"] = daily["daily_total"]
+        expected["cumulative_total"] = daily["cumulative_total"]
+
+        assert_frame_equal(expected, budget.as_categories(), check_freq=False)
+        self.assertIn("Home", Budget.from_yaml(budget.as_yaml()).as_categories().columns)
+
+    def test_as_tags(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.update_event("Rent", tags="fixed")
+        budget.update_event("PowerBill", tags="fixed,utility")
+        data = budget.as_tags(granularity="monthly")
+        self.assertListEqual(["fixed", "utility", "monthly_total", "cumulative_total"], data.columns.to_list())
+        self.assertListEqual([-510.0, -510.0], data["fixed"].to_list())
+        assert_frame_equal(budget.as_monthly().iloc[:, -2:], data.iloc[:, -2:])
+
+    def test_account_balance(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(1000, 0.06, "monthly")
+        plain = BUDGET.as_dataframe()
+        data = budget.as_dataframe()
+
+        self.assertEqual("interest", data.columns[-3])
+        self.assertEqual(0.0, data.loc["2020-11-30", "interest"])
+        expected_interest = (1000.0 + plain.loc["2020-11-30", "cumulative_total"]) * 0.005
+        self.assertAlmostEqual(expected_interest, data.loc["2020-12-01", "interest"])
+        self.assertAlmostEqual(1000.0 + plain["daily_total"].sum() + expected_interest, data["cumulative_total"][-1])
+        assert_series_equal(data["daily_total"].cumsum() + 1000.0, data["cumulative_total"], check_names=False)
+
+    def test_account_balance_in_window_and_rollup(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(-500, 0.2, "daily")
+        daily = budget.as_dataframe()
+
+        fresh = Budget.from_yaml(budget.as_yaml())
+        self.assertEqual(budget, fresh)
+        window = fresh.as_dataframe("2020-11-20", "2020-12-10")
+        assert_frame_equal(daily.loc["2020-11-20":"2020-12-10"], window, check_freq=False)
+
+        monthly = fresh.as_monthly()
+        month_ends = daily["cumulative_total"][["2020-11-30", "2020-12-31"]].to_list()
+        self.assertListEqual(month_ends, monthly["cumulative_total"].to_list())
+        self.assertAlmostEqual(daily["interest"].sum(), monthly["interest"].sum())
+
+    def test_accounts_and_transfers(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.accounts = {"checking": Account(100), "savings": Account(1000, 0.12, "monthly")}
+        budget.add_event("Saving", 300, "Every Month starting 2020-11-05", transfer_to="savings")
+        budget.add_event("Gift", 50, "2020-12-24", account="savings")
+        self.assertEqual(budget, Budget.from_yaml(budget.as_yaml()))
+        self.assertIn("ACCOUNTS", budget.as_dict())
+
+        data = budget.as_dataframe()
+        self.assertEqual(0.0, data["Saving"].abs().sum())
+
+        balances = budget.as_accounts()
+        self.assertListEqual(["checking", "savings"], balances.columns.to_list())
+        plain = BUDGET.as_dataframe()
+        self.assertAlmostEqual(100.0 + plain["cumulative_total"][-1] - 600.0, balances["checking"][-1])
+        self.assertAlmostEqual(1300.0, balances.loc["2020-11-30", "savings"])
+        self.assertAlmostEqual(1313.0 + 300.0 + 50.0, balances.loc["2020-12-31", "savings"])
+        assert_series_equal(balances.sum(axis=1), data["cumulative_total"], check_names=False)
+
+        flows = budget.as_flows("2020-11-30")
+        self.assertEqual(300.0, flows.loc["2020-11-05", "savings"])
+        self.assertEqual(Timestamp("2020-11-30"), flows.index[-1])
+
+        monthly = budget.as_accounts(granularity="monthly")
+        self.assertListEqual(balances.loc["2020-12-31"].to_list(), monthly.iloc[-1].to_list())
+
+    def test_accounts_when_unknown_account_then_raises_value_error(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.add_event("Saving", 300, "Every Month", transfer_to="savings")
+        with self.assertRaises(ValueError):
+            budget.as_accounts()
+
+    def test_to_csv_with_accounts(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(100)
+        lines = budget.to_csv(granularity="monthly", accounts=True).decode("utf-8").splitlines()
+        self.assertTrue(lines[0].endswith(",cumulative_total,main_balance"))
+        self.assertEqual(lines[-1].split(",")[-2], lines[-1].split(",")[-1])
+        with ZipFile(BytesIO(budget.to_xlsx(accounts=True))) as document:
+            self.assertIn(b"main_balance", document.read("xl/sharedStrings.xml"))
+
+    def test_as_rolling(self):
+        data = BUDGET.as_dataframe(rolling=True)
+        self.assertListEqual(list(ROLLING_COLUMNS), data.columns[-5:].to_list())
+
+        spend = -BUDGET.as_occurrences().clip(upper=0).sum(axis=1)
+        for days in (7, 30, 90):
+            with self.subTest(days=days):
+                expected = spend.rolling(days, min_periods=1).sum()
+                assert_series_equal(expected, data[f"spend_{days}d"], check_names=False)
+
+        balance = data["cumulative_total"]
+        burn = (balance["2020-11-30"] - balance["2020-12-30"]) / 30
+        self.assertAlmostEqual(burn, data.loc["2020-12-30", "daily_burn"])
+        self.assertAlmostEqual(-balance["2020-11-01"], data.loc["2020-11-01", "daily_burn"])
+        runway = data.loc["2020-12-30", "runway_days"]
+        self.assertAlmostEqual(balance["2020-12-30"] / data.loc["2020-12-30", "daily_burn"], runway)
+        self.assertTrue(isnan(data.loc["2020-11-03", "runway_days"]))
+
+        window = BUDGET.as_rolling("2020-12-01", "2020-12-15")
+        assert_frame_equal(data.loc["2020-12-01":"2020-12-15", list(ROLLING_COLUMNS)], window, check_freq=False)
+        monthly = BUDGET.as_rolling(granularity="monthly")
+        self.assertListEqual(window.iloc[-1].to_list(), BUDGET.as_rolling(end="2020-12-15").iloc[-1].to_list())
+        self.assertListEqual(data[list(ROLLING_COLUMNS)].iloc[-1].to_list(), monthly.iloc[-1].to_list())
+
+    def test_as_rolling_when_balance_not_positive_then_runway_is_zero(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(-2000)
+        data = budget.as_rolling()
+        self.assertEqual(0.0, data.loc["2020-11-01", "runway_days"])
+        self.assertAlmostEqual(-160.0, data.loc["2020-11-01", "daily_burn"])
+        self.assertTrue((data["runway_days"] == 0.0).all())
+
+    def test_to_csv_with_rolling(self):
+        lines = BUDGET.to_csv(granularity="weekly", rolling=True).decode("utf-8").splitlines()
+        self.assertTrue(lines[0].endswith(",cumulative_total,spend_7d,spend_30d,spend_90d,daily_burn,runway_days"))
+        self.assertTrue(lines[1].endswith(","))
+        with ZipFile(BytesIO(BUDGET.to_xlsx(rolling=True))) as document:
+            self.assertIn(b"runway_days", document.read("xl/sharedStrings.xml"))
+
+    def test_to_csv_with_granularity(self):
+        lines = BUDGET.to_csv(granularity="monthly").decode("utf-8").splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[0].endswith(",monthly_total,cumulative_total"))
+
+    def test_reuse_columns(self):
+        previous = Budget.from_yaml(BUDGET.as_yaml())
+        previous.as_dataframe()
+
+        current = Budget.from_yaml(BUDGET.as_yaml())
+        current.events[1] = Event("Salary", 1500, "Every Month starting 2020-11-03")
+        current.add_event("Bonus", 100, "2020-12-24")
+
+        self.assertEqual(2, current.reuse_columns(previous))
+        data = current.as_dataframe()
+        self.assertEqual(1500.0, data.loc["2020-11-03", "Salary"])
+        self.assertEqual(100.0, data.loc["2020-12-24", "Bonus"])
+        self.assertEqual(0, current.reuse_columns(previous))
+
+    def test_reuse_columns_when_period_changed_then_nothing_reused(self):
+        previous = Budget.from_yaml(BUDGET.as_yaml())
+        previous.as_dataframe()
+
+        current = Budget("2020-11-01", "2021-01-31")
+        for event in BUDGET.events:
+            current.add_event(event.description, event.amount, event.frequency)
+
+        self.assertEqual(len(BUDGET.events), current.reuse_columns(previous))
+
+    def test_period_when_changed_then_columns_recalculated(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.as_dataframe()
+        self.assertIsNotNone(budget.cached_column(budget.events[0]))
+
+        budget.period = Period("2021-01-01", "2021-03-31")
+        self.assertIsNone(budget.cached_column(budget.events[0]))
+        data = budget.as_dataframe()
+        # the period dates and the single 'Cash' date before it
+        self.assertEqual(90 + 1, len(data))
+        self.assertEqual(Timestamp("2021-03-31"), data.index[-1])
+
+    def test_update_event_when_breakdown_calculated_then_patched(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.as_dataframe()
+
+        budget.replace_amount("Rent", -500)
+        budget.update_event("Food", new_description="Groceries", frequency="every 2 days")
+        budget.remove_event("Cash")
+        budget.add_event("Bonus", 100, "2020-12-24")
+
+        self.assertIsNotNone(budget._cached_frame())
+        expected = Budget.from_yaml(budget.as_yaml()).as_dataframe()
+        assert_frame_equal(expected, budget.as_dataframe())
+
+    def test_update_event_when_repeated_then_columns_not_kept(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.as_dataframe()
+        columns_count = len(budget._columns)
+
+        for amount in range(-100, -120, -1):
+            budget.replace_amount("Rent", amount)
+            budget.as_dataframe()
+        self.assertEqual(columns_count, len(budget._columns))
+
+        removed = budget.remove_event("Rent")
+        self.assertIsNone(budget.cached_column(removed))
+        self.assertEqual(columns_count - 1, len(budget._columns))
+
+    def test_update_event_when_equal_event_kept_then_column_kept(self):
+        budget = Budget("2020-11-01", "2020-11-05")
+        budget.add_event("Food", -10, "every day")
+        budget.add_event("Food", -10, "every day")
+        budget.as_dataframe()
+
+        previous = budget.events[0]
+        del budget.events[0]
+        budget._patch_frame(0, previous, None)
+        self.assertIsNotNone(budget.cached_column(budget.events[0]))
+
+    def test_update_event_when_dates_outside_period_then_recalculated(self):
+        budget = Budget("2020-11-01", "2020-11-05")
+        budget.add_event("Food", -10, "every day")
+        budget.as_dataframe()
+
+        budget.add_event("Opening", 1000, "2020-10-31")
+        self.assertIsNone(budget._cached_frame())
+        self.assertEqual(950.0, budget.as_dataframe()["cumulative_total"].iloc[-1])
+
+        budget.remove_event("Opening")
+        self.assertIsNone(budget._cached_frame())
+        self.assertEqual(5, len(budget.as_dataframe()))
+
+    def test_update_event_when_events_changed_directly_then_recalculated(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.as_dataframe()
+
+        budget.events[1] = Event("Salary", 1500, "Every Month starting 2020-11-03")
+        budget.replace_amount("Rent", -500)
+
+        data = budget.as_dataframe()
+        self.assertEqual(1500.0, data.loc["2020-11-03", "Salary"])
+        self.assertEqual(-500.0, data.loc["2020-11-15", "Rent"])
+
+    def test_update_event_when_description_missing_or_duplicate_then_raises(self):
+        budget = Budget("2020-11-01", "2020-11-05")
+        budget.add_event("Food", -10, "every day")
+        budget.add_event("Food", -5, "every day")
+
+        with self.assertRaises(KeyError):
+            budget.remove_event("Rent")
+        with self.assertRaises(ValueError):
+            budget.replace_amount("Food", -15)
+
+    def test_as_dict_when_duplicate_descriptions_then_warns(self):
+        budget = Budget("2020-11-01", "2020-11-05")
+        budget.add_event("Food", -10, "every day")
+        budget.add_event("Food", -5, "every day")
+
+        with self.assertLogs("pybudgetplot.datamodel.budget", "WARNING"):
+            data = budget.as_dict()
+        self.assertEqual({"Food": {"amount": -5.0, "frequency": "every day"}}, data["EVENTS"])
+
     def test_to_xlsx(self):
         sample_file = SAMPLES_DIR.joinpath("budget.xlsx")
         expected_bytes = read_bytes(sample_file)
@@ -0,0 +1,90 @@
+"""Unit-tests for the `pybudgetplot.datamodel.calendars` module."""
+import os
+import pickle
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy
+
+from pybudgetplot.datamodel.calendars import MODIFIED_FOLLOWING, PRECEDING, Calendar, load_calendar, parse_convention
+
+HOLIDAYS = """# weekmask: 1111100
+2020-12-24 Christmas Eve
+2020-12-25 Christmas Day
+
+# falls on Saturday
+2020-12-26 Second Day of Christmas
+"""
+
+
+class ParseConventionTests(TestCase):
+    """Unit-tests for the `parse_convention` method."""
+
+    def test_given_variants_then_returns_convention(self):
+        for value in ("Modified Following", "modified-following", "ModifiedFollowing", " modified  following "):
+            with self.subTest(value=value):
+                self.assertEqual(MODIFIED_FOLLOWING, parse_convention(value))
+        self.assertEqual(PRECEDING, parse_convention("PRECEDING"))
+
+    def test_given_unknown_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            parse_convention("nearest")
+
+
+class CalendarTests(TestCase):
+    """Unit-tests for the `Calendar` class."""
+
+    def test_from_text(self):
+        calendar = Calendar.from_text(HOLIDAYS, "holidays.txt")
+        self.assertTupleEqual(("2020-12-24", "2020-12-25"), calendar.holidays)
+        self.assertEqual("1111100", calendar.weekmask)
+        self.assertEqual("holidays.txt", calendar.source)
+        self.assertEqual(Calendar(["2020-12-25", "2020-12-24"]), calendar)
+        self.assertEqual(hash(Calendar(["2020-12-25", "2020-12-24"])), hash(calendar))
+        self.assertEqual(calendar, pickle.loads(pickle.dumps(calendar)))
+
+    def test_from_text_when_bad_line_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            Calendar.from_text("2020-12-24\nChristmas 2020-12-25\n")
+        with self.assertRaises(ValueError):
+            Calendar(weekmask="1111")
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            Calendar().weekmask = "1111111"  # noqa
+
+    def test_is_business_day_and_roll(self):
+        calendar = Calendar(["2020-12-24", "2020-12-25"], "1111110")
+        dates = numpy.array(["2020-12-23", "2020-12-24", "2020-12-26", "2020-12-27"], dtype="datetime64[D]")
+        self.assertListEqual([True, False, True, False], calendar.is_business_day(dates).tolist())
+        expected = numpy.array(["2020-12-23", "2020-12-23", "2020-12-26", "2020-12-26"], dtype="datetime64[D]")
+        numpy.testing.assert_array_equal(expected, calendar.roll(dates, PRECEDING))
+
+    def test_roll_when_modified_following_then_stays_in_month(self):
+        calendar = Calendar()
+        dates = numpy.array(["2021-01-30", "2021-05-01"], dtype="datetime64[D]")
+        expected = numpy.array(["2021-01-29", "2021-05-03"], dtype="datetime64[D]")
+        numpy.testing.assert_array_equal(expected, calendar.roll(dates, MODIFIED_FOLLOWING))
+
+
+class LoadCalendarTests(TestCase):
+    """Unit-tests for the `load_calendar` method."""
+
+    def test_given_same_file_then_cached_until_modified(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("holidays.txt")
+            file.write_text(HOLIDAYS, encoding="utf-8")
+            calendar = load_calendar("holidays.txt", Path(temp_dir))
+            self.assertEqual("holidays.txt", calendar.source)
+            self.assertIs(calendar, load_calendar("holidays.txt", Path(temp_dir)))
+
+            file.write_text("2021-01-01\n", encoding="utf-8")
+            modified = file.stat().st_mtime_ns + 1_000_000_000
+            os.utime(file, ns=(modified, modified))
+            self.assertTupleEqual(("2021-01-01",), load_calendar("holidays.txt", Path(temp_dir)).holidays)
+
+    def test_given_missing_file_then_raises_os_error(self):
+        with TemporaryDirectory() as temp_dir:
+            with self.assertRaises(OSError):
+                load_calendar("holidays.txt", Path(temp_dir))
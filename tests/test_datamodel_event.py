@@ -1,8 +1,9 @@
 """Unit-tests for the `pybudgetplot.definitions.event` module."""
 import datetime
+import pickle
 from unittest import TestCase
 
-from pybudgetplot.datamodel.event import Event, parse_amount, parse_string
+from pybudgetplot.datamodel.event import Event, parse_amount, parse_amounts, parse_string, parse_strings, parse_tags
 
 
 class ParseStringTests(TestCase):
@@ -60,6 +61,56 @@ class ParseAmountTests(TestCase):
         self.assertEqual(expected, actual)
 
 
+class ParseStringsTests(TestCase):
+    """Unit-tests for the `parse_strings` method."""
+
+    def test_given_values_then_returns_normalized_strings(self):
+        values = [" x \n \t y \r\t", 12, "z"]
+        expected = ["x y", "12", "z"]
+        actual = parse_strings(values).tolist()
+        self.assertListEqual(expected, actual)
+
+    def test_given_whitespace_only_value_then_raises_value_error(self):
+        values = ["x", "\n \r \t", " "]
+        with self.assertRaises(ValueError) as ctx:
+            parse_strings(values)
+        self.assertTupleEqual(("\n \r \t",), ctx.exception.args)
+
+
+class ParseAmountsTests(TestCase):
+    """Unit-tests for the `parse_amounts` method."""
+
+    def test_given_values_then_returns_float_array(self):
+        values = [1.4949, 2, "-23.4949"]
+        expected = [1.4949, 2.0, -23.4949]
+        actual = parse_amounts(values)
+        self.assertEqual("float64", actual.dtype.name)
+        self.assertListEqual(expected, actual.tolist())
+
+    def test_given_bad_value_then_raises_value_error(self):
+        value = object()
+        with self.assertRaises(ValueError) as ctx:
+            parse_amounts([1, value, "x"])
+        self.assertTupleEqual((value,), ctx.exception.args)
+
+
+class ParseTagsTests(TestCase):
+    """Unit-tests for the `parse_tags` method."""
+
+    def test_given_none_then_returns_empty_tuple(self):
+        self.assertTupleEqual((), parse_tags(None))
+
+    def test_given_string_then_returns_unique_tags(self):
+        self.assertTupleEqual(("home", "fixed"), parse_tags(" home , fixed,home"))
+
+    def test_given_list_then_returns_unique_tags(self):
+        self.assertTupleEqual(("home", "fixed"), parse_tags(["home", " fixed "]))
+
+    def test_given_empty_tag_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            parse_tags("home,,fixed")
+
+
 class EventTests(TestCase):
     """Unit-tests for the `Event` class."""
 
@@ -72,7 +123,7 @@ class EventTests(TestCase):
         self.assertEqual(expected, actual)
 
         freq_param = datetime.date.fromisoformat("2022-11-13")
-        expected.frequency = freq_param.isoformat()
+        expected = Event("evt desc", 23.5, freq_param.isoformat())
         actual = Event(desc_param, amount_param, freq_param)
         self.assertEqual(expected, actual)
 
@@ -86,3 +137,43 @@ class EventTests(TestCase):
         current = Event("evt desc", 23.5, "every day")
         other = object()
         self.assertFalse(current == other)
+
+    def test_hash(self):
+        current = Event("evt desc", 23.5, "every day")
+        other = Event(" evt desc ", "23.5", "every day")
+        self.assertEqual(hash(current), hash(other))
+        self.assertEqual(1, len({current, other}))
+
+    def test_immutable(self):
+        event = Event("evt desc", 23.5, "every day")
+        with self.assertRaises(AttributeError):
+            event.amount = 1.0  # noqa
+        with self.assertRaises(AttributeError):
+            del event.amount
+        with self.assertRaises(AttributeError):
+            event.extra = 1  # noqa
+
+    def test_pickle(self):
+        event = Event("evt desc", 23.5, "every day")
+        self.assertEqual(event, pickle.loads(pickle.dumps(event)))
+
+    def test_category_and_tags(self):
+        event = Event("evt desc", 23.5, "every day", " Home ", "rent, fixed")
+        self.assertEqual("Home", event.category)
+        self.assertTupleEqual(("rent", "fixed"), event.tags)
+        self.assertNotEqual(Event("evt desc", 23.5, "every day"), event)
+        self.assertEqual(
+            "Event(description='evt desc', amount=23.5, frequency='every day', "
+            "category='Home', tags=('rent', 'fixed'))",
+            repr(event),
+        )
+        self.assertEqual(event, pickle.loads(pickle.dumps(event)))
+
+    def test_transfer(self):
+        event = Event("Saving", 200, "every month", account="Checking", transfer_to=" Savings ")
+        self.assertTrue(event.is_transfer)
+        self.assertEqual("Savings", event.transfer_to)
+        self.assertEqual(0.0, event.net_amount)
+        self.assertEqual(200.0, Event("Saving", 200, "every month").net_amount)
+        with self.assertRaises(ValueError):
+            Event("Saving", 200, "every month", account="Savings", transfer_to="Savings")
@@ -0,0 +1,213 @@
+"""Unit-tests for the `pybudgetplot.datamodel.event_table` module."""
+import pickle
+from unittest import TestCase
+
+from pandas import DataFrame
+
+from pybudgetplot.datamodel.event import Event
+from pybudgetplot.datamodel.event_table import UNCATEGORIZED, EventTable
+
+EVENTS = [
+    Event("Salary", 1300, "every month"),
+    Event("Rent", -450, "every month"),
+    Event("Food", -15, "every day"),
+]
+
+CSV = b"""description,amount,frequency
+Salary,1300,every month
+Rent, -450 ,every  month
+Food,-15,every day
+"""
+
+GROUPED_EVENTS = [
+    Event("Salary", 1300, "every month", "Income"),
+    Event("Rent", -450, "every month", "Home", "fixed"),
+    Event("Food", -15, "every day", tags="daily,groceries"),
+    Event("Power", -60, "every month", "Home", "fixed,utility"),
+]
+
+
+class EventTableTests(TestCase):
+    """Unit-tests for the `EventTable` class."""
+
+    def test_constructor(self):
+        table = EventTable(EVENTS)
+        self.assertEqual(3, len(table))
+        self.assertListEqual(EVENTS, list(table))
+        self.assertEqual(EVENTS, table)
+
+    def test_columns(self):
+        table = EventTable(EVENTS)
+        self.assertListEqual(["Salary", "Rent", "Food"], list(table.descriptions))
+        self.assertListEqual([1300.0, -450.0, -15.0], table.amounts.tolist())
+        self.assertListEqual(["every month", "every day"], table.unique_frequencies)
+        self.assertListEqual([0, 0, 1], table.frequency_codes.tolist())
+        self.assertFalse(table.amounts.flags.writeable)
+
+    def test_from_dict(self):
+        data = {event.description: {"amount": event.amount, "frequency": event.frequency} for event in EVENTS}
+        self.assertEqual(EventTable(EVENTS), EventTable.from_dict(data))
+
+    def test_from_dict_when_bad_amount_then_raises_value_error(self):
+        data = {"Rent": {"amount": "a lot", "frequency": "every month"}}
+        with self.assertRaises(ValueError) as ctx:
+            EventTable.from_dict(data)
+        self.assertTupleEqual(("a lot",), ctx.exception.args)
+
+    def test_from_dataframe(self):
+        table = EventTable(EVENTS)
+        self.assertEqual(table, EventTable.from_dataframe(table.to_dataframe()))
+
+    def test_from_dataframe_when_column_missing_then_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            EventTable.from_dataframe(DataFrame({"description": ["Rent"], "amount": [-450]}))
+
+    def test_from_csv(self):
+        self.assertEqual(EventTable(EVENTS), EventTable.from_csv(CSV))
+
+    def test_append_grows_columns(self):
+        table = EventTable()
+        events = [Event(f"Event {i}", i, "every day") for i in range(100)]
+        for event in events:
+            table.append(event)
+        self.assertListEqual(events, list(table))
+        self.assertListEqual(["every day"], table.unique_frequencies)
+
+    def test_mutations(self):
+        table = EventTable(EVENTS)
+        bonus = Event("Bonus", 100, "2020-12-24")
+
+        table[1] = bonus
+        self.assertEqual([EVENTS[0], bonus, EVENTS[2]], table)
+
+        del table[0]
+        self.assertEqual([bonus, EVENTS[2]], table)
+
+        table.insert(0, EVENTS[1])
+        self.assertEqual([EVENTS[1], bonus, EVENTS[2]], table)
+        self.assertEqual(EVENTS[2], table[-1])
+        self.assertListEqual([bonus, EVENTS[2]], table[1:])
+
+    def test_bad_index_then_raises(self):
+        table = EventTable(EVENTS)
+        with self.assertRaises(IndexError):
+            table[3]  # noqa
+        with self.assertRaises(TypeError):
+            table["Rent"]  # noqa
+        with self.assertRaises(TypeError):
+            table.append(("Rent", -450, "every month"))  # noqa
+
+    def test_index(self):
+        table = EventTable(EVENTS)
+        self.assertEqual(1, table.index_of("Rent"))
+        self.assertListEqual([], table.positions("Bonus"))
+
+        table.append(Event("Rent", -500, "every month"))
+        self.assertListEqual([1, 3], table.positions("Rent"))
+        self.assertListEqual(["Rent"], table.duplicate_descriptions())
+        with self.assertRaises(ValueError):
+            table.index_of("Rent")
+
+        table[1] = Event("Bonus", 100, "2020-12-24")
+        self.assertEqual(3, table.index_of("Rent"))
+        self.assertEqual(1, table.index_of("Bonus"))
+
+        del table[0]
+        self.assertEqual(2, table.index_of("Rent"))
+        with self.assertRaises(KeyError):
+            table.index_of("Salary")
+
+    def test_version(self):
+        table = EventTable(EVENTS)
+        version = table.version
+        table.append(Event("Bonus", 100, "2020-12-24"))
+        table[0] = EVENTS[0]
+        del table[0]
+        table.insert(0, EVENTS[0])
+        self.assertEqual(version + 4, table.version)
+
+    def test_pickle(self):
+        table = EventTable(EVENTS)
+        self.assertEqual(table, pickle.loads(pickle.dumps(table)))
+
+    def test_categories_and_tags(self):
+        table = EventTable(GROUPED_EVENTS)
+        self.assertListEqual(GROUPED_EVENTS, list(table))
+        self.assertListEqual(["Income", "Home", None, "Home"], table.category_list())
+        self.assertListEqual([(), ("fixed",), ("daily", "groceries"), ("fixed", "utility")], table.tags_list())
+        self.assertTrue(table.has_categories())
+        self.assertFalse(EventTable(EVENTS).has_categories())
+
+        del table[0]
+        table.insert(1, GROUPED_EVENTS[0])
+        self.assertListEqual(["Home", "Income", None, "Home"], table.category_list())
+
+    def test_category_and_tags_round_trip(self):
+        table = EventTable(GROUPED_EVENTS)
+        data = {
+            event.description: {
+                "amount": event.amount,
+                "frequency": event.frequency,
+                "category": event.category,
+                "tags": list(event.tags),
+            }
+            for event in GROUPED_EVENTS
+        }
+        self.assertEqual(table, EventTable.from_dict(data))
+        self.assertEqual(table, EventTable.from_dataframe(table.to_dataframe()))
+        self.assertEqual(table, pickle.loads(pickle.dumps(table)))
+
+    def test_category_grouping(self):
+        positions, groups, weights, names = EventTable(GROUPED_EVENTS).category_grouping()
+        self.assertListEqual(["Income", "Home", UNCATEGORIZED], names)
+        self.assertListEqual([0, 1, 2, 3], positions.tolist())
+        self.assertListEqual([0, 1, 2, 1], groups.tolist())
+        self.assertListEqual([1.0, 1.0, 1.0, 1.0], weights.tolist())
+
+    def test_insert_and_append_with_keyword_value(self):
+        table = EventTable()
+        table.append(value=GROUPED_EVENTS[1])
+        table.insert(0, value=GROUPED_EVENTS[0])
+        self.assertListEqual(GROUPED_EVENTS[:2], list(table))
+
+    def test_expense_grouping(self):
+        events = GROUPED_EVENTS + [Event("Saving", -200, "every month", account="main", transfer_to="savings")]
+        positions, groups, weights, names = EventTable(events).expense_grouping("spend")
+        self.assertListEqual(["spend"], names)
+        self.assertListEqual([1, 2, 3], positions.tolist())
+        self.assertListEqual([0, 0, 0], groups.tolist())
+        self.assertListEqual([-1.0, -1.0, -1.0], weights.tolist())
+
+    def test_tag_grouping(self):
+        positions, groups, _, names = EventTable(GROUPED_EVENTS).tag_grouping()
+        pairs = sorted((names[group], position) for (position, group) in zip(positions.tolist(), groups.tolist()))
+        self.assertListEqual(["fixed", "daily", "groceries", "utility"], names)
+        self.assertListEqual([("daily", 2), ("fixed", 1), ("fixed", 3), ("groceries", 2), ("utility", 3)], pairs)
+
+    def test_accounts_and_transfers(self):
+        events = [
+            Event("Salary", 1300, "every month", account="Checking"),
+            Event("Saving", 200, "every month", account="Checking", transfer_to="Savings"),
+            Event("Food", -15, "every day"),
+        ]
+        table = EventTable(events)
+        self.assertListEqual(events, list(table))
+        self.assertListEqual(["Checking", "Checking", None], table.account_list())
+        self.assertListEqual([None, "Savings", None], table.transfer_list())
+        self.assertListEqual(["Checking", "Savings"], table.account_names())
+        self.assertListEqual([1300.0, 0.0, -15.0], table.net_amounts.tolist())
+        self.assertTrue(table.has_transfers())
+        self.assertEqual(table, EventTable.from_dataframe(table.to_dataframe()))
+
+        positions, groups, weights, names = table.account_grouping(["Cash", "Checking", "Savings"])
+        self.assertListEqual([0, 1, 2, 1], positions.tolist())
+        self.assertListEqual([1, 1, 0, 2], groups.tolist())
+        self.assertListEqual([1.0, -1.0, 1.0, 1.0], weights.tolist())
+        self.assertListEqual(["Cash", "Checking", "Savings"], names)
+
+        with self.assertRaises(ValueError):
+            table.account_grouping(["Checking"])
+
+    def test_from_columns_when_transfer_to_own_account_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            EventTable.from_columns(["Saving"], [200], ["every month"], accounts=["Savings"], transfers=["Savings"])
@@ -1,11 +1,25 @@
 """Unit-tests for the `pybudgetplot.definitions.period` module."""
+import pickle
 import re
 from datetime import date, datetime
 from unittest import TestCase
+from unittest.mock import patch
 
 from pandas import Timestamp
 
-from pybudgetplot.datamodel.period import Period, format_stamp, is_datestamp, parse_datestamp, parse_timestamp
+from pybudgetplot.datamodel import period as period_module
+from pybudgetplot.datamodel.calendars import Calendar
+from pybudgetplot.datamodel.period import (
+    Period,
+    count_frequency,
+    expand_frequency,
+    format_stamp,
+    is_datestamp,
+    parse_datestamp,
+    parse_rule,
+    parse_timestamp,
+    split_convention,
+)
 
 REGEX_FLAGS = re.DOTALL | re.IGNORECASE
 
@@ -208,6 +222,29 @@ class PeriodTests(TestCase):
         other = object()
         self.assertFalse(current == other)
 
+    def test_derived_values(self):
+        period = Period("2022-01-13 22:45:00", "2022-02-24 00:23:00")
+        self.assertEqual(Timestamp(year=2022, month=1, day=13), period.start_date)
+        self.assertEqual(Timestamp(year=2022, month=2, day=24), period.end_date)
+        self.assertEqual(43, period.days)
+
+    def test_hash(self):
+        current = Period("2022-01-13 22:45:00", "2022-02-24 00:23:00")
+        other = Period(Timestamp(year=2022, month=1, day=13, hour=22, minute=45), "2022-02-24 00:23:00")
+        self.assertEqual(hash(current), hash(other))
+        self.assertEqual(1, len({current, other}))
+
+    def test_immutable(self):
+        period = Period("2022-01-13", "2022-02-24")
+        with self.assertRaises(AttributeError):
+            period.start = Timestamp(year=2022, month=1, day=1)  # noqa
+        with self.assertRaises(AttributeError):
+            period.days = 1  # noqa
+
+    def test_pickle(self):
+        period = Period("2022-01-13 22:45:00", "2022-02-24 00:23:00")
+        self.assertEqual(period, pickle.loads(pickle.dumps(period)))
+
     def test_repr(self):
         start = Timestamp(year=2022, month=1, day=10).normalize()
         end = Timestamp(year=2022, month=2, day=20).normalize()
@@ -264,3 +301,102 @@ class PeriodTests(TestCase):
         ]
         actual = period.generate_datestamps(freq)
         self.assertListEqual(expected, actual)
+
+    def test_generate_datestamps_in_window(self):
+        period = Period("2022-05-01", "2022-05-31")
+        freq = "every 3 days"
+        expected = [stamp for stamp in period.generate_datestamps(freq) if stamp >= Timestamp("2022-05-10")]
+        actual = period.generate_datestamps(freq, "2022-05-10", "2022-06-30")
+        self.assertListEqual(expected, actual)
+        self.assertListEqual([], period.generate_datestamps("2022-05-01", start_date="2022-05-02"))
+        self.assertListEqual([], period.generate_datestamps(freq, "2022-06-01"))
+
+    def test_count_datestamps(self):
+        period = Period("2022-01-01", "2023-12-31")
+        frequencies = [
+            "2022-03-01",
+            "every day",
+            "every 2 weeks on Friday and Saturday",
+            "every month starting 2021-11-15",
+            "every month on the 31st",
+            "every year",
+        ]
+        for freq in frequencies:
+            for before in ("2021-12-01", "2022-01-01", "2022-02-28", "2023-07-19", "2024-06-01"):
+                with self.subTest(freq=freq, before=before):
+                    expected = len([stamp for stamp in period.generate_datestamps(freq) if stamp < Timestamp(before)])
+                    actual = period.count_datestamps(freq, before)
+                    self.assertEqual(expected, actual)
+
+    def test_generate_datestamps_with_convention(self):
+        period = Period("2020-11-01", "2020-12-31", Calendar(["2020-12-24", "2020-12-25"]))
+        frequencies = {
+            "every month on the 25th, preceding": ["2020-11-25", "2020-12-23"],
+            "every month starting 2020-11-01, Modified-Following": ["2020-11-02", "2020-12-01"],
+            "2020-12-24, following": ["2020-12-28"],
+            "every day starting 2020-12-24 until 2020-12-27, following": ["2020-12-28"],
+        }
+        for freq, dates in frequencies.items():
+            with self.subTest(freq=freq):
+                self.assertListEqual([Timestamp(value) for value in dates], period.generate_datestamps(freq))
+        self.assertListEqual([], period.generate_datestamps("2020-12-24, following", end_date="2020-12-27"))
+        self.assertEqual(1, period.count_datestamps("every month on the 25th, preceding", "2020-12-23"))
+
+    def test_generate_datestamps_from_business_days(self):
+        period = Period("2020-12-20", "2020-12-31", Calendar(["2020-12-24", "2020-12-25"]))
+        expected = [Timestamp(value) for value in ("2020-12-21", "2020-12-22", "2020-12-23", "2020-12-28",
+                                                   "2020-12-29", "2020-12-30", "2020-12-31")]
+        self.assertListEqual(expected, period.generate_datestamps("Every Business Day"))
+        self.assertListEqual(expected, period.generate_datestamps("every weekday"))
+        self.assertListEqual(expected[2:4], period.generate_datestamps("every working day", "2020-12-23", "2020-12-28"))
+        self.assertEqual(3, period.count_datestamps("every weekday", "2020-12-24"))
+
+        without_calendar = Period("2020-12-20", "2020-12-31")
+        self.assertEqual(9, len(without_calendar.generate_datestamps("every weekday")))
+        self.assertEqual(9, len(without_calendar.generate_datestamps("every business day")))
+
+    def test_calendar_is_compared(self):
+        period = Period("2020-12-20", "2020-12-31", Calendar(["2020-12-24"]))
+        self.assertNotEqual(Period("2020-12-20", "2020-12-31"), period)
+        self.assertEqual(Period("2020-12-20", "2020-12-31", Calendar(["2020-12-24"])), period)
+        self.assertEqual(period, pickle.loads(pickle.dumps(period)))
+        self.assertIn("calendar=Calendar(", repr(period))
+
+
+class SplitConventionTests(TestCase):
+    """Unit-tests for the `split_convention` method."""
+
+    def test_given_frequency_then_splits_convention(self):
+        expected = ("every month", "modified following")
+        self.assertTupleEqual(expected, split_convention("every month , modified following"))
+        self.assertTupleEqual(("every monday, friday", None), split_convention("every monday, friday"))
+
+
+class CountFrequencyTests(TestCase):
+    """Unit-tests for the `count_frequency` method."""
+
+    def test_given_cyclic_rule_then_counted_without_expanding(self):
+        start = Timestamp("2000-01-01")
+        end = Timestamp("2099-12-31")
+        self.assertIsNotNone(parse_rule("every 2 weeks on Friday", start).cycle)
+        with patch.object(period_module, "expand_frequency", side_effect=AssertionError):
+            actual = count_frequency("every 2 weeks on Friday", start, end)
+        expected = len(expand_frequency("every 2 weeks on Friday", start, end))
+        self.assertEqual(expected, actual)
+
+    def test_given_non_cyclic_rule_then_counted(self):
+        start = Timestamp("2020-01-31")
+        end = Timestamp("2021-12-31")
+        self.assertIsNone(parse_rule("every month", start).cycle)
+        expected = len(expand_frequency("every month", start, end))
+        actual = count_frequency("every month", start, end)
+        self.assertEqual(expected, actual)
+
+    def test_given_anchor_date_then_counted_from_anchor(self):
+        anchor = Timestamp("2022-01-01")
+        start = Timestamp("2022-03-10")
+        end = Timestamp("2022-12-31")
+        expected = len(expand_frequency("every 10 days", start, end, anchor))
+        actual = count_frequency("every 10 days", start, end, anchor)
+        self.assertEqual(expected, actual)
+        self.assertNotEqual(len(expand_frequency("every 10 days", start, end)), 0)
@@ -0,0 +1,76 @@
+"""Unit-tests for the `pybudgetplot.datamodel.solver` module."""
+from unittest import TestCase
+
+from pandas import Timedelta, Timestamp
+
+from pybudgetplot.datamodel.account import Account
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.datamodel.solver import solve_amount, solve_date
+
+BUDGET = Budget("2020-11-01", "2020-12-31")
+BUDGET.add_event("Cash", 200, "2020-11-01")
+BUDGET.add_event("Salary", 1300, "Every Month starting 2020-11-03")
+BUDGET.add_event("Rent", -450, "Every Month starting 2020-11-15")
+BUDGET.add_event("Food", -15, "Every day")
+BUDGET.add_event("Gift", 1000, "2020-12-15")
+BUDGET.add_event("TV", -1500, "2020-11-02")
+
+
+def _min_balance(budget: Budget, description: str, **changes) -> float:
+    changed = Budget.from_yaml(budget.as_yaml())
+    changed.update_event(description, **changes)
+    return changed.as_dataframe()["cumulative_total"].min()
+
+
+class SolveAmountTests(TestCase):
+    """Unit-tests for the `solve_amount` method."""
+
+    def test_given_income_then_returns_minimum(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.remove_event("TV")
+        amount = solve_amount(budget, "Salary")
+        self.assertAlmostEqual(0.0, _min_balance(budget, "Salary", amount=amount))
+        self.assertLess(_min_balance(budget, "Salary", amount=amount - 0.01), 0.0)
+        self.assertEqual(1300.0, budget.events[budget.events.index_of("Salary")].amount)
+
+    def test_given_expense_and_floor_then_returns_largest_cost(self):
+        amount = solve_amount(BUDGET, "TV", floor=100.0)
+        self.assertAlmostEqual(100.0, _min_balance(BUDGET, "TV", amount=amount))
+        self.assertLess(amount, 0.0)
+
+    def test_given_account_with_interest_then_includes_interest(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(-1000, 0.5, "daily")
+        amount = solve_amount(budget, "Salary", start="2020-11-10")
+        changed = Budget.from_yaml(budget.as_yaml())
+        changed.replace_amount("Salary", amount)
+        self.assertAlmostEqual(0.0, changed.as_dataframe("2020-11-10")["cumulative_total"].min())
+
+    def test_given_balance_below_floor_before_event_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            solve_amount(BUDGET, "Gift")
+
+    def test_given_unknown_event_then_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            solve_amount(BUDGET, "Unknown")
+
+
+class SolveDateTests(TestCase):
+    """Unit-tests for the `solve_date` method."""
+
+    def test_given_expense_then_returns_earliest_date(self):
+        date = solve_date(BUDGET, "TV")
+        self.assertEqual(Timestamp("2020-12-03"), date)
+        self.assertGreaterEqual(_min_balance(BUDGET, "TV", frequency="2020-12-03"), 0.0)
+        self.assertLess(_min_balance(BUDGET, "TV", frequency="2020-12-02"), 0.0)
+
+    def test_given_income_then_returns_latest_date(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.update_event("TV", frequency="2020-12-20")
+        date = solve_date(budget, "Gift")
+        self.assertGreaterEqual(_min_balance(budget, "Gift", frequency=date.date().isoformat()), 0.0)
+        later = (date + Timedelta(days=1)).date().isoformat()
+        self.assertLess(_min_balance(budget, "Gift", frequency=later), 0.0)
+
+    def test_given_no_date_keeps_balance_then_returns_none(self):
+        self.assertIsNone(solve_date(BUDGET, "TV", floor=10000.0))
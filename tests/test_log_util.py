@@ -1,7 +1,12 @@
 """Unit-tests for the ``pybudgetplot.utils.log_util`` module."""
+import gc
 import io
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import weakref
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest import TestCase
@@ -14,6 +19,12 @@ from pybudgetplot.utils.log_util import (
     LOG_FORMAT_INFO,
     LOG_FORMATTER_CONVERTER_DEBUG,
     LOG_FORMATTER_CONVERTER_INFO,
+    LOG_QUEUE_SIZE,
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_NEW,
+    OVERFLOW_DROP_OLD,
+    BoundedQueueHandler,
+    JsonLinesFormatter,
     add_file_handler,
     create_file_handler,
     create_formatter,
@@ -22,6 +33,9 @@ from pybudgetplot.utils.log_util import (
     get_log_formatter_converter,
     init_logging,
     remove_handlers,
+    shutdown_logging,
+    start_queued_logging,
+    stop_queued_logging,
     to_level,
 )
 
@@ -222,6 +236,45 @@ class CreateFormatterTestCase(TestCase):
         self.assertIs(converter, formatter.converter)
 
 
+class JsonLinesFormatterTestCase(TestCase):
+    """Unit-tests for the ``log_util.JsonLinesFormatter`` class."""
+
+    def test_given_record_with_extra_fields_then_single_json_line(self):
+        record = logging.makeLogRecord(
+            {
+                "name": "some.logger",
+                "levelname": "INFO",
+                "msg": "processed %s",
+                "args": ("budget",),
+                "created": 0.5,
+                "msecs": 500.0,
+                "budget": {"events": 11},
+            }
+        )
+
+        line = JsonLinesFormatter().format(record)
+
+        self.assertNotIn("\n", line)
+        expected = {
+            "time": "1970-01-01T00:00:00.500Z",
+            "level": "INFO",
+            "logger": "some.logger",
+            "message": "processed budget",
+            "budget": {"events": 11},
+        }
+        self.assertDictEqual(expected, json.loads(line))
+
+    def test_given_record_with_exc_info_then_traceback_included(self):
+        try:
+            raise ValueError("some error")
+        except ValueError:
+            record = logging.makeLogRecord({"msg": "failed", "exc_info": sys.exc_info()})
+
+        data = json.loads(JsonLinesFormatter().format(record))
+
+        self.assertIn("ValueError: some error", data["exc_info"])
+
+
 class CreateFileHandlerTestCase(TestCase):
     """Unit-tests for the ``log_util.create_file_handler`` method."""
 
@@ -300,6 +353,44 @@ class CreateFileHandlerTestCase(TestCase):
         actual_args = ctx.exception.args
         self.assertTupleEqual(expected_args, actual_args)
 
+    def test_given_max_bytes_then_file_rotated_and_size_capped(self):
+        with TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir).joinpath("out.log")
+            handler = create_file_handler(file_path, max_bytes=1024, backup_count=2)
+            self.assertIsInstance(handler, logging.handlers.RotatingFileHandler)
+            for i in range(1000):
+                handler.emit(logging.makeLogRecord({"msg": f"message {i}"}))
+            handler.close()
+
+            file_names = sorted(path.name for path in Path(temp_dir).iterdir())
+            total_size = sum(path.stat().st_size for path in Path(temp_dir).iterdir())
+
+        self.assertListEqual(["out.log", "out.log.1", "out.log.2"], file_names)
+        self.assertLessEqual(total_size, 3 * 1024)
+
+    def test_given_when_then_timed_rotating_handler_created(self):
+        with TemporaryDirectory() as temp_dir:
+            handler = create_file_handler(Path(temp_dir).joinpath("out.log"), when="midnight", backup_count=7)
+            handler.close()
+
+        self.assertIsInstance(handler, logging.handlers.TimedRotatingFileHandler)
+        self.assertEqual(7, handler.backupCount)
+
+    def test_given_max_bytes_and_when_then_error_raised(self):
+        with TemporaryDirectory() as temp_dir, self.assertRaises(ValueError):
+            create_file_handler(Path(temp_dir).joinpath("out.log"), max_bytes=1024, when="midnight")
+
+    def test_given_closed_handler_then_not_kept_alive(self):
+        with TemporaryDirectory() as temp_dir, patch("pybudgetplot.utils.log_util.atexit") as mock_atexit:
+            handler = create_file_handler(Path(temp_dir).joinpath("out.log"))
+            handler.close()
+            handler_ref = weakref.ref(handler)
+            del handler
+            gc.collect()
+
+        self.assertIsNone(handler_ref())
+        mock_atexit.register.assert_not_called()
+
 
 class RemoveHandlersTestCase(TestCase):
     """Unit-tests for the ``log_util.remove_handlers`` method."""
@@ -404,7 +495,17 @@ class InitLoggingTestCase(TestCase):
         self.assertListEqual(expected_config_calls, actual_config_calls)
 
         # assert ``log_util.add_file_handler`` called once with correct params
-        expected_add_handler_calls = [call(logging.getLogger(), file, logging.DEBUG)]
+        expected_add_handler_calls = [
+            call(
+                logging.getLogger(),
+                file,
+                logging.DEBUG,
+                max_bytes=None,
+                backup_count=None,
+                when=None,
+                json_lines=False,
+            )
+        ]
         actual_add_handler_calls = mock_add_file_handler.mock_calls
         self.assertListEqual(expected_add_handler_calls, actual_add_handler_calls)
 
@@ -467,3 +568,100 @@ class InitLoggingTestCase(TestCase):
 
         # assert ``log_util.add_file_handler`` not called at all
         mock_add_file_handler.assert_not_called()
+
+    def test_given_queued_then_queued_logging_started_on_root_logger(self):
+        with patch("logging.basicConfig"), patch(
+            "pybudgetplot.utils.log_util.start_queued_logging"
+        ) as mock_start_queued_logging:
+            init_logging("info", queued=True, overflow=OVERFLOW_DROP_NEW)
+
+        expected_calls = [call(logging.getLogger(), LOG_QUEUE_SIZE, OVERFLOW_DROP_NEW)]
+        self.assertListEqual(expected_calls, mock_start_queued_logging.mock_calls)
+
+    def test_given_repeated_calls_then_previous_handlers_replaced(self):
+        root_logger = logging.getLogger()
+        self.addCleanup(shutdown_logging)
+        with TemporaryDirectory() as temp_dir, patch("pybudgetplot.utils.log_util.atexit") as mock_atexit:
+
+            def temp_file_names():
+                return [
+                    Path(h.baseFilename).name
+                    for h in root_logger.handlers
+                    if isinstance(h, logging.FileHandler) and h.baseFilename.startswith(temp_dir)
+                ]
+
+            init_logging("info", stream=io.StringIO(), file=Path(temp_dir).joinpath("out_0.log"))
+            self.assertListEqual(["out_0.log"], temp_file_names())
+
+            init_logging("info", stream=io.StringIO(), file=Path(temp_dir).joinpath("out_1.log"), queued=True)
+            queue_handlers = [h for h in root_logger.handlers if isinstance(h, BoundedQueueHandler)]
+            self.assertEqual(1, len(queue_handlers))
+            self.assertListEqual([], temp_file_names())
+
+            init_logging("info", stream=io.StringIO(), file=Path(temp_dir).joinpath("out_2.log"))
+            queue_handlers = [h for h in root_logger.handlers if isinstance(h, BoundedQueueHandler)]
+            self.assertEqual(0, len(queue_handlers))
+            self.assertListEqual(["out_2.log"], temp_file_names())
+
+            shutdown_logging()
+            self.assertListEqual([], temp_file_names())
+
+        mock_atexit.register.assert_not_called()
+
+
+class BoundedQueueHandlerTestCase(TestCase):
+    """Unit-tests for the ``log_util.BoundedQueueHandler`` class."""
+
+    @staticmethod
+    def _records(count: int):
+        return [logging.makeLogRecord({"msg": f"message {i}"}) for i in range(count)]
+
+    def test_given_full_queue_when_drop_new_then_new_records_dropped(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), OVERFLOW_DROP_NEW)
+        for record in self._records(3):
+            handler.handle(record)
+
+        messages = [handler.queue.get_nowait().msg for _ in range(2)]
+        self.assertListEqual(["message 0", "message 1"], messages)
+        self.assertEqual(1, handler.dropped)
+
+    def test_given_full_queue_when_drop_old_then_old_records_dropped(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), OVERFLOW_DROP_OLD)
+        for record in self._records(3):
+            handler.handle(record)
+
+        messages = [handler.queue.get_nowait().msg for _ in range(2)]
+        self.assertListEqual(["message 1", "message 2"], messages)
+        self.assertEqual(1, handler.dropped)
+
+    def test_given_unsupported_overflow_then_error_raised(self):
+        with self.assertRaises(ValueError):
+            BoundedQueueHandler(queue.Queue(maxsize=2), "ignore")
+
+
+class QueuedLoggingTestCase(TestCase):
+    """Unit-tests for the ``log_util.start_queued_logging`` method."""
+
+    def test_given_queued_logging_when_stopped_then_records_written_and_handlers_restored(self):
+        logger = logging.getLogger("QueuedLoggingTestCase")
+        logger.propagate = False
+        self.addCleanup(setattr, logger, "propagate", True)
+        self.addCleanup(remove_handlers, logger)
+        remove_handlers(logger)
+
+        stream = io.StringIO()
+        stream_handler = logging.StreamHandler(stream)
+        logger.addHandler(stream_handler)
+
+        listener = start_queued_logging(logger, queue_size=4, overflow=OVERFLOW_BLOCK)
+        self.assertEqual(1, len(logger.handlers))
+        self.assertIsInstance(logger.handlers[0], BoundedQueueHandler)
+        self.assertIsNotNone(listener)
+
+        for i in range(100):
+            logger.warning("message %d", i)
+        stop_queued_logging()
+
+        self.assertListEqual([stream_handler], logger.handlers)
+        self.assertEqual(100, len(stream.getvalue().splitlines()))
+        self.assertTrue(stream.getvalue().endswith("message 99\n"))
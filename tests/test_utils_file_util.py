@@ -1,9 +1,19 @@
 """Unit-tests for the `pybudgetplot.utils.file_util` module."""
+import importlib.util
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 
-from pybudgetplot.utils.file_util import read_bytes, read_str, write_bytes, write_str
+from pybudgetplot.utils.file_util import (
+    detect_compression,
+    get_compression,
+    get_stem,
+    open_write,
+    read_bytes,
+    read_str,
+    write_bytes,
+    write_str,
+)
 
 
 class ReadWriteBytesTests(TestCase):
@@ -50,3 +60,60 @@ class ReadWriteStrTests(TestCase):
             file = temp_dir_path.joinpath("missing.file")
             with self.assertRaises(FileNotFoundError):
                 read_str(file)
+
+
+class CompressionTests(TestCase):
+    """Unit-tests for the compression related methods."""
+
+    def test_get_compression(self):
+        self.assertEqual("gz", get_compression("budget.csv.gz"))
+        self.assertEqual("xz", get_compression("budget.txt.XZ"))
+        self.assertIsNone(get_compression("budget.csv"))
+
+    def test_get_stem(self):
+        self.assertEqual("budget", get_stem("budget.yaml.bz2"))
+        self.assertEqual("budget", get_stem("budget.yaml"))
+
+    def test_given_compression_suffix_when_write_str_then_read_str_decompresses(self):
+        expected_str = "some str\n" * 100000
+        with TemporaryDirectory() as temp_dir:
+            temp_dir_path = Path(temp_dir)
+            for compression in ("gz", "xz", "bz2"):
+                file = temp_dir_path.joinpath(f"some.file.{compression}")
+                write_str(file, expected_str)
+                raw_bytes = read_bytes(file)
+                self.assertEqual(compression, detect_compression(raw_bytes))
+                self.assertLess(len(raw_bytes), len(expected_str))
+                self.assertEqual(expected_str, read_str(file))
+
+    @skipUnless(importlib.util.find_spec("zstandard"), "requires the optional 'zstandard' package")
+    def test_given_zst_suffix_when_write_str_then_read_str_decompresses(self):
+        expected_str = "some str\n" * 100000
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("some.file.zst")
+            write_str(file, expected_str)
+            raw_bytes = read_bytes(file)
+            self.assertEqual("zst", detect_compression(raw_bytes))
+            self.assertLess(len(raw_bytes), len(expected_str))
+            self.assertEqual(expected_str, read_str(file))
+
+    def test_given_compression_arg_when_write_bytes_then_read_bytes_decompresses(self):
+        expected_bytes = b"some bytes" * 100000
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("some.file")
+            write_bytes(file, expected_bytes, compression="gz")
+            self.assertEqual("gz", detect_compression(read_bytes(file)))
+            self.assertEqual(expected_bytes, read_bytes(file, decompress=True))
+
+    def test_given_open_write_when_suffix_unknown_then_not_compressed(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("some.file")
+            with open_write(file) as stream:
+                stream.write(b"some bytes")
+            self.assertEqual(b"some bytes", read_bytes(file))
+
+    def test_given_unsupported_compression_then_raises_error(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("some.file")
+            with self.assertRaises(ValueError):
+                write_bytes(file, b"some bytes", compression="rar")
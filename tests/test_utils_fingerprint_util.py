@@ -0,0 +1,46 @@
+"""Unit-tests for the `pybudgetplot.utils.fingerprint_util` module."""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pybudgetplot.utils.fingerprint_util import (
+    compute_fingerprint,
+    get_fingerprint_file,
+    is_fresh,
+    read_fingerprint,
+    write_fingerprint,
+)
+
+
+class FingerprintTests(TestCase):
+    """Unit-tests for the fingerprint related methods."""
+
+    def test_compute_fingerprint(self):
+        fingerprint = compute_fingerprint(b"definition", "csv", compress="gz")
+        self.assertEqual(fingerprint, compute_fingerprint(b"definition", "csv", compress="gz"))
+        self.assertNotEqual(fingerprint, compute_fingerprint(b"definition!", "csv", compress="gz"))
+        self.assertNotEqual(fingerprint, compute_fingerprint(b"definition", "txt", compress="gz"))
+        self.assertNotEqual(fingerprint, compute_fingerprint(b"definition", "csv", compress=None))
+
+    def test_get_fingerprint_file(self):
+        fingerprint_file = get_fingerprint_file("some/budget.csv.gz")
+        self.assertEqual("budget.csv.gz.fingerprint", fingerprint_file.name)
+        self.assertEqual(Path("some").absolute(), fingerprint_file.parent)
+
+    def test_given_output_when_fingerprint_written_then_fresh_until_changed_or_deleted(self):
+        fingerprint = compute_fingerprint(b"definition", "csv")
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("budget.csv")
+            self.assertIsNone(read_fingerprint(file))
+            self.assertFalse(is_fresh(file, fingerprint))
+
+            file.write_bytes(b"data")
+            self.assertFalse(is_fresh(file, fingerprint))
+
+            write_fingerprint(file, fingerprint)
+            self.assertEqual(fingerprint, read_fingerprint(file))
+            self.assertTrue(is_fresh(file, fingerprint))
+            self.assertFalse(is_fresh(file, compute_fingerprint(b"changed", "csv")))
+
+            file.unlink()
+            self.assertFalse(is_fresh(file, fingerprint))
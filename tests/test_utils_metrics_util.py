@@ -0,0 +1,89 @@
+"""Unit-tests for the `pybudgetplot.utils.metrics_util` module."""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pybudgetplot.utils.metrics_util import MetricsRegistry, record_budget
+
+
+class MetricsRegistryTests(TestCase):
+    """Unit-tests for the `MetricsRegistry` class."""
+
+    def test_given_counter_with_labels_then_values_kept_per_labels(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("export_bytes", "Size of the written outputs.")
+        counter.inc(10, output="csv")
+        counter.inc(5, output="csv")
+        counter.inc(7, output="png")
+
+        self.assertIs(counter, registry.counter("export_bytes"))
+        self.assertEqual(15.0, counter.value(output="csv"))
+        self.assertEqual(7.0, counter.value(output="png"))
+        self.assertEqual(0.0, counter.value(output="txt"))
+        with self.assertRaises(ValueError):
+            counter.inc(-1)
+
+    def test_given_histogram_then_observations_counted_in_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("seconds", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(4, histogram.count())
+        self.assertAlmostEqual(5.65, histogram.sum())
+        lines = registry.to_openmetrics().splitlines()
+        self.assertIn('pybudgetplot_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('pybudgetplot_seconds_bucket{le="1.0"} 3', lines)
+        self.assertIn('pybudgetplot_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("pybudgetplot_seconds_count 4", lines)
+
+    def test_given_name_registered_as_other_type_then_error_raised(self):
+        registry = MetricsRegistry()
+        registry.counter("budgets")
+        with self.assertRaises(ValueError):
+            registry.histogram("budgets")
+
+    def test_given_metrics_then_written_in_openmetrics_format(self):
+        registry = MetricsRegistry()
+        registry.counter("budgets", "Processed budgets.").inc()
+        registry.counter("export_bytes").inc(3, output='say "hi"')
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("metrics", "budget.prom")
+            registry.write_openmetrics(file)
+            text = file.read_text(encoding="utf-8")
+
+        expected_text = (
+            "# TYPE pybudgetplot_budgets counter\n"
+            "# HELP pybudgetplot_budgets Processed budgets.\n"
+            "pybudgetplot_budgets_total 1.0\n"
+            "# TYPE pybudgetplot_export_bytes counter\n"
+            'pybudgetplot_export_bytes_total{output="say \\"hi\\""} 3.0\n'
+            "# EOF\n"
+        )
+        self.assertEqual(expected_text, text)
+
+
+class RecordBudgetTests(TestCase):
+    """Unit-tests for the `record_budget` method."""
+
+    def test_given_budget_metrics_then_registry_updated_and_record_logged(self):
+        registry = MetricsRegistry()
+        with self.assertLogs("pybudgetplot.utils.metrics_util", "INFO") as logs:
+            record = record_budget(
+                "budget",
+                events=11,
+                days=61,
+                cache_hits=3,
+                cache_misses=7,
+                expansion_time=0.02,
+                total_time=0.1,
+                export_sizes={"csv": 100, "png": 200},
+                registry=registry,
+            )
+
+        self.assertEqual(11.0, registry.counter("events").value())
+        self.assertEqual(3.0, registry.counter("rule_cache_hits").value())
+        self.assertEqual(200.0, registry.counter("export_bytes").value(output="png"))
+        self.assertEqual(1, registry.histogram("expansion_seconds").count())
+        self.assertEqual(record, logs.records[0].budget)
+        self.assertEqual({"csv": 100, "png": 200}, record["export_bytes"])
@@ -1,11 +1,16 @@
 """Unit-tests for the `pybudgetplot.utils.plot_util` module."""
+import subprocess
+import sys
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
+
+import numpy
 
 from pybudgetplot.datamodel.budget import Budget
-from pybudgetplot.utils.file_util import read_str
-from pybudgetplot.utils.plot_util import plot_budget
+from pybudgetplot.utils.file_util import read_bytes, read_str
+from pybudgetplot.utils.plot_util import downsample_minmax, plot_budget, render_batch
 
 SAMPLES_DIR = Path(__file__).parent.joinpath("samples").absolute().resolve()
 
@@ -18,7 +23,7 @@ class PlotBudgetTests(TestCase):
     """Unit-tests for the `plot_budget` method."""
 
     @patch("matplotlib.pyplot.show", autospec=True)
-    @patch("matplotlib.pyplot.savefig", autospec=True)
+    @patch("matplotlib.figure.Figure.savefig", autospec=True)
     def test_plot_both_to_file_and_interactive(
             self,
             mock_savefig: MagicMock,
@@ -27,14 +32,13 @@ class PlotBudgetTests(TestCase):
         file = Path(__file__).parent.joinpath("graph.png")
         plot_budget(BUDGET, file=file, interactive=True)
 
-        expected_savefig_calls = [call(file)]
-        actual_savefig_calls = mock_savefig.mock_calls
-        self.assertListEqual(expected_savefig_calls, actual_savefig_calls)
+        mock_savefig.assert_called_once()
+        self.assertEqual((file,), mock_savefig.call_args.args[1:])
 
         mock_show.assert_called_once_with()
 
     @patch("matplotlib.pyplot.show", autospec=True)
-    @patch("matplotlib.pyplot.savefig", autospec=True)
+    @patch("matplotlib.figure.Figure.savefig", autospec=True)
     def test_plot_interactive_only(
             self,
             mock_savefig: MagicMock,
@@ -43,3 +47,86 @@ class PlotBudgetTests(TestCase):
         plot_budget(BUDGET, interactive=True)
         mock_savefig.assert_not_called()
         mock_show.assert_called_once_with()
+
+    @patch("matplotlib.pyplot.figure", autospec=True)
+    @patch("matplotlib.pyplot.show", autospec=True)
+    def test_plot_file_only_uses_agg_canvas_without_pyplot(
+            self,
+            mock_show: MagicMock,
+            mock_figure: MagicMock,
+    ):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("graph.png")
+            plot_budget(BUDGET, file=file)
+            file_bytes = read_bytes(file)
+
+        self.assertTrue(file_bytes.startswith(b"\x89PNG"))
+        mock_figure.assert_not_called()
+        mock_show.assert_not_called()
+
+
+class RenderBatchTests(TestCase):
+    """Unit-tests for the `render_batch` method."""
+
+    def _render_and_read(self, processes: int):
+        other = Budget.from_yaml(BUDGET_YAML)
+        other.add_event("Bonus", 2000, "2020-12-20")
+        with TemporaryDirectory() as temp_dir:
+            temp_dir_path = Path(temp_dir)
+            items = [
+                (BUDGET, temp_dir_path.joinpath("first.png")),
+                (other, temp_dir_path.joinpath("second.svg")),
+                (other, temp_dir_path.joinpath("third.png")),
+            ]
+            files = render_batch(items, processes=processes, chunk_size=2)
+            return files, [read_bytes(file) for file in files], [item[1] for item in items]
+
+    def test_given_single_process_then_files_written_in_order(self):
+        files, contents, expected_files = self._render_and_read(processes=1)
+        self.assertListEqual(expected_files, files)
+        self.assertTrue(contents[0].startswith(b"\x89PNG"))
+        self.assertIn(b"<svg", contents[1])
+        self.assertTrue(contents[2].startswith(b"\x89PNG"))
+        self.assertNotEqual(contents[0], contents[2])
+
+    def test_given_process_pool_then_files_written_in_order(self):
+        files, contents, expected_files = self._render_and_read(processes=2)
+        self.assertListEqual(expected_files, files)
+        self.assertTrue(contents[0].startswith(b"\x89PNG"))
+        self.assertIn(b"<svg", contents[1])
+
+
+class DownsampleMinMaxTests(TestCase):
+    """Unit-tests for the `downsample_minmax` method."""
+
+    def test_given_few_points_then_returns_them_unchanged(self):
+        x_values = numpy.arange(10)
+        y_values = numpy.arange(10) * 2.0
+        actual_x, actual_y = downsample_minmax(x_values, y_values, buckets=5)
+        numpy.testing.assert_array_equal(x_values, actual_x)
+        numpy.testing.assert_array_equal(y_values, actual_y)
+
+    def test_given_many_points_then_keeps_extremes_and_order(self):
+        x_values = numpy.arange(10001)
+        y_values = numpy.sin(x_values / 100.0)
+        y_values[1234] = 50.0
+        y_values[4321] = -50.0
+
+        actual_x, actual_y = downsample_minmax(x_values, y_values, buckets=100)
+
+        self.assertLessEqual(len(actual_x), 2 * 100 + 2)
+        self.assertTrue(numpy.all(numpy.diff(actual_x) > 0))
+        self.assertEqual(0, actual_x[0])
+        self.assertEqual(10000, actual_x[-1])
+        self.assertEqual(50.0, actual_y.max())
+        self.assertEqual(-50.0, actual_y.min())
+        numpy.testing.assert_array_equal(y_values[actual_x], actual_y)
+
+
+class LazyImportTests(TestCase):
+    """Unit-tests for the deferred ``matplotlib`` import."""
+
+    def test_importing_cli_does_not_import_matplotlib(self):
+        code = "import sys, pybudgetplot.cli; print('matplotlib' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual("False", result.stdout.strip())
@@ -0,0 +1,65 @@
+"""Unit-tests for the `pybudgetplot.utils.profile_util` module."""
+import pstats
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.utils.file_util import read_str
+from pybudgetplot.utils.profile_util import Profiler, stage
+
+SAMPLES_DIR = Path(__file__).parent.joinpath("samples").absolute().resolve()
+
+BUDGET_YAML = read_str(SAMPLES_DIR.joinpath("budget.yaml"))
+
+
+class ProfilerTests(TestCase):
+    """Unit-tests for the `Profiler` class and the `stage` method."""
+
+    def test_given_no_active_profiler_then_stage_yields_none(self):
+        with stage("some_stage") as profiler:
+            self.assertIsNone(profiler)
+
+    def test_given_nested_stages_then_calls_time_and_peak_memory_accumulated(self):
+        with Profiler() as profiler:
+            for _ in range(2):
+                with stage("outer"):
+                    with stage("inner"):
+                        data = bytearray(4 * 2**20)
+                    del data
+
+        outer, inner = profiler.stats
+        self.assertEqual(("outer", 2), (outer.name, outer.calls))
+        self.assertEqual(("inner", 2), (inner.name, inner.calls))
+        self.assertGreaterEqual(outer.wall_time, inner.wall_time)
+        self.assertGreaterEqual(inner.peak_memory, 4 * 2**20)
+        self.assertGreaterEqual(outer.peak_memory, inner.peak_memory)
+
+    def test_given_budget_exports_then_library_stages_recorded(self):
+        with Profiler(trace_memory=False) as profiler:
+            budget = Budget.from_yaml(BUDGET_YAML)
+            budget.to_csv()
+            budget.to_xlsx()
+
+        calls = {stats.name: stats.calls for stats in profiler.stats}
+        self.assertEqual(1, calls["parse_yaml"])
+        self.assertEqual(2, calls["build_frame"])
+        self.assertEqual(len(budget.events), calls["expand_rules"])
+        self.assertEqual(1, calls["export_csv"])
+        self.assertEqual(1, calls["export_xlsx"])
+
+    def test_given_profile_calls_then_dumps_pstats_file(self):
+        with TemporaryDirectory() as temp_dir:
+            pstats_file = Path(temp_dir).joinpath("budget.pstats")
+            with Profiler(trace_memory=False, profile_calls=True) as profiler:
+                Budget.from_yaml(BUDGET_YAML).as_dataframe()
+            profiler.dump_stats(pstats_file)
+            stats = pstats.Stats(str(pstats_file))
+
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_given_no_profile_calls_then_dump_stats_raises_error(self):
+        with Profiler(trace_memory=False) as profiler:
+            pass
+        with self.assertRaises(RuntimeError):
+            profiler.dump_stats("budget.pstats")
@@ -0,0 +1,127 @@
+"""Unit-tests for the `pybudgetplot.utils.server_util` module."""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Tuple
+from unittest import TestCase
+
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.utils.file_util import read_bytes
+from pybudgetplot.utils.server_util import BudgetServer, RenderCache, create_executor
+
+SAMPLES_DIR = Path(__file__).parent.joinpath("samples").absolute().resolve()
+
+BUDGET_YAML = read_bytes(SAMPLES_DIR.joinpath("budget.yaml"))
+
+
+async def _request(port: int, method: str, target: str, body: bytes = b"") -> Tuple[int, bytes]:
+    """Sends HTTP request to the localhost and returns the status and the body."""
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+    writer.write(head.encode("latin1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    response_head, _, response_body = response.partition(b"\r\n\r\n")
+    status = int(response_head.split(b" ")[1])
+    return status, response_body
+
+
+class BudgetServerTests(TestCase):
+    """Unit-tests for the `BudgetServer` class."""
+
+    def _run(self, scenario, executor=None):
+        async def run():
+            server = BudgetServer(create_executor(2) if (executor is None) else executor, cache_size=4)
+            _, port = await server.start("127.0.0.1", 0)
+            try:
+                return await scenario(server, port)
+            finally:
+                await server.close()
+
+        return asyncio.run(asyncio.wait_for(run(), timeout=120))
+
+    def test_given_concurrent_requests_then_each_format_rendered_once(self):
+        async def scenario(server: BudgetServer, port: int):
+            targets = ["/render?format=csv", "/render?format=json", "/render?format=png", "/render?format=csv"]
+            responses = await asyncio.gather(*[_request(port, "POST", target, BUDGET_YAML) for target in targets])
+            return responses, server.cache.hits, server.cache.misses
+
+        responses, hits, misses = self._run(scenario)
+
+        statuses = [status for (status, _) in responses]
+        self.assertListEqual([200, 200, 200, 200], statuses)
+
+        expected_csv = Budget.from_yaml(BUDGET_YAML.decode("utf-8")).to_csv()
+        self.assertEqual(expected_csv, responses[0][1])
+        self.assertEqual(expected_csv, responses[3][1])
+
+        totals = json.loads(responses[1][1])
+        self.assertEqual("2020-11-01", totals["date"][0])
+        self.assertEqual(160.0, totals["cumulative_total"][0])
+
+        self.assertTrue(responses[2][1].startswith(b"\x89PNG"))
+        self.assertEqual(1, hits)
+        self.assertEqual(3, misses)
+
+    def test_given_bad_requests_then_error_statuses(self):
+        async def scenario(server: BudgetServer, port: int):
+            return [
+                await _request(port, "POST", "/missing", BUDGET_YAML),
+                await _request(port, "GET", "/render"),
+                await _request(port, "POST", "/render?format=doc", BUDGET_YAML),
+                await _request(port, "POST", "/render?format=csv", b"PERIOD: {}"),
+                await _request(port, "POST", "/render?format=csv", b"PERIOD: {}"),
+                len(server.cache),
+            ]
+
+        *responses, cache_size = self._run(scenario)
+
+        statuses = [status for (status, _) in responses]
+        self.assertListEqual([404, 405, 400, 422, 422], statuses)
+        self.assertIn(b"KeyError", responses[3][1])
+        self.assertEqual(0, cache_size)
+
+    def test_given_negative_content_length_then_bad_request(self):
+        async def scenario(_: BudgetServer, port: int):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /render HTTP/1.1\r\nContent-Length: -1\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        response = self._run(scenario, ThreadPoolExecutor(max_workers=1))
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 "))
+
+    def test_given_broken_executor_then_internal_error_and_not_cached(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.shutdown()
+
+        async def scenario(server: BudgetServer, port: int):
+            response = await _request(port, "POST", "/render?format=csv", BUDGET_YAML)
+            return response, len(server.cache)
+
+        (status, body), cache_size = self._run(scenario, executor)
+        self.assertEqual(500, status)
+        self.assertIn(b"RuntimeError", body)
+        self.assertEqual(0, cache_size)
+
+
+class RenderCacheTests(TestCase):
+    """Unit-tests for the `RenderCache` class."""
+
+    def test_given_full_cache_then_least_recently_used_evicted(self):
+        cache = RenderCache(max_size=2)
+        cache.put(("a", "csv"), "first")
+        cache.put(("b", "csv"), "second")
+        self.assertEqual("first", cache.get(("a", "csv")))
+        cache.put(("c", "csv"), "third")
+
+        self.assertIsNone(cache.get(("b", "csv")))
+        self.assertEqual("first", cache.get(("a", "csv")))
+        self.assertEqual("third", cache.get(("c", "csv")))
+        self.assertEqual(2, len(cache))
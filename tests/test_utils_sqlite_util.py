@@ -0,0 +1,120 @@
+"""Unit-tests for the `pybudgetplot.utils.sqlite_util` module."""
+from contextlib import closing
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pybudgetplot.datamodel.account import Account
+from pybudgetplot.datamodel.budget import Budget
+from pybudgetplot.utils.file_util import read_str
+from pybudgetplot.utils.sqlite_util import connect, query_below, read_breakdown_fingerprint, write_breakdown
+
+SAMPLES_DIR = Path(__file__).parent.joinpath("samples").absolute().resolve()
+
+BUDGET = Budget.from_yaml(read_str(SAMPLES_DIR.joinpath("budget.yaml")))
+
+
+class WriteBreakdownTests(TestCase):
+    """Unit-tests for the `write_breakdown` method."""
+
+    def test_given_breakdown_then_long_format_and_totals_stored(self):
+        data = BUDGET.as_dataframe()
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("child_dir").joinpath("budgets.db")
+            write_breakdown(db_file, "budget", data)
+            with closing(connect(db_file)) as connection:
+                journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+                totals = connection.execute("SELECT * FROM totals ORDER BY date").fetchall()
+                salary = connection.execute(
+                    "SELECT date, amount FROM breakdown WHERE event = 'Salary' ORDER BY date"
+                ).fetchall()
+                zeros = connection.execute("SELECT COUNT(*) FROM breakdown WHERE amount = 0").fetchone()[0]
+
+        self.assertEqual("wal", journal_mode)
+        self.assertEqual(len(data), len(totals))
+        self.assertTupleEqual(("budget", "2020-11-01", 160.0, 160.0), totals[0])
+        self.assertListEqual([("2020-11-03", 1300.0), ("2020-12-03", 1300.0)], salary)
+        self.assertEqual(0, zeros)
+
+    def test_given_same_budget_id_when_written_twice_then_data_replaced(self):
+        data = BUDGET.as_dataframe()
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("budgets.db")
+            write_breakdown(db_file, "budget", data)
+            write_breakdown(db_file, "budget", data)
+            with closing(connect(db_file)) as connection:
+                count = connection.execute("SELECT COUNT(*) FROM totals").fetchone()[0]
+
+        self.assertEqual(len(data), count)
+
+    def test_given_duplicate_event_descriptions_then_each_column_stored(self):
+        budget = Budget("2020-01-01", "2020-01-03")
+        budget.add_event("A", 10, "2020-01-01")
+        budget.add_event("A", 20, "2020-01-02")
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("budgets.db")
+            write_breakdown(db_file, "budget", budget.as_dataframe())
+            with closing(connect(db_file)) as connection:
+                rows = connection.execute("SELECT date, event, amount FROM breakdown ORDER BY date").fetchall()
+
+        self.assertListEqual([("2020-01-01", "A", 10.0), ("2020-01-02", "A", 20.0)], rows)
+
+    def test_given_interest_and_statistics_then_only_events_stored(self):
+        budget = Budget.from_yaml(BUDGET.as_yaml())
+        budget.account = Account(1000, 0.5, "daily")
+        data = budget.as_dataframe(rolling=True)
+        self.assertIn("interest", data.columns)
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("budgets.db")
+            write_breakdown(db_file, "budget", data)
+            with closing(connect(db_file)) as connection:
+                events = connection.execute("SELECT DISTINCT event FROM breakdown ORDER BY event").fetchall()
+
+        self.assertListEqual(sorted(budget.events.description_list()), [event for (event,) in events])
+
+    def test_given_fingerprint_then_stored_with_breakdown(self):
+        data = BUDGET.as_dataframe()
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("budgets.db")
+            self.assertIsNone(read_breakdown_fingerprint(db_file, "budget"))
+            self.assertFalse(db_file.exists())
+
+            write_breakdown(db_file, "budget", data, fingerprint="first")
+            write_breakdown(db_file, "other", data)
+            self.assertEqual("first", read_breakdown_fingerprint(db_file, "budget"))
+            self.assertIsNone(read_breakdown_fingerprint(db_file, "other"))
+
+            write_breakdown(db_file, "budget", data, fingerprint="second")
+            self.assertEqual("second", read_breakdown_fingerprint(db_file, "budget"))
+
+
+class QueryBelowTests(TestCase):
+    """Unit-tests for the `query_below` method."""
+
+    def test_given_budgets_then_returns_only_those_below_threshold(self):
+        poor = Budget("2020-01-01", "2020-04-30")
+        poor.add_event("Rent", -100, "Every Month")
+        poor.add_event("Salary", 450, "2020-03-15")
+        rich = Budget("2020-01-01", "2020-04-30")
+        rich.add_event("Cash", 1000, "2020-01-01")
+
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("budgets.db")
+            write_breakdown(db_file, "poor", poor.as_dataframe())
+            write_breakdown(db_file, "rich", rich.as_dataframe())
+
+            everything = query_below(db_file, 0)
+            in_march = query_below(db_file, 0, month=3)
+            after_march = query_below(db_file, 0, start="2020-03-15")
+            before_feb = query_below(db_file, 0, end="2020-01-31")
+
+        self.assertListEqual([("poor", "2020-01-01", -300.0)], everything)
+        self.assertListEqual([("poor", "2020-03-01", -300.0)], in_march)
+        self.assertListEqual([], after_march)
+        self.assertListEqual([("poor", "2020-01-01", -100.0)], before_feb)
+
+    def test_given_missing_file_then_raises_error(self):
+        with TemporaryDirectory() as temp_dir:
+            db_file = Path(temp_dir).joinpath("missing.db")
+            with self.assertRaises(FileNotFoundError):
+                query_below(db_file)
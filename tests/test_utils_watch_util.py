@@ -0,0 +1,87 @@
+"""Unit-tests for the `pybudgetplot.utils.watch_util` module."""
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pybudgetplot.utils.file_util import write_str
+from pybudgetplot.utils.watch_util import FileWatcher, watch_file
+
+
+def _touch(file: Path, mtime_ns: int):
+    """Sets the modification time of the file."""
+
+    os.utime(file, ns=(mtime_ns, mtime_ns))
+
+
+class FileWatcherTests(TestCase):
+    """Unit-tests for the `FileWatcher` class."""
+
+    def test_given_file_when_first_poll_then_returns_contents(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("budget.yaml")
+            write_str(file, "contents")
+            watcher = FileWatcher(file)
+            self.assertEqual(b"contents", watcher.poll())
+            self.assertIsNone(watcher.poll())
+
+    def test_given_file_when_touched_but_same_contents_then_returns_none(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("budget.yaml")
+            write_str(file, "contents")
+            _touch(file, 1_000_000_000)
+            watcher = FileWatcher(file)
+            watcher.poll()
+            _touch(file, 2_000_000_000)
+            self.assertIsNone(watcher.poll())
+
+    def test_given_file_when_changed_then_returns_new_contents(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("budget.yaml")
+            write_str(file, "contents")
+            _touch(file, 1_000_000_000)
+            watcher = FileWatcher(file)
+            watcher.poll()
+            write_str(file, "new contents")
+            _touch(file, 2_000_000_000)
+            self.assertEqual(b"new contents", watcher.poll())
+
+    def test_given_half_written_compressed_file_then_returns_none_until_complete(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("budget.yaml.gz")
+            write_str(file, "contents")
+            complete = file.read_bytes()
+            file.write_bytes(complete[: len(complete) // 2])
+            _touch(file, 1_000_000_000)
+            watcher = FileWatcher(file)
+            self.assertIsNone(watcher.poll())
+            file.write_bytes(complete)
+            _touch(file, 1_000_000_000)
+            self.assertEqual(b"contents", watcher.poll())
+
+    def test_given_missing_file_then_returns_none(self):
+        with TemporaryDirectory() as temp_dir:
+            watcher = FileWatcher(Path(temp_dir).joinpath("missing.yaml"))
+            self.assertIsNone(watcher.poll())
+
+
+class WatchFileTests(TestCase):
+    """Unit-tests for the `watch_file` method."""
+
+    def test_given_changes_between_polls_then_calls_back_for_each_change(self):
+        with TemporaryDirectory() as temp_dir:
+            file = Path(temp_dir).joinpath("budget.yaml")
+            write_str(file, "v0")
+            _touch(file, 1_000_000_000)
+            changes = []
+            polls = []
+
+            def wait(interval: float):
+                polls.append(interval)
+                write_str(file, f"v{len(polls) // 2}")
+                _touch(file, (len(polls) + 1) * 1_000_000_000)
+
+            watch_file(file, changes.append, interval=0.5, wait=wait, max_polls=4)
+
+        self.assertListEqual([b"v0", b"v1"], changes)
+        self.assertListEqual([0.5] * 4, polls)